@@ -45,16 +45,124 @@ NAMES = ["Policy Maker", "Insurance Company", " "] # Third element for consisten
 
 #<COMMON_CODE>
 DEBUG=True
-from soluzion5 import Basic_State, \
-  Basic_Operator as Operator, ROLES_List, add_to_next_transition
-import Select_Roles as sr
+try:
+  from soluzion5 import Basic_State, \
+    Basic_Operator as Operator, ROLES_List, add_to_next_transition
+  import Select_Roles as sr
+except ImportError:
+  # No SOLUZION install: fall back to the minimal base classes used by
+  # headless tools (batch simulation, search).
+  from Healthcare_Headless import Basic_State, \
+    Basic_Operator as Operator, ROLES_List, add_to_next_transition
 import random
+from collections import OrderedDict, namedtuple
+from operator import attrgetter
 
 def int_to_name(i):
   return NAMES[i]
 
+# Narration of transitions has three modes:
+#   'text'   - messages are rendered and handed to SOLUZION right away
+#              (the interactive game);
+#   'events' - operators only record cheap structured events on the new
+#              state; text is rendered later by transition_text() or
+#              flush_narration(), if a client asks for it;
+#   'off'    - nothing is recorded (batch simulation, search).
+# NARRATE is the fast flag the operators test; it is False only in 'off'.
+NARRATION_MODE = 'text'
+NARRATE = True
+
+def set_narration(mode):
+  # Accepts a mode name, or True/False for 'text'/'off'.
+  global NARRATION_MODE, NARRATE
+  if mode is True: mode = 'text'
+  elif mode is False: mode = 'off'
+  if mode not in ('text', 'events', 'off'):
+    raise ValueError("Unknown narration mode: "+str(mode))
+  NARRATION_MODE = mode
+  NARRATE = mode != 'off'
+
+# Source of randomness for chance events (the interception roll in
+# request_funds).  Defaults to the global random module; simulators give
+# each worker its own seeded random.Random stream via set_rng().
+RNG = random
+
+def set_rng(rng):
+  global RNG
+  RNG = rng
+
+
+# End-of-game conditions, in the order they are tested.  terminal_status()
+# returns one of these codes with the role that wins (-1 when both sides
+# lose, or while the game goes on); the message shown to the players is
+# only looked up in END_MESSAGES when it is displayed.
+END_ONGOING = 0
+END_ACCESS_IMPROVED = 1   # Policy Maker wins
+END_PROFIT_TARGET = 2     # Insurance Company wins
+END_UNINSURED = 3         # both lose
+END_HEALTH_CRISIS = 4     # both lose
+END_ACCESS_GAP = 5        # Policy Maker loses
+END_TRUST_LOST = 6        # Policy Maker loses
+
+# (code, winner) pairs, so terminal_status() allocates nothing.
+END_STATUS = ((END_ONGOING, -1),
+              (END_ACCESS_IMPROVED, POLICY_MAKER),
+              (END_PROFIT_TARGET, INSURANCE_COMPANY),
+              (END_UNINSURED, -1),
+              (END_HEALTH_CRISIS, -1),
+              (END_ACCESS_GAP, INSURANCE_COMPANY),
+              (END_TRUST_LOST, INSURANCE_COMPANY))
+
+END_MESSAGES = {
+  END_ACCESS_IMPROVED: "Policy Maker wins! Healthcare access significantly improved.\n\nIn the real world, however, even well-intentioned policies can result in unforeseen consequences.\nThe Affordable Care Act, ironically, has led to mergers and market consolidation resulting in increased healthcare and coverage prices a decade after the law's passing.",
+  END_PROFIT_TARGET: "Insurance Company wins! Profit target achieved.",
+  END_UNINSURED: "Game over - Uninsured rate too high! Both sides lost.\nIn 2010, uninsured rate in the USA peaked at 17.8% in the wake of the 2008 Market crash and economic recession. That same year, the Affordable Care Act was signed into law as a countermeasure.",
+  END_HEALTH_CRISIS: "Game over - Public health crisis! Both sides lost.",
+  END_ACCESS_GAP: "Game over - The access gap between income groups is too high! Policymaker lost.",
+  END_TRUST_LOST: "Game over - The Policymaker has lost public trust and has been voted out! Policymaker lost.",
+}
+
+def terminal_status(s):
+  # Pure win/lose test: (end code, winner) for s, without touching s.
+  if s.access_gap_index < 13:
+    return END_STATUS[END_ACCESS_IMPROVED]
+  if s.profit > 85:
+    return END_STATUS[END_PROFIT_TARGET]
+  if s.uninsured_rate > 17.8:
+    return END_STATUS[END_UNINSURED]
+  if s.public_health_index < 30:
+    return END_STATUS[END_HEALTH_CRISIS]
+  if s.access_gap_index > 45:
+    return END_STATUS[END_ACCESS_GAP]
+  if s.public_trust_meter < 30:
+    return END_STATUS[END_TRUST_LOST]
+  return END_STATUS[END_ONGOING]
+
+# Fixed layout of every per-game field.  State stores these in __slots__
+# and to_tuple()/from_tuple() use this order, so keep it in sync with
+# State.__init__ and State.clone.  Instances only go without a __dict__
+# if the base class declares __slots__ too: Healthcare_Headless's
+# Basic_State does, SOLUZION's may not, in which case the fields still
+# live in slots but each State also carries an (empty) __dict__.
+STATE_FIELDS = ('whose_turn', 'current_role', 'current_role_num',
+                'uninsured_rate', 'public_health_index', 'access_gap_index',
+                'profit', 'public_trust_meter', 'influence_meter', 'budget',
+                'premium_cap_turns_left', 'skip_next_turn', 'win', 'winner',
+                'bribe_choice_active', 'public_expansion_cap_turns_left',
+                'last_lobbied', 'funded', 'intercepted',
+                'policymaker_bonus_turn_used_55',
+                'policymaker_bonus_turn_used_62',
+                'policymaker_bonus_turn_used_72')
+
+_get_state_fields = attrgetter(*STATE_FIELDS)
+_new_instance = object.__new__
 
 class State(Basic_State):
+    # '_key' caches key(), '_status' caches status() and '_events' holds
+    # narration events; they are deliberately not part of STATE_FIELDS, so
+    # clone() and from_tuple() leave them unset on the new state.
+    __slots__ = STATE_FIELDS + ('_key', '_status', '_events')
+
     def __init__(self, old=None):
         if old is None:
             # Initial state
@@ -111,6 +219,46 @@ class State(Basic_State):
             self.policymaker_bonus_turn_used_62 = old.policymaker_bonus_turn_used_62
             self.policymaker_bonus_turn_used_72 = old.policymaker_bonus_turn_used_72
 
+    def clone(self):
+        # Fast copy path used by the operators.  Equivalent to State(self)
+        # but skips the __init__ dispatch and writes the slots directly.
+        new = _new_instance(self.__class__)
+        new.whose_turn = self.whose_turn
+        new.current_role = self.current_role
+        new.current_role_num = self.current_role_num
+        new.uninsured_rate = self.uninsured_rate
+        new.public_health_index = self.public_health_index
+        new.access_gap_index = self.access_gap_index
+        new.profit = self.profit
+        new.public_trust_meter = self.public_trust_meter
+        new.influence_meter = self.influence_meter
+        new.budget = self.budget
+        new.premium_cap_turns_left = self.premium_cap_turns_left
+        new.skip_next_turn = self.skip_next_turn
+        new.win = self.win
+        new.winner = self.winner
+        new.bribe_choice_active = self.bribe_choice_active
+        new.public_expansion_cap_turns_left = self.public_expansion_cap_turns_left
+        new.last_lobbied = self.last_lobbied
+        new.funded = self.funded
+        new.intercepted = self.intercepted
+        new.policymaker_bonus_turn_used_55 = self.policymaker_bonus_turn_used_55
+        new.policymaker_bonus_turn_used_62 = self.policymaker_bonus_turn_used_62
+        new.policymaker_bonus_turn_used_72 = self.policymaker_bonus_turn_used_72
+        return new
+
+    def to_tuple(self):
+        # All fields as a flat tuple, in STATE_FIELDS order.
+        return _get_state_fields(self)
+
+    @classmethod
+    def from_tuple(cls, values):
+        # Inverse of to_tuple().
+        new = _new_instance(cls)
+        for name, value in zip(STATE_FIELDS, values):
+            setattr(new, name, value)
+        return new
+
     def __str__(self):
         # Produces a simple textual description of a state.
         # Doesn't mention any win that might exist.
@@ -126,53 +274,88 @@ class State(Basic_State):
                 f"Premium Cap Turns Left: {self.premium_cap_turns_left}\n"
                 f"Public Expansion Cap Turns Left: {self.public_expansion_cap_turns_left}\n")
 
+    def key(self):
+        # Canonical identity of a position: every field that can change how
+        # the game plays from here on.  win/winner and current_role are
+        # derived from other fields, and funded/intercepted only change
+        # narration, so they are left out.  The uninsured rate is kept in
+        # tenths (apply_effect rounds it to a tenth, see METRIC_DECIMALS,
+        # so equal keys mean the same rate), and last_lobbied is capped at 3
+        # because can_lobby only asks whether it has reached 3.
+        # The key is computed on first use and cached, so a state must not
+        # be mutated once it has been hashed or compared.
+        try:
+            return self._key
+        except AttributeError:
+            pass
+        k = self._key = (self.whose_turn,
+                         round(self.uninsured_rate * 10),
+                         self.public_health_index,
+                         self.access_gap_index,
+                         self.profit,
+                         self.public_trust_meter,
+                         self.influence_meter,
+                         self.budget,
+                         self.premium_cap_turns_left,
+                         self.skip_next_turn,
+                         self.bribe_choice_active,
+                         self.public_expansion_cap_turns_left,
+                         min(self.last_lobbied, 3),
+                         self.policymaker_bonus_turn_used_55,
+                         self.policymaker_bonus_turn_used_62,
+                         self.policymaker_bonus_turn_used_72)
+        return k
+
     def __eq__(self, s):
-        return self.__str__() == s.__str__()
+        if not isinstance(s, State):
+            return NotImplemented
+        return self.key() == s.key()
 
     def __hash__(self):
-        return (self.__str__()).__hash__()
+        return hash(self.key())
     
+    def status(self):
+        # terminal_status(self), computed on first use and cached like
+        # key(), so a state must not be mutated after it has been asked.
+        try:
+            return self._status
+        except AttributeError:
+            pass
+        status = self._status = terminal_status(self)
+        return status
+
     def find_any_win(self):
-        # Policy Maker win condition: Access Gap Index below 15 (improved access)
-        if self.access_gap_index < 13:
-            return ("Policy Maker wins! Healthcare access significantly improved.\n\nIn the real world, however, even well-intentioned policies can result in unforeseen consequences.\nThe Affordable Care Act, ironically, has led to mergers and market consolidation resulting in increased healthcare and coverage prices a decade after the law's passing.", POLICY_MAKER)
-            
-        # Insurance Company win condition: Profit greater than 85 billion
-        if self.profit > 85:
-            return ("Insurance Company wins! Profit target achieved.", INSURANCE_COMPANY)
-            
-        # lose conditions
-        if self.uninsured_rate > 17.8:
-            return ("Game over - Uninsured rate too high! Both sides lost.\nIn 2010, uninsured rate in the USA peaked at 17.8% in the wake of the 2008 Market crash and economic recession. That same year, the Affordable Care Act was signed into law as a countermeasure.", -1)
-        if self.public_health_index < 30:
-            return ("Game over - Public health crisis! Both sides lost.", -1)
-        if self.access_gap_index > 45:
-            return ("Game over - The access gap between income groups is too high! Policymaker lost.", INSURANCE_COMPANY)
-        if self.public_trust_meter < 30:
-            return ("Game over - The Policymaker has lost public trust and has been voted out! Policymaker lost.", INSURANCE_COMPANY)
-            
-        return False
+        # (message, winner) if the game is over, else False.
+        code, winner = self.status()
+        if code == END_ONGOING:
+            return False
+        return (END_MESSAGES[code], winner)
   
     def check_for_win(self):
+        # Like find_any_win, but also records the result in win/winner.
         any_win = self.find_any_win()
         if any_win: 
             (self.win, self.winner) = any_win
-            #print("in check_for_win, we found: ", self.win)
-        else:
-            pass  # self.win = ""
         return any_win
     
     def is_goal(self):
         # This method is used by the SOLUZION system to test if
         # a final state of a game or problem has been reached.
-        any_win = self.check_for_win()
-        if any_win: return True  # Win or lose condition met
-        return False # Game continues.
+        # It has no side effects, so it is safe on shared or cached states.
+        return self.status()[0] != END_ONGOING
 
-    def goal_message(self):
-        # Needed by SOLUZION.
+    def win_text(self):
+        # Text describing the end of the game ("" while it goes on); a
+        # message stored in win takes precedence.
         if self.win != "":
             return self.win
+        return END_MESSAGES.get(self.status()[0], "")
+
+    def goal_message(self):
+        # Needed by SOLUZION.
+        text = self.win_text()
+        if text != "":
+            return text
         else:
             return "Game continues."
 
@@ -184,15 +367,16 @@ class State(Basic_State):
         role_name = int_to_name(role_num)
         txt = "Current view for " + role_name + ":\n"
         txt += str(self)
-        if self.win == "" and not self.is_goal():
+        code, winner = self.status()
+        if code == END_ONGOING:
             txt += "It's "+int_to_name(self.whose_turn)+"'s turn.\n"
-        elif self.winner != -1:
-            txt += "Winner is "+int_to_name(self.winner)+"\n"
-        elif self.win != "":
-            txt += self.win + "\n"
+        elif winner != -1:
+            txt += "Winner is "+int_to_name(winner)+"\n"
+        else:
+            txt += self.win_text() + "\n"
         
         # Role-specific information
-        if self.win == "":
+        if code == END_ONGOING:
             if role_num == POLICY_MAKER:
                 txt += "\n--- POLICY MAKER GOALS ---\n"
                 txt += f"WIN: Get Access Gap Index below 13 (currently {self.access_gap_index})\n"
@@ -228,15 +412,18 @@ def update_turn(news):
   # Now, check if a bonus turn should be given based on the public trust meter
   if news.whose_turn == POLICY_MAKER:
     if news.public_trust_meter >= 72 and not news.policymaker_bonus_turn_used_72:
-      add_to_next_transition("The Policymaker has reached a public trust meter of 72% and earns a bonus turn!", news)
+      if NARRATE:
+        record_event(news, (EV_BONUS_TURN, 72, ()))
       news.policymaker_bonus_turn_used_72 = True
       return
     elif news.public_trust_meter >= 62 and not news.policymaker_bonus_turn_used_62:
-      add_to_next_transition("The Policymaker has reached a public trust meter of 62% and earns a bonus turn!", news)
+      if NARRATE:
+        record_event(news, (EV_BONUS_TURN, 62, ()))
       news.policymaker_bonus_turn_used_62 = True
       return
     elif news.public_trust_meter >= 55 and not news.policymaker_bonus_turn_used_55:
-      add_to_next_transition("The Policymaker has reached a public trust meter of 55% and earns a bonus turn!", news)
+      if NARRATE:
+        record_event(news, (EV_BONUS_TURN, 55, ()))
       news.policymaker_bonus_turn_used_55 = True
       return
 
@@ -255,9 +442,12 @@ def clamp(value, min_val, max_val):
     return max(min_val, min(max_val, value))
 
 # A function to facilitate role-specific visualizations...
-def is_user_in_role(role_num):
-  username = SESSION['USERNAME']
-  rm = SESSION['ROLES_MEMBERSHIP']
+def is_user_in_role(role_num, session=None):
+  # session defaults to the single-game SESSION set by SOLUZION; a room
+  # (Healthcare_Rooms.Room) passes its own.
+  if session is None: session = SESSION
+  username = session['USERNAME']
+  rm = session['ROLES_MEMBERSHIP']
   if rm==None: return False
   users_in_role = rm[role_num]
   return username in users_in_role
@@ -266,295 +456,571 @@ def get_session():
   return SESSION
 
 #------------------
-# Policy Maker operators
-def expand_public_coverage(s):
-    new_s = State(s)
-    add_to_next_transition(int_to_name(s.whose_turn)+" expands public coverage.", new_s)
-    new_s.access_gap_index = clamp(s.access_gap_index - 6, 0, 100)
-    add_to_next_transition("Access gap decreased to "+str(new_s.access_gap_index)+".", new_s)
-    new_s.public_trust_meter = clamp(s.public_trust_meter + 3, 0, 100)
-    add_to_next_transition("Public trust increased to "+str(new_s.public_trust_meter)+".", new_s)
-    new_s.uninsured_rate = clamp(s.uninsured_rate - 0.5, 0, 100)
-    add_to_next_transition("Uninsured rate decreased to "+"%.1f"%new_s.uninsured_rate+"%.", new_s)
-    new_s.profit = clamp(s.profit - 5, 0, 200)
-    add_to_next_transition("Insurer's profit decreased to "+str(new_s.profit)+" billions.", new_s)
-    new_s.public_health_index = clamp(s.public_health_index + 5, 0, 100)
-    add_to_next_transition("Public health index increased to "+str(new_s.public_health_index)+".", new_s)
-    new_s.budget = clamp(s.budget - 17, 0, 200)
-    add_to_next_transition("Budget decreased to $"+str(new_s.budget)+" billions.", new_s)
-    update_turn(new_s)
-    return new_s
+# Operator ids: positions in OPERATORS (POLICY_MAKER_OPS, then
+# INSURANCE_COMPANY_OPS).  Used by narration events.
+OP_EXPAND_PUBLIC_COVERAGE = 0
+OP_SUBSIDIZE_COVERAGE = 1
+OP_REQUEST_FUNDS = 2
+OP_CAP_PREMIUMS = 3
+OP_MANDATE_COVERAGE = 4
+OP_INVEST_IN_CLINICS = 5
+OP_PM_PASS = 6
+OP_RAISE_PREMIUMS = 7
+OP_RISK_SELECTION = 8
+OP_NARROW_PROVIDER_NETWORK = 9
+OP_LOBBY_GOVERNMENT = 10
+OP_MISINFORMATION_CAMPAIGNS = 11
+OP_PREVENT_EXPANSION = 12
+OP_FUND_MISINFORMATION = 13
+OP_IC_PASS = 14
 
-def subsidize_coverage(s):
-    new_s = State(s)
-    add_to_next_transition(int_to_name(s.whose_turn)+" subsidizes coverage.", new_s)
-    new_s.access_gap_index = clamp(s.access_gap_index - 3, 0, 100)
-    add_to_next_transition("Access gap decreased to "+str(new_s.access_gap_index)+".", new_s)
-    new_s.public_trust_meter = clamp(s.public_trust_meter + 2, 0, 100)
-    add_to_next_transition("Public trust increased to "+str(new_s.public_trust_meter)+".", new_s)
-    new_s.uninsured_rate = clamp(s.uninsured_rate - 0.3, 0, 100)
-    add_to_next_transition("Uninsured rate decreased to "+"%.1f"%new_s.uninsured_rate+"%.", new_s)
-    new_s.profit = clamp(s.profit - 3, 0, 200)
-    add_to_next_transition("Insurer's profit decreased to "+str(new_s.profit)+" billions.", new_s)
-    new_s.public_health_index = clamp(s.public_health_index + 4, 0, 100)
-    add_to_next_transition("Public health index increased to "+str(new_s.public_health_index)+".", new_s)
-    new_s.budget = clamp(s.budget - 11, 0, 200)
-    add_to_next_transition("Budget decreased to $"+str(new_s.budget)+" billions.", new_s)
-    update_turn(new_s)
-    return new_s
+# Narration events are tuples (code, arg, changes), where changes is a
+# tuple of (metric, old value, new value).  For operator events the code
+# is the operator id and arg is the acting role; the other event codes
+# are negative.
+EV_FUNDS_INTERCEPTED = -1  # arg: True on the first interception
+EV_FUNDS_GRANTED = -2      # arg: acting role; changes: the budget
+EV_FUNDING_FACT = -3       # arg: acting role
+EV_BONUS_TURN = -4         # arg: trust threshold reached
 
-def request_funds(s):
-    new_s = State(s)
-    add_to_next_transition(int_to_name(s.whose_turn)+" requests funds from the government.", new_s)
-    new_s.funded += 1
-    
-    # 30% chance of being intercepted by the insurer
-    if random.random() < 0.3:
-        new_s.intercepted += 1
-        if new_s.intercepted == 1:
-          add_to_next_transition("Funds are intercepted! The Insurance Company can now choose to act. Did you know? Corruption can causes funds to be used in damaging ways.", new_s)
+# For each operator: the headline that follows the actor's name, and the
+# metrics it reports, in the order they are announced.
+NARRATION = {
+  OP_EXPAND_PUBLIC_COVERAGE: (" expands public coverage.",
+    ('access_gap_index', 'public_trust_meter', 'uninsured_rate', 'profit', 'public_health_index', 'budget')),
+  OP_SUBSIDIZE_COVERAGE: (" subsidizes coverage.",
+    ('access_gap_index', 'public_trust_meter', 'uninsured_rate', 'profit', 'public_health_index', 'budget')),
+  OP_REQUEST_FUNDS: (" requests funds from the government.", ()),
+  OP_CAP_PREMIUMS: (" caps insurance premiums.",
+    ('access_gap_index', 'public_trust_meter', 'influence_meter', 'uninsured_rate', 'budget')),
+  OP_MANDATE_COVERAGE: (" mandates coverage.",
+    ('access_gap_index', 'public_trust_meter', 'uninsured_rate', 'public_health_index', 'budget')),
+  OP_INVEST_IN_CLINICS: (" invests in public clinics.",
+    ('access_gap_index', 'public_health_index', 'uninsured_rate', 'public_trust_meter', 'budget')),
+  OP_PM_PASS: (" passes.", ()),
+  OP_RAISE_PREMIUMS: (" raises premiums.",
+    ('profit', 'access_gap_index', 'uninsured_rate', 'public_health_index', 'influence_meter')),
+  OP_RISK_SELECTION: (" engages in risk selection.",
+    ('access_gap_index', 'influence_meter', 'uninsured_rate', 'profit', 'public_health_index')),
+  OP_NARROW_PROVIDER_NETWORK: (" narrows provider network.",
+    ('access_gap_index', 'influence_meter', 'uninsured_rate', 'profit', 'public_health_index')),
+  OP_LOBBY_GOVERNMENT: (" lobbies government, causing policymaker to lose a turn.",
+    ('access_gap_index', 'uninsured_rate', 'public_health_index', 'public_trust_meter', 'influence_meter')),
+  OP_MISINFORMATION_CAMPAIGNS: (" launches misinformation campaigns.",
+    ('access_gap_index', 'influence_meter', 'uninsured_rate', 'profit', 'public_trust_meter')),
+  OP_PREVENT_EXPANSION: (" uses intercepted funds to prevent public coverage expansion for 3 turns.",
+    ('profit', 'influence_meter')),
+  OP_FUND_MISINFORMATION: (" uses intercepted funds to launch a misinformation campaign.",
+    ('public_trust_meter', 'profit', 'influence_meter')),
+  OP_IC_PASS: (" passes.", ()),
+}
+
+METRIC_TEXT = {
+  'access_gap_index': "Access gap %s %d.",
+  'public_trust_meter': "Public trust %s %d.",
+  'uninsured_rate': "Uninsured rate %s %.1f%%.",
+  'profit': "Insurer's profit %s %d billions.",
+  'public_health_index': "Public health index %s %d.",
+  'budget': "Budget %s $%d billions.",
+  'influence_meter': "Insurer's influence %s %d.",
+}
+
+def narrate(new_s, op_id, s):
+    # Records the event for operator op_id taking s to new_s.  Callers
+    # check NARRATE first, so nothing at all happens in 'off' mode.
+    metrics = NARRATION[op_id][1]
+    changes = tuple([(m, getattr(s, m), getattr(new_s, m)) for m in metrics])
+    record_event(new_s, (op_id, s.whose_turn, changes))
+
+def record_event(s, event):
+    if NARRATION_MODE == 'text':
+        for line in render_event(event):
+            add_to_next_transition(line, s)
+        return
+    try:
+        s._events.append(event)
+    except AttributeError:
+        s._events = [event]
+
+def render_change(metric, old, new):
+    if new > old: direction = "increased to"
+    elif new < old: direction = "decreased to"
+    else: direction = "stays at"
+    return METRIC_TEXT[metric] % (direction, new)
+
+def render_event(event):
+    # Returns the lines of text for one narration event.
+    code, arg, changes = event
+    if code >= 0:
+        lines = [int_to_name(arg) + NARRATION[code][0]]
+    elif code == EV_FUNDS_INTERCEPTED:
+        if arg:
+            lines = ["Funds are intercepted! The Insurance Company can now choose to act. Did you know? Corruption can causes funds to be used in damaging ways."]
         else:
-          add_to_next_transition("Funds are intercepted! The Insurance Company can now choose to act.", new_s)
-        new_s.bribe_choice_active = True
+            lines = ["Funds are intercepted! The Insurance Company can now choose to act."]
+    elif code == EV_FUNDS_GRANTED:
+        lines = ["Request succeeds!"]
+    elif code == EV_FUNDING_FACT:
+        lines = ["Did you know? Public health in real life USA is also suffering for lack of funding. The current rising rate of chronic diseases is attributed in part to governmental underinvestment in Public Health infrastructure."]
+    elif code == EV_BONUS_TURN:
+        lines = ["The Policymaker has reached a public trust meter of %d%% and earns a bonus turn!" % arg]
     else:
-        add_to_next_transition("Request succeeds!", new_s)
-        new_s.budget = clamp(s.budget + 25, 0, 200)
-        add_to_next_transition("Budget increased to $"+str(new_s.budget)+" billions.", new_s)
-    
-    if new_s.funded == 1:
-        add_to_next_transition("Did you know? Public health in real life USA is also suffering for lack of funding. The current rising rate of chronic diseases is attributed in part to governmental underinvestment in Public Health infrastructure.", new_s)
-    
+        lines = []
+    for metric, old, new in changes:
+        lines.append(render_change(metric, old, new))
+    return lines
+
+def transition_events(s):
+    # Events recorded on s by the operator that produced it ('events' mode).
+    try:
+        return s._events
+    except AttributeError:
+        return []
+
+def transition_text(s):
+    # Renders the recorded events of s as one block of text.
+    lines = []
+    for event in transition_events(s):
+        lines.extend(render_event(event))
+    return "\n".join(lines)
+
+def flush_narration(s):
+    # Hands the recorded events of s to SOLUZION as transition messages,
+    # for a human-facing client running in 'events' mode.
+    for event in transition_events(s):
+        for line in render_event(event):
+            add_to_next_transition(line, s)
+    s._events = []
+
+#------------------
+# Operator effect table.  Every operator is described declaratively and
+# applied by the one generic kernel, apply_operator(); Healthcare_Batch.py
+# drives the same table with NumPy to apply an operator to many games.
+
+# Clamp bounds of each metric.
+METRIC_BOUNDS = {
+  'uninsured_rate': (0, 100),
+  'public_health_index': (0, 100),
+  'access_gap_index': (0, 100),
+  'profit': (0, 200),
+  'public_trust_meter': (0, 100),
+  'influence_meter': (0, 100),
+  'budget': (0, 200),
+}
+
+# Metrics held to a fixed number of decimals.  The uninsured rate moves in
+# tenths of a percent, but float sums of the deltas drift (13.3 reaches
+# 17.8 or 17.800000000000008 depending on the order of the moves), and
+# terminal_status compares the raw value with 17.8.  Rounding after every
+# change keeps one float per tenth, so State.key(), which stores tenths,
+# determines the game status.
+METRIC_DECIMALS = {'uninsured_rate': 1}
+
+# role      - whose turn it must be.
+# at_least  - (field, minimum) pairs the current state must satisfy.
+# at_most   - (field, maximum) pairs the current state must satisfy.
+# deltas    - (metric, delta) pairs, clamped to METRIC_BOUNDS.
+# cost      - (metric, amount) paid by the acting role, or None.
+# when      - ((field, low, high), metric, delta): apply the delta only if
+#             field lies in [low, high] (None = unbounded).  Conditions
+#             and values are read from the state before the move; a later
+#             entry for the same metric replaces an earlier one.
+# sets      - (field, value) pairs assigned on the new state.
+# adds      - (field, amount) pairs added to the new state.
+# chance    - (probability, outcome) pairs for random operators; each
+#             outcome is an Effect that only uses deltas/sets/adds.
+Effect = namedtuple('Effect', ['role', 'at_least', 'at_most', 'deltas', 'cost',
+                               'when', 'sets', 'adds', 'chance'],
+                    defaults=[None, (), (), (), None, (), (), (), ()])
+
+FUNDS_INTERCEPTED = 0  # chance outcomes of request_funds
+FUNDS_GRANTED = 1
+
+EFFECTS = {
+  # Policy Maker operators
+  OP_EXPAND_PUBLIC_COVERAGE: Effect(POLICY_MAKER,
+    at_least=(('budget', 20),),
+    at_most=(('public_expansion_cap_turns_left', 0),),
+    deltas=(('access_gap_index', -6), ('public_trust_meter', 3), ('uninsured_rate', -0.5),
+            ('profit', -5), ('public_health_index', 5)),
+    cost=('budget', 17)),
+  OP_SUBSIDIZE_COVERAGE: Effect(POLICY_MAKER,
+    at_least=(('budget', 14),),
+    deltas=(('access_gap_index', -3), ('public_trust_meter', 2), ('uninsured_rate', -0.3),
+            ('profit', -3), ('public_health_index', 4)),
+    cost=('budget', 11)),
+  OP_REQUEST_FUNDS: Effect(POLICY_MAKER,
+    adds=(('funded', 1),),
+    # 30% chance of being intercepted by the insurer
+    chance=((0.3, Effect(adds=(('intercepted', 1),), sets=(('bribe_choice_active', True),))),
+            (0.7, Effect(deltas=(('budget', 25),))))),
+  OP_CAP_PREMIUMS: Effect(POLICY_MAKER,
+    at_least=(('budget', 14),),
+    deltas=(('access_gap_index', -2), ('public_trust_meter', 5), ('influence_meter', -8),
+            ('uninsured_rate', -0.2)),
+    cost=('budget', 11),
+    sets=(('premium_cap_turns_left', 3),)),  # Insurer can't raise premiums for 3 turns
+  OP_MANDATE_COVERAGE: Effect(POLICY_MAKER,
+    at_least=(('budget', 10),),
+    deltas=(('access_gap_index', -4), ('public_trust_meter', -2), ('uninsured_rate', -1.0),
+            ('public_health_index', 3)),
+    cost=('budget', 7)),
+  OP_INVEST_IN_CLINICS: Effect(POLICY_MAKER,
+    at_least=(('budget', 18),),
+    deltas=(('access_gap_index', -3), ('public_health_index', 6), ('uninsured_rate', -0.4),
+            ('public_trust_meter', 4)),
+    cost=('budget', 15)),
+  OP_PM_PASS: Effect(POLICY_MAKER,
+    deltas=(('public_trust_meter', -5),),
+    when=((('access_gap_index', 30, None), 'access_gap_index', 1),
+          (('influence_meter', 80, None), 'access_gap_index', 2))),
+  # Insurance Company operators
+  OP_RAISE_PREMIUMS: Effect(INSURANCE_COMPANY,
+    at_most=(('premium_cap_turns_left', 0),),
+    deltas=(('profit', 6), ('access_gap_index', 3), ('uninsured_rate', 0.8),
+            ('public_health_index', -2), ('influence_meter', -2)),  # Public backlash
+    adds=(('last_lobbied', 1),)),
+  OP_RISK_SELECTION: Effect(INSURANCE_COMPANY,
+    deltas=(('access_gap_index', 6), ('influence_meter', -4), ('uninsured_rate', 0.6),
+            ('profit', 5), ('public_health_index', -4)),
+    adds=(('last_lobbied', 1),)),
+  OP_NARROW_PROVIDER_NETWORK: Effect(INSURANCE_COMPANY,
+    deltas=(('access_gap_index', 5), ('influence_meter', -3), ('uninsured_rate', 0.8),
+            ('profit', 3), ('public_health_index', -4)),
+    adds=(('last_lobbied', 1),)),
+  OP_LOBBY_GOVERNMENT: Effect(INSURANCE_COMPANY,
+    at_least=(('influence_meter', 75), ('last_lobbied', 3)),
+    deltas=(('access_gap_index', 3), ('uninsured_rate', 0.6), ('public_health_index', -4),
+            ('public_trust_meter', -5), ('influence_meter', 5)),
+    sets=(('skip_next_turn', True), ('last_lobbied', 0))),  # Skip policymaker's next turn
+  OP_MISINFORMATION_CAMPAIGNS: Effect(INSURANCE_COMPANY,
+    at_least=(('profit', 3),),
+    deltas=(('access_gap_index', 3), ('influence_meter', 8), ('uninsured_rate', 0.3),
+            ('public_trust_meter', -3)),  # Reduce policymaker trust
+    cost=('profit', 3),  # Campaigns cost money
+    adds=(('last_lobbied', 1),)),
+  # bribe operators; the Insurer still gets their regular turn in addition to the bribe
+  OP_PREVENT_EXPANSION: Effect(INSURANCE_COMPANY,
+    at_least=(('bribe_choice_active', True),),
+    deltas=(('profit', 10), ('influence_meter', 8)),
+    sets=(('public_expansion_cap_turns_left', 2), ('bribe_choice_active', False),
+          ('skip_next_turn', True))),
+  OP_FUND_MISINFORMATION: Effect(INSURANCE_COMPANY,
+    at_least=(('bribe_choice_active', True),),
+    deltas=(('public_trust_meter', -9), ('profit', 10), ('influence_meter', 8)),
+    sets=(('bribe_choice_active', False), ('skip_next_turn', True))),
+  OP_IC_PASS: Effect(INSURANCE_COMPANY,
+    deltas=(('influence_meter', -5),),
+    # i.e. influence after the pass is at most 65
+    when=((('influence_meter', None, 70), 'profit', -2),)),
+}
+
+def can_apply(s, op_id):
+    # Table-driven precondition of operator op_id.
+    e = EFFECTS[op_id]
+    if s.whose_turn != e.role:
+        return False
+    for field, minimum in e.at_least:
+        if getattr(s, field) < minimum:
+            return False
+    for field, maximum in e.at_most:
+        if getattr(s, field) > maximum:
+            return False
+    return True
+
+# Legal-move generation.  ROLE_CHECKS[role] lists that role's operators
+# as (op_id, bit, at_least, at_most), so a scan skips the other side's
+# operators and the whose_turn test entirely.  legal_mask() returns the
+# legal operators as a bitmask (bit op_id set); legal_op_ids() maps it to
+# a tuple of indices into OPERATORS that is shared by every state with the
+# same mask, so callers must not modify it.
+def role_checks(role):
+  return tuple((op_id, 1 << op_id, e.at_least, e.at_most)
+               for op_id, e in sorted(EFFECTS.items()) if e.role == role)
+
+ROLE_CHECKS = (role_checks(POLICY_MAKER), role_checks(INSURANCE_COMPANY))
+LEGAL_IDS = {}  # mask -> tuple of op_ids
+
+def legal_mask(s):
+  mask = 0
+  for op_id, bit, at_least, at_most in ROLE_CHECKS[s.whose_turn]:
+    for field, minimum in at_least:
+      if getattr(s, field) < minimum:
+        break
+    else:
+      for field, maximum in at_most:
+        if getattr(s, field) > maximum:
+          break
+      else:
+        mask |= bit
+  return mask
+
+def legal_op_ids(s):
+  mask = legal_mask(s)
+  ids = LEGAL_IDS.get(mask)
+  if ids is None:
+    ids = LEGAL_IDS[mask] = tuple(i for i in range(len(EFFECTS)) if mask >> i & 1)
+  return ids
+
+def apply_effect(new_s, s, e):
+    # Writes the deterministic part of effect e, computed from s, into new_s.
+    for metric, delta in e.deltas:
+        low, high = METRIC_BOUNDS[metric]
+        value = getattr(s, metric) + delta
+        if metric in METRIC_DECIMALS:
+            value = round(value, METRIC_DECIMALS[metric])
+        setattr(new_s, metric, low if value < low else high if value > high else value)
+    if e.cost is not None:
+        metric, amount = e.cost
+        low, high = METRIC_BOUNDS[metric]
+        value = getattr(s, metric) - amount
+        if metric in METRIC_DECIMALS:
+            value = round(value, METRIC_DECIMALS[metric])
+        setattr(new_s, metric, low if value < low else high if value > high else value)
+    for (field, low_test, high_test), metric, delta in e.when:
+        test = getattr(s, field)
+        if (low_test is None or test >= low_test) and (high_test is None or test <= high_test):
+            low, high = METRIC_BOUNDS[metric]
+            value = getattr(s, metric) + delta
+            if metric in METRIC_DECIMALS:
+                value = round(value, METRIC_DECIMALS[metric])
+            setattr(new_s, metric, low if value < low else high if value > high else value)
+    for field, value in e.sets:
+        setattr(new_s, field, value)
+    for field, amount in e.adds:
+        setattr(new_s, field, getattr(new_s, field) + amount)
+
+def roll_outcome(e, rng=None):
+    # Picks a chance outcome of e using rng (RNG by default).
+    r = (rng or RNG).random()
+    for i, (probability, outcome) in enumerate(e.chance):
+        if r < probability:
+            return i
+        r -= probability
+    return len(e.chance) - 1
+
+def apply_operator(s, op_id, outcome=None):
+    # The generic kernel: returns the state reached by applying operator
+    # op_id to s, including the turn update.  For a chance operator,
+    # outcome selects the result (an index into its chance table); by
+    # default it is rolled with RNG.
+    e = EFFECTS[op_id]
+    new_s = s.clone()
+    apply_effect(new_s, s, e)
+    if e.chance:
+        if outcome is None:
+            outcome = roll_outcome(e)
+        apply_effect(new_s, s, e.chance[outcome][1])
+    if NARRATE:
+        narrate(new_s, op_id, s)
+        if op_id == OP_REQUEST_FUNDS:
+            narrate_funding(new_s, s, outcome)
     update_turn(new_s)
     return new_s
 
+def narrate_funding(new_s, s, outcome):
+    if outcome == FUNDS_INTERCEPTED:
+        record_event(new_s, (EV_FUNDS_INTERCEPTED, new_s.intercepted == 1, ()))
+    else:
+        record_event(new_s, (EV_FUNDS_GRANTED, s.whose_turn,
+                             (('budget', s.budget, new_s.budget),)))
+    if new_s.funded == 1:
+        record_event(new_s, (EV_FUNDING_FACT, s.whose_turn, ()))
+
+def operator_outcomes(s, op_id):
+    # ((probability, successor), ...) for operator op_id in s: one pair
+    # for a deterministic operator, one per chance outcome otherwise.
+    chance = EFFECTS[op_id].chance
+    if not chance:
+        return ((1.0, apply_operator(s, op_id)),)
+    return tuple((probability, apply_operator(s, op_id, k))
+                 for k, (probability, _) in enumerate(chance))
+
+# Successor cache.  Search, greedy lookahead and simulation apply the same
+# operators to the same positions over and over; the cache keeps the
+# operator_outcomes() of recently expanded positions, keyed by State.key()
+# and op_id, and hands out the same successor objects every time, so they
+# must never be mutated.  Positions with the same key play identically
+# and have the same status (the uninsured rate is kept in tenths, see
+# METRIC_DECIMALS), so the cache never changes a result; only fields
+# outside the key (funded, intercepted, last_lobbied beyond 3), which
+# nothing but narration reads, are those of the first state the position
+# was expanded from.  The cache
+# is only used with narration off: narrated transitions are computed
+# afresh, since their events belong to one game.
+#
+# Memory is capped at about max_bytes, counted as SUCCESSOR_BYTES per
+# cached successor (the State, its float and its cached key, and its
+# share of the entry); the least recently expanded positions are dropped
+# first.
+SUCCESSOR_BYTES = 640
+
+class SuccessorCache:
+    def __init__(self, max_bytes=64 << 20):
+        self.entries = OrderedDict()   # State.key() -> [outcomes or None per op_id]
+        self.size = 0                  # successors held
+        self.hits = 0
+        self.misses = 0
+        self.set_max_bytes(max_bytes)
+
+    def set_max_bytes(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.max_size = max_bytes // SUCCESSOR_BYTES
+        self.evict()
+
+    def outcomes(self, s, op_id):
+        # operator_outcomes(s, op_id), shared between calls.
+        if NARRATE:
+            return operator_outcomes(s, op_id)
+        key = s.key()
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = self.entries[key] = [None] * len(EFFECTS)
+        else:
+            self.entries.move_to_end(key)
+            result = entry[op_id]
+            if result is not None:
+                self.hits += 1
+                return result
+        self.misses += 1
+        result = entry[op_id] = operator_outcomes(s, op_id)
+        self.size += len(result)
+        if self.size > self.max_size:
+            self.evict()
+        return result
+
+    def apply(self, s, op_id, outcome=None):
+        # Like apply_operator(s, op_id, outcome); a chance outcome that is
+        # not given is rolled with RNG, one draw as in apply_operator.
+        if NARRATE:
+            return apply_operator(s, op_id, outcome)
+        result = self.outcomes(s, op_id)
+        if len(result) == 1:
+            return result[0][1]
+        if outcome is None:
+            outcome = roll_outcome(EFFECTS[op_id])
+        return result[outcome][1]
+
+    def evict(self):
+        # Drops least recently expanded positions until under the cap; the
+        # most recent one is always kept.
+        entries = self.entries
+        while self.size > self.max_size and len(entries) > 1:
+            _, entry = entries.popitem(last=False)
+            self.size -= sum(len(result) for result in entry if result is not None)
+
+    def clear(self):
+        self.entries.clear()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'positions': len(self.entries), 'successors': self.size,
+                'bytes': self.size * SUCCESSOR_BYTES, 'max_bytes': self.max_bytes}
+
+SUCCESSORS = SuccessorCache()
+
+def successors(s, op_id):
+    return SUCCESSORS.outcomes(s, op_id)
+
+#------------------
+# Policy Maker operators
+def expand_public_coverage(s):
+    return apply_operator(s, OP_EXPAND_PUBLIC_COVERAGE)
+
+def subsidize_coverage(s):
+    return apply_operator(s, OP_SUBSIDIZE_COVERAGE)
+
+def request_funds(s):
+    return apply_operator(s, OP_REQUEST_FUNDS)
+
 def cap_premiums(s):
-    new_s = State(s)
-    add_to_next_transition(int_to_name(s.whose_turn)+" caps insurance premiums.", new_s)
-    new_s.access_gap_index = clamp(s.access_gap_index - 2, 0, 100)
-    add_to_next_transition("Access gap decreased to "+str(new_s.access_gap_index)+".", new_s)
-    new_s.public_trust_meter = clamp(s.public_trust_meter + 5, 0, 100)
-    add_to_next_transition("Public trust increased to "+str(new_s.public_trust_meter)+".", new_s)
-    new_s.influence_meter = clamp(s.influence_meter - 8, 0, 100)
-    add_to_next_transition("Insurer's influence decreased to to "+str(new_s.influence_meter)+".", new_s)
-    new_s.uninsured_rate = clamp(s.uninsured_rate - 0.2, 0, 100)
-    add_to_next_transition("Uninsured rate decreased to "+"%.1f"%new_s.uninsured_rate+"%.", new_s)
-    new_s.premium_cap_turns_left = 3  # Insurer can't raise premiums for 3 turns
-    new_s.budget = clamp(s.budget - 11, 0, 200)
-    add_to_next_transition("Budget decreased to $"+str(new_s.budget)+" billions.", new_s)
-    update_turn(new_s)
-    return new_s
+    return apply_operator(s, OP_CAP_PREMIUMS)
 
 def mandate_coverage(s):
-    new_s = State(s)
-    add_to_next_transition(int_to_name(s.whose_turn)+" mandates coverage.", new_s)
-    new_s.access_gap_index = clamp(s.access_gap_index - 4, 0, 100)
-    add_to_next_transition("Access gap decreased to "+str(new_s.access_gap_index)+".", new_s)
-    new_s.public_trust_meter = clamp(s.public_trust_meter - 2, 0, 100)  # Some public backlash
-    add_to_next_transition("Public trust decreased to "+str(new_s.public_trust_meter)+".", new_s)
-    new_s.uninsured_rate = clamp(s.uninsured_rate - 1.0, 0, 100)
-    add_to_next_transition("Uninsured rate decreased to "+"%.1f"%new_s.uninsured_rate+"%.", new_s)
-    new_s.public_health_index = clamp(s.public_health_index + 3, 0, 100)
-    add_to_next_transition("Public health index increased to "+str(new_s.public_health_index)+".", new_s)
-    new_s.budget = clamp(s.budget - 7, 0, 200)
-    add_to_next_transition("Budget decreased to $"+str(new_s.budget)+" billions.", new_s)
-    update_turn(new_s)
-    return new_s
+    return apply_operator(s, OP_MANDATE_COVERAGE)
 
 def invest_in_clinics(s):
-    new_s = State(s)
-    add_to_next_transition(int_to_name(s.whose_turn)+" invests in public clinics.", new_s)
-    new_s.access_gap_index = clamp(s.access_gap_index - 3, 0, 100)
-    add_to_next_transition("Access gap decreased to "+str(new_s.access_gap_index)+".", new_s)
-    new_s.public_health_index = clamp(s.public_health_index + 6, 0, 100)
-    add_to_next_transition("Public health index increased to "+str(new_s.public_health_index)+".", new_s)
-    new_s.uninsured_rate = clamp(s.uninsured_rate - 0.4, 0, 100)
-    add_to_next_transition("Uninsured rate decreased to "+"%.1f"%new_s.uninsured_rate+"%.", new_s)
-    new_s.public_trust_meter = clamp(s.public_trust_meter + 4, 0, 100)
-    add_to_next_transition("Public trust increased to "+str(new_s.public_trust_meter)+".", new_s)
-    new_s.budget = clamp(s.budget - 15, 0, 200)
-    add_to_next_transition("Budget decreased to $"+str(new_s.budget)+" billions.", new_s)
-    update_turn(new_s)
-    return new_s
+    return apply_operator(s, OP_INVEST_IN_CLINICS)
 
 #------------------
 # Insurance Company operators
 def raise_premiums(s):
-    new_s = State(s)
-    add_to_next_transition(int_to_name(s.whose_turn)+" raises premiums.", new_s)
-    new_s.profit = clamp(s.profit + 6, 0, 200)
-    add_to_next_transition("Insurer's profit increased to "+str(new_s.profit)+" billions.", new_s)
-    new_s.access_gap_index = clamp(s.access_gap_index + 3, 0, 100)
-    add_to_next_transition("Access gap increased to "+str(new_s.access_gap_index)+".", new_s)
-    new_s.uninsured_rate = clamp(s.uninsured_rate + 0.8, 0, 100)
-    add_to_next_transition("Uninsured rate increased to "+"%.1f"%new_s.uninsured_rate+"%.", new_s)
-    new_s.public_health_index = clamp(s.public_health_index - 2, 0, 100)
-    add_to_next_transition("Public health index decreased to "+str(new_s.public_health_index)+".", new_s)
-    new_s.influence_meter = clamp(s.influence_meter - 2, 0, 100)  # Public backlash
-    add_to_next_transition("Insurer's influence increased to "+str(new_s.influence_meter)+".", new_s)
-    new_s.last_lobbied += 1
-    update_turn(new_s)
-    return new_s
+    return apply_operator(s, OP_RAISE_PREMIUMS)
 
 def risk_selection(s):
-    new_s = State(s)
-    add_to_next_transition(int_to_name(s.whose_turn)+" engages in risk selection.", new_s)
-    new_s.access_gap_index = clamp(s.access_gap_index + 6, 0, 100)
-    add_to_next_transition("Access gap increased to "+str(new_s.access_gap_index)+".", new_s)
-    new_s.influence_meter = clamp(s.influence_meter - 4, 0, 100)
-    add_to_next_transition("Insurer's influence decreased to "+str(new_s.influence_meter)+".", new_s)
-    new_s.uninsured_rate = clamp(s.uninsured_rate + 0.6, 0, 100)
-    add_to_next_transition("Uninsured rate increased to "+"%.1f"%new_s.uninsured_rate+"%.", new_s)
-    new_s.profit = clamp(s.profit + 5, 0, 200)
-    add_to_next_transition("Insurer's profit increased to "+str(new_s.profit)+" billions.", new_s)
-    new_s.public_health_index = clamp(s.public_health_index - 4, 0, 100)
-    add_to_next_transition("Public health index decreased to "+str(new_s.public_health_index)+".", new_s)
-    new_s.last_lobbied += 1
-    update_turn(new_s)
-    return new_s
+    return apply_operator(s, OP_RISK_SELECTION)
 
 def narrow_provider_network(s):
-    new_s = State(s)
-    add_to_next_transition(int_to_name(s.whose_turn)+" narrows provider network.", new_s)
-    new_s.access_gap_index = clamp(s.access_gap_index + 5, 0, 100)
-    add_to_next_transition("Access gap increased to "+str(new_s.access_gap_index)+".", new_s)
-    new_s.influence_meter = clamp(s.influence_meter - 3, 0, 100)
-    add_to_next_transition("Insurer's influence decreased to "+str(new_s.influence_meter)+".", new_s)
-    new_s.uninsured_rate = clamp(s.uninsured_rate + 0.8, 0, 100)
-    add_to_next_transition("Uninsured rate increased to "+"%.1f"%new_s.uninsured_rate+"%.", new_s)
-    new_s.profit = clamp(s.profit + 3, 0, 200)
-    add_to_next_transition("Insurer's profit increased to "+str(new_s.profit)+" billions.", new_s)
-    new_s.public_health_index = clamp(s.public_health_index - 4, 0, 100)
-    add_to_next_transition("Public health index decreased to "+str(new_s.public_health_index)+".", new_s)
-    new_s.last_lobbied += 1
-    update_turn(new_s)
-    return new_s
+    return apply_operator(s, OP_NARROW_PROVIDER_NETWORK)
 
 def lobby_government(s):
-    new_s = State(s)
-    add_to_next_transition(int_to_name(s.whose_turn)+" lobbies government, causing policymaker to lose a turn.", new_s)
-    new_s.access_gap_index = clamp(s.access_gap_index + 3, 0, 100)
-    add_to_next_transition("Access gap increased to "+str(new_s.access_gap_index)+".", new_s)
-    new_s.uninsured_rate = clamp(s.uninsured_rate + 0.6, 0, 100)
-    add_to_next_transition("Uninsured rate increased to "+"%.1f"%new_s.uninsured_rate+"%.", new_s)
-    new_s.public_health_index = clamp(s.public_health_index - 4, 0, 100)
-    add_to_next_transition("Public health index decreased to "+str(new_s.public_health_index)+".", new_s)
-    new_s.public_trust_meter = clamp(s.public_trust_meter - 5, 0, 100)
-    add_to_next_transition("Public trust decreased to "+str(new_s.public_trust_meter)+".", new_s)
-    new_s.influence_meter = clamp(s.influence_meter + 5, 0, 100)
-    add_to_next_transition("Insurer's influence increased to "+str(new_s.influence_meter)+".", new_s)
-    # Skip policymaker's next turn
-    new_s.skip_next_turn = True
-    new_s.last_lobbied = 0
-    update_turn(new_s)
-    return new_s
+    return apply_operator(s, OP_LOBBY_GOVERNMENT)
 
 def misinformation_campaigns(s):
-    new_s = State(s)
-    add_to_next_transition(int_to_name(s.whose_turn)+" launches misinformation campaigns.", new_s)
-    new_s.access_gap_index = clamp(s.access_gap_index + 3, 0, 100)
-    add_to_next_transition("Access gap increased to "+str(new_s.access_gap_index)+".", new_s)
-    new_s.influence_meter = clamp(s.influence_meter + 8, 0, 100)
-    add_to_next_transition("Insurer's influence increased to "+str(new_s.influence_meter)+".", new_s)
-    new_s.uninsured_rate = clamp(s.uninsured_rate + 0.3, 0, 100)
-    add_to_next_transition("Uninsured rate increased to "+"%.1f"%new_s.uninsured_rate+"%.", new_s)
-    new_s.profit = clamp(s.profit - 3, 0, 200)  # Campaigns cost money
-    add_to_next_transition("Insurer's profit decreased to "+str(new_s.profit)+" billions.", new_s)
-    new_s.public_trust_meter = clamp(s.public_trust_meter - 3, 0, 100)  # Reduce policymaker trust
-    add_to_next_transition("Public trust decreased to "+str(new_s.public_trust_meter)+".", new_s)
-    new_s.last_lobbied += 1
-    update_turn(new_s)
-    return new_s
+    return apply_operator(s, OP_MISINFORMATION_CAMPAIGNS)
 
 def prevent_expansion(s):
-    new_s = State(s)
-    add_to_next_transition(int_to_name(s.whose_turn)+" uses intercepted funds to prevent public coverage expansion for 3 turns.", new_s)
-    new_s.public_expansion_cap_turns_left = 2
-    new_s.profit = clamp(s.profit + 10, 0, 200)
-    add_to_next_transition("Insurer's profit increased to "+str(new_s.profit)+".", new_s)
-    new_s.influence_meter = clamp(s.influence_meter + 8, 0, 100)
-    add_to_next_transition("Insurer's influence increased to "+str(new_s.influence_meter)+".", new_s)
-    new_s.bribe_choice_active = False # Reset the flag
-    new_s.skip_next_turn = True   # the Insurer still gets their regular turn in addition to the bribe
-    update_turn(new_s)
-    return new_s
+    return apply_operator(s, OP_PREVENT_EXPANSION)
 
 def fund_misinformation_with_bribe(s):
-    new_s = State(s)
-    add_to_next_transition(int_to_name(s.whose_turn)+" uses intercepted funds to launch a misinformation campaign.", new_s)
-    new_s.public_trust_meter = clamp(s.public_trust_meter - 9, 0, 100)
-    add_to_next_transition("Public trust decreased to "+str(new_s.public_trust_meter)+".", new_s)
-    new_s.profit = clamp(s.profit + 10, 0, 200)
-    add_to_next_transition("Insurer's profit increased to "+str(new_s.profit)+" billions.", new_s)
-    new_s.influence_meter = clamp(s.influence_meter + 8, 0, 100)
-    add_to_next_transition("Insurer's influence increased to "+str(new_s.influence_meter)+".", new_s)
-    new_s.bribe_choice_active = False # Reset the flag
-    new_s.skip_next_turn = True   # the Insurer still gets their regular turn in addition to the bribe
-    update_turn(new_s)
-    return new_s
-  
+    return apply_operator(s, OP_FUND_MISINFORMATION)
+
 def turn_pass(s):
-    new_s = State(s)
-    add_to_next_transition(int_to_name(s.whose_turn)+" passes.", new_s)
-    if new_s.whose_turn == POLICY_MAKER:
-        new_s.public_trust_meter = clamp(s.public_trust_meter - 5, 0, 100)
-        if new_s.access_gap_index >= 30:
-            new_s.access_gap_index = clamp(s.access_gap_index + 1, 0, 100)
-        if new_s.influence_meter >= 80:
-            new_s.access_gap_index = clamp(s.access_gap_index + 2, 0, 100)
-    if new_s.whose_turn == INSURANCE_COMPANY:
-        new_s.influence_meter = clamp(s.influence_meter - 5, 0, 100)
-        if new_s.influence_meter <= 65:
-            new_s.profit = clamp(s.profit - 2, 0, 100)
-    update_turn(new_s)
-    return new_s
-    
+    if s.whose_turn == POLICY_MAKER:
+        return apply_operator(s, OP_PM_PASS)
+    return apply_operator(s, OP_IC_PASS)
 
 #------------------
 # Precondition functions
 def can_expand_coverage(s):
-    return s.whose_turn == POLICY_MAKER and s.budget >= 20 \
-    and s.public_expansion_cap_turns_left <= 0
+    return can_apply(s, OP_EXPAND_PUBLIC_COVERAGE)
+
 def can_subsidize(s):
-    return s.whose_turn == POLICY_MAKER and s.budget >= 14
+    return can_apply(s, OP_SUBSIDIZE_COVERAGE)
 
 def can_request_funds(s):
-    return s.whose_turn == POLICY_MAKER
+    return can_apply(s, OP_REQUEST_FUNDS)
 
 def can_cap_premiums(s):
-    return s.whose_turn == POLICY_MAKER and s.budget >= 14
+    return can_apply(s, OP_CAP_PREMIUMS)
 
 def can_mandate_coverage(s):
-    return s.whose_turn == POLICY_MAKER and s.budget >= 10
+    return can_apply(s, OP_MANDATE_COVERAGE)
 
 def can_invest_clinics(s):
-    return s.whose_turn == POLICY_MAKER and s.budget >= 18
+    return can_apply(s, OP_INVEST_IN_CLINICS)
 
 def can_raise_premiums(s):
-    return s.whose_turn == INSURANCE_COMPANY and s.premium_cap_turns_left <= 0
+    return can_apply(s, OP_RAISE_PREMIUMS)
 
 def can_risk_select(s):
-    return s.whose_turn == INSURANCE_COMPANY
+    return can_apply(s, OP_RISK_SELECTION)
 
 def can_narrow_network(s):
-    return s.whose_turn == INSURANCE_COMPANY
+    return can_apply(s, OP_NARROW_PROVIDER_NETWORK)
 
 def can_lobby(s):
-    return s.whose_turn == INSURANCE_COMPANY and s.influence_meter >= 75 and s.last_lobbied >= 3
+    return can_apply(s, OP_LOBBY_GOVERNMENT)
 
 def can_misinformation(s):
-    return s.whose_turn == INSURANCE_COMPANY and s.profit >= 3
+    return can_apply(s, OP_MISINFORMATION_CAMPAIGNS)
 
 def can_bribe_prevent_expansion(s):
-    return s.whose_turn == INSURANCE_COMPANY and s.bribe_choice_active
+    return can_apply(s, OP_PREVENT_EXPANSION)
 
 def can_bribe_fund_misinformation(s):
-    return s.whose_turn == INSURANCE_COMPANY and s.bribe_choice_active
+    return can_apply(s, OP_FUND_MISINFORMATION)
 
 def p_can_pass(s):
-    return s.whose_turn == POLICY_MAKER
+    return can_apply(s, OP_PM_PASS)
 
 def i_can_pass(s):
-    return s.whose_turn == INSURANCE_COMPANY
+    return can_apply(s, OP_IC_PASS)
 
 #------------------
 #<OPERATORS>
@@ -610,6 +1076,13 @@ INSURANCE_COMPANY_OPS = [Operator("Raise Premiums",\
 
 OPERATORS = POLICY_MAKER_OPS + INSURANCE_COMPANY_OPS    # Operators for Insurance Companies
 
+# A distinct label per operator, for timings and benchmark results: its
+# name, with the role added where both roles share the name ("Pass").
+OPERATOR_LABELS = tuple(
+  op.name if [o.name for o in OPERATORS].count(op.name) == 1
+  else op.name + " (" + int_to_name(EFFECTS[i].role) + ")"
+  for i, op in enumerate(OPERATORS))
+
 #</OPERATORS>
     
 #</COMMON_CODE>
@@ -0,0 +1,97 @@
+'''
+Healthcare_Assets.py
+Build step for the card images shown in the Coverage Clash SVG view.
+
+The view draws every card at IMAGE_WIDTH*IMAGE_SCALE by
+IMAGE_HEIGHT*IMAGE_SCALE pixels, but the files in Images/ are larger (and
+the SVG scales them down in the browser). This script writes, next to the
+originals, a copy of each card in CARD_IMAGES fitted to the displayed box
+(keeping its aspect ratio, as the SVG does) and saved as WebP. Each output
+name carries a hash of its bytes, e.g. "Cap-Premiums.1f3a5c7e9b.webp", so
+the server can send them with a far-future cache lifetime: a changed image
+gets a new name.
+
+Images/card_manifest.json maps each original filename to its built file;
+Healthcare_SVG_FOR_BRIFL.card_href resolves CARD_IMAGES through it and
+falls back to the original when an image has no entry. Files from a
+previous build that the new manifest no longer lists are removed.
+
+Requires Pillow (with WebP support) to build; the view itself only reads
+the manifest.
+
+Usage:
+  python Healthcare_Assets.py [density] [quality]
+density 2 builds images at twice the displayed size for high-DPI screens.
+'''
+
+import hashlib
+import io
+import json
+import os
+import sys
+
+from PIL import Image, ImageOps
+
+import Healthcare_SVG_FOR_BRIFL as vis
+
+IMAGE_DIR = vis.IMAGE_DIR
+MANIFEST_PATH = vis.MANIFEST_PATH
+DEFAULT_QUALITY = 80
+
+def display_size(density=1):
+    """Pixel box a card is drawn into"""
+    return (round(vis.IMAGE_WIDTH * vis.IMAGE_SCALE * density),
+            round(vis.IMAGE_HEIGHT * vis.IMAGE_SCALE * density))
+
+def encode_card(path, size, quality=DEFAULT_QUALITY):
+    """WebP bytes of the image at path fitted into size"""
+    with Image.open(path) as im:
+        im = ImageOps.contain(im, size, Image.LANCZOS)
+        buf = io.BytesIO()
+        im.save(buf, 'WEBP', quality=quality, method=6)
+    return buf.getvalue()
+
+def hashed_name(filename, data):
+    stem = os.path.splitext(filename)[0].replace(' ', '-')
+    return f"{stem}.{hashlib.sha256(data).hexdigest()[:10]}.webp"
+
+def build(density=1, quality=DEFAULT_QUALITY):
+    """Build every card image and write the manifest; returns the manifest"""
+    old = vis.read_manifest()
+    size = display_size(density)
+    images = {}
+    for filename in sorted(set(vis.CARD_IMAGES.values())):
+        data = encode_card(os.path.join(IMAGE_DIR, filename), size, quality)
+        name = hashed_name(filename, data)
+        path = os.path.join(IMAGE_DIR, name)
+        if not os.path.exists(path):
+            with open(path, 'wb') as f:
+                f.write(data)
+        images[filename] = name
+    for name in set(old.values()) - set(images.values()):
+        try:
+            os.remove(os.path.join(IMAGE_DIR, name))
+        except FileNotFoundError:
+            pass
+    manifest = {'size': list(size), 'quality': quality, 'images': images}
+    with open(MANIFEST_PATH, 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+        f.write('\n')
+    vis.load_manifest()
+    return images
+
+def main(argv):
+    density = float(argv[1]) if len(argv) > 1 else 1
+    quality = int(argv[2]) if len(argv) > 2 else DEFAULT_QUALITY
+    images = build(density, quality)
+    before = after = 0
+    for filename, name in sorted(images.items()):
+        a = os.path.getsize(os.path.join(IMAGE_DIR, filename))
+        b = os.path.getsize(os.path.join(IMAGE_DIR, name))
+        before += a
+        after += b
+        print(f"{filename:<26} {a:>8,} -> {b:>7,} bytes  {name}")
+    print(f"total {before:,} -> {after:,} bytes, cards {display_size(density)} px")
+
+if __name__ == '__main__':
+    main(sys.argv)
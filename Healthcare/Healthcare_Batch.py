@@ -0,0 +1,312 @@
+'''
+Healthcare_Batch.py
+NumPy kernels for Coverage Clash driven by the operator effect table in
+Healthcare.py (EFFECTS, METRIC_BOUNDS).
+
+A batch of games is held as a dict of columns: one 1-D array per numeric
+State field, with one entry per game.  apply_effects_batch applies one
+operator's effects to every selected game at once, exactly like the
+scalar kernel apply_effect does for a single State.
+
+BatchState wraps such a dict with vectorized versions of find_any_win,
+the preconditions and update_turn (bonus and skipped turns included), so
+very large numbers of games can be stepped in lockstep; games that have
+finished are masked out of later steps.
+
+Usage:
+  python Healthcare_Batch.py [games] [seed]
+'''
+
+import sys
+import time
+
+import numpy as np
+
+import Healthcare as prob
+from Healthcare_Sim import BOTH_LOSE, DRAW, MAX_TURNS, RESULT_KEYS, merge_results, new_results
+
+# current_role and win are strings derived from other fields, so they are
+# not stored as columns; states_from_columns rebuilds them.
+BATCH_FIELDS = tuple(f for f in prob.STATE_FIELDS if f not in ('current_role', 'win'))
+FLOAT_FIELDS = ('uninsured_rate',)
+BOOL_FIELDS = ('skip_next_turn', 'bribe_choice_active',
+               'policymaker_bonus_turn_used_55',
+               'policymaker_bonus_turn_used_62',
+               'policymaker_bonus_turn_used_72')
+
+def field_dtype(field):
+    if field in FLOAT_FIELDS:
+        return np.float64
+    if field in BOOL_FIELDS:
+        return np.bool_
+    return np.int32
+
+def columns_from_states(states):
+    # Packs a sequence of States into a dict of columns.
+    return {field: np.array([getattr(s, field) for s in states], dtype=field_dtype(field))
+            for field in BATCH_FIELDS}
+
+def states_from_columns(cols):
+    # Unpacks a dict of columns into a list of States.
+    n = len(cols['whose_turn'])
+    states = []
+    for i in range(n):
+        s = prob.create_initial_state()
+        for field in BATCH_FIELDS:
+            setattr(s, field, cols[field][i].item())
+        s.current_role = prob.int_to_name(s.current_role_num)
+        s.win = ""
+        states.append(s)
+    return states
+
+def in_range(values, low, high):
+    # Vectorized form of the (field, low, high) tests in EFFECTS.
+    result = np.ones(len(values), dtype=bool)
+    if low is not None:
+        result &= values >= low
+    if high is not None:
+        result &= values <= high
+    return result
+
+def clip_metric(values, metric):
+    # Clamps and, like apply_effect, rounds to METRIC_DECIMALS, so the
+    # uninsured test in WIN_CONDITIONS sees the same values as the scalar
+    # kernel.
+    low, high = prob.METRIC_BOUNDS[metric]
+    if metric in prob.METRIC_DECIMALS:
+        values = np.round(values, prob.METRIC_DECIMALS[metric])
+    return np.clip(values, low, high)
+
+def effect_updates(cols, e, updates=None):
+    # New values of the fields written by effect e, computed from cols
+    # (the games before the move).  Mirrors Healthcare.apply_effect; the
+    # result maps field -> full-length array and ignores any mask.
+    if updates is None:
+        updates = {}
+    for metric, delta in e.deltas:
+        updates[metric] = clip_metric(cols[metric] + delta, metric)
+    if e.cost is not None:
+        metric, amount = e.cost
+        updates[metric] = clip_metric(cols[metric] - amount, metric)
+    for (field, low_test, high_test), metric, delta in e.when:
+        test = in_range(cols[field], low_test, high_test)
+        updates[metric] = np.where(test, clip_metric(cols[metric] + delta, metric),
+                                   updates.get(metric, cols[metric]))
+    for field, value in e.sets:
+        updates[field] = np.full(len(cols[field]), value, dtype=cols[field].dtype)
+    for field, amount in e.adds:
+        updates[field] = updates.get(field, cols[field]) + amount
+    return updates
+
+def roll_outcomes(e, n, rng):
+    # Chance outcome index per game, with the probabilities in e.chance.
+    cumulative = np.cumsum([probability for probability, _ in e.chance])
+    outcomes = np.searchsorted(cumulative, rng.random(n), side='right')
+    return np.minimum(outcomes, len(e.chance) - 1)
+
+class _Rows(dict):
+    # The selected rows of a dict of columns, gathered on first use.
+    def __init__(self, cols, index):
+        dict.__init__(self)
+        self.cols = cols
+        self.index = index
+
+    def __missing__(self, field):
+        values = self[field] = self.cols[field][self.index]
+        return values
+
+def apply_effects_batch(cols, op_id, mask=None, rng=None, outcome=None):
+    # Applies the effects of operator op_id, in place, to the games
+    # selected by mask (all games by default).  The turn is not advanced.
+    # For a chance operator the outcome of each game is rolled with rng
+    # (a numpy Generator), unless outcome forces one for every game; the
+    # array of outcomes for the selected games is returned (None for
+    # deterministic operators).  Only the selected rows are computed, so
+    # the cost grows with the number of games the operator is applied to.
+    e = prob.EFFECTS[op_id]
+    index = None
+    if mask is not None:
+        index = np.flatnonzero(mask)
+        cols, full = _Rows(cols, index), cols
+    n = len(cols['whose_turn'])
+    updates = effect_updates(cols, e)
+    outcomes = None
+    if e.chance:
+        if outcome is not None:
+            outcomes = np.full(n, outcome)
+        else:
+            if rng is None:
+                rng = np.random.default_rng()
+            outcomes = roll_outcomes(e, n, rng)
+        merged = dict(updates)
+        for k, (_, outcome_effect) in enumerate(e.chance):
+            picked = outcomes == k
+            for field, values in effect_updates(cols, outcome_effect, dict(updates)).items():
+                merged[field] = np.where(picked, values, merged.get(field, cols[field]))
+        updates = merged
+    if index is None:
+        for field, values in updates.items():
+            cols[field][:] = values
+    else:
+        for field, values in updates.items():
+            full[field][index] = values
+    return outcomes
+
+#------------------
+# Win/lose conditions of Healthcare.terminal_status, in the same order,
+# with the winner each one produces.
+WIN_CONDITIONS = (
+    (lambda c: c['access_gap_index'] < 13, prob.POLICY_MAKER),
+    (lambda c: c['profit'] > 85, prob.INSURANCE_COMPANY),
+    (lambda c: c['uninsured_rate'] > 17.8, BOTH_LOSE),
+    (lambda c: c['public_health_index'] < 30, BOTH_LOSE),
+    (lambda c: c['access_gap_index'] > 45, prob.INSURANCE_COMPANY),
+    (lambda c: c['public_trust_meter'] < 30, prob.INSURANCE_COMPANY),
+)
+
+class BatchState:
+    # Structure-of-arrays state for n games played in lockstep: n games
+    # from the initial state, or the games held in cols.
+    def __init__(self, n=None, cols=None):
+        if cols is None:
+            if n is None:
+                raise ValueError("BatchState needs a number of games or columns")
+            cols = columns_from_states([prob.create_initial_state()])
+            cols = {field: np.repeat(values, n) for field, values in cols.items()}
+        self.cols = cols
+        self.n = len(cols['whose_turn'])
+        self.done = np.zeros(self.n, dtype=bool)
+        self.outcome = np.full(self.n, DRAW, dtype=np.int32)
+        self.moves = np.zeros(self.n, dtype=np.int32)
+        self.dropped = new_results()  # tallies of games removed by compact()
+
+    @classmethod
+    def from_states(cls, states):
+        return cls(cols=columns_from_states(states))
+
+    def to_states(self):
+        return states_from_columns(self.cols)
+
+    def __getattr__(self, name):
+        # Columns read like State attributes: batch.access_gap_index, ...
+        try:
+            return self.__dict__['cols'][name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def find_any_win(self):
+        # Returns (over, winner): whether each game has reached a win/lose
+        # condition, and the winner (BOTH_LOSE if both sides lost; DRAW
+        # where the game is not over).
+        c = self.cols
+        tests = [test(c) for test, _ in WIN_CONDITIONS]
+        winner = np.select(tests, [w for _, w in WIN_CONDITIONS], default=DRAW)
+        return winner != DRAW, winner
+
+    def can_apply(self, op_id):
+        # Vectorized Healthcare.can_apply.
+        e = prob.EFFECTS[op_id]
+        c = self.cols
+        ok = c['whose_turn'] == e.role
+        for field, minimum in e.at_least:
+            ok &= c[field] >= minimum
+        for field, maximum in e.at_most:
+            ok &= c[field] <= maximum
+        return ok
+
+    def legal_mask(self):
+        # (n, len(OPERATORS)) boolean array of applicable operators.
+        return np.stack([self.can_apply(i) for i in range(len(prob.OPERATORS))], axis=1)
+
+    def update_turn(self, mask):
+        # Vectorized Healthcare.update_turn for the games in mask.
+        c = self.cols
+        skip = mask & c['skip_next_turn']
+        c['skip_next_turn'][skip] = False
+        rest = mask & ~skip
+        # Bonus turns for the Policy Maker, highest threshold first.
+        pm = rest & (c['whose_turn'] == prob.POLICY_MAKER)
+        bonus = np.zeros(self.n, dtype=bool)
+        for threshold in (72, 62, 55):
+            used = c['policymaker_bonus_turn_used_%d' % threshold]
+            earned = pm & ~bonus & (c['public_trust_meter'] >= threshold) & ~used
+            used[earned] = True
+            bonus |= earned
+        advance = rest & ~bonus
+        turn = c['whose_turn']
+        turn[advance] = 1 - turn[advance]
+        c['current_role_num'][advance] = turn[advance]
+        cap = c['premium_cap_turns_left']
+        cap[advance & (cap > 0) & (turn == prob.POLICY_MAKER)] -= 1
+
+    def step(self, op_ids, rng=None):
+        # Applies op_ids[i] (an index into OPERATORS) to every game that is
+        # still running, advances the turn, and marks finished games.
+        active = ~self.done
+        for op_id in np.unique(op_ids[active]):
+            apply_effects_batch(self.cols, int(op_id), active & (op_ids == op_id), rng)
+        self.update_turn(active)
+        self.moves[active] += 1
+        over, winner = self.find_any_win()
+        finished = active & over
+        self.outcome[finished] = winner[finished]
+        self.done |= finished
+
+    def random_moves(self, rng):
+        # One uniformly random legal operator per game (-1 if none).
+        legal = self.legal_mask()
+        scores = rng.random(legal.shape) * legal
+        moves = scores.argmax(axis=1)
+        moves[~legal.any(axis=1)] = -1
+        return moves
+
+    def compact(self):
+        # Drops finished games from the columns so later steps only touch
+        # running games.  Their outcomes are kept in the tallies that
+        # results() reports.
+        finished = self.done
+        self.dropped = merge_results(self.dropped, self._tally(finished))
+        keep = ~finished
+        self.cols = {field: values[keep] for field, values in self.cols.items()}
+        self.done = self.done[keep]
+        self.outcome = self.outcome[keep]
+        self.moves = self.moves[keep]
+        self.n = len(self.done)
+
+    def _tally(self, selected):
+        results = new_results()
+        results['games'] = int(selected.sum())
+        results['moves'] = int(self.moves[selected].sum())
+        for code, key in RESULT_KEYS.items():
+            results[key] = int((self.outcome[selected] == code).sum())
+        return results
+
+    def results(self):
+        # Aggregate statistics in the format of Healthcare_Sim.run_games,
+        # covering compacted games too.
+        return merge_results(self.dropped, self._tally(np.ones(self.n, dtype=bool)))
+
+def run_random_games(n, seed=None, max_turns=MAX_TURNS):
+    # Plays n random-vs-random games in lockstep and returns statistics.
+    rng = np.random.default_rng(seed)
+    batch = BatchState(n)
+    for _ in range(max_turns):
+        if batch.done.any():
+            batch.compact()
+        if batch.n == 0:
+            break
+        batch.step(batch.random_moves(rng), rng)
+    return batch.results()
+
+def main(argv):
+    from Healthcare_Sim import format_results
+    n = int(argv[1]) if len(argv) > 1 else 1000000
+    seed = int(argv[2]) if len(argv) > 2 else 0
+    t0 = time.perf_counter()
+    results = run_random_games(n, seed)
+    elapsed = time.perf_counter() - t0
+    print(format_results(results))
+    print(f"{n} games in {elapsed:.2f}s ({n / elapsed * 60:,.0f} games/minute)")
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,37 @@
+# Purpose: Minimal stand-ins for the SOLUZION5 base classes so that
+# Healthcare.py can be imported by headless tools (batch simulation,
+# search, benchmarks) on machines without a SOLUZION install.
+# Only the parts of the API that Healthcare.py relies on are provided.
+
+class Basic_State:
+    # No instance attributes of its own, so slotted subclasses such as
+    # Healthcare.State get no per-instance __dict__.
+    __slots__ = ()
+
+    def __init__(self, old=None):
+        pass
+
+    def is_goal(self):
+        return False
+
+    def goal_message(self):
+        return "Game continues."
+
+class Basic_Operator:
+    def __init__(self, name, precond=(lambda s: True), state_transf=(lambda s: s)):
+        self.name = name
+        self.precond = precond
+        self.state_transf = state_transf
+
+    def is_applicable(self, s):
+        return self.precond(s)
+
+    def apply(self, s):
+        return self.state_transf(s)
+
+class ROLES_List(list):
+    pass
+
+def add_to_next_transition(msg, s):
+    # Nobody reads transition messages when running headless.
+    pass
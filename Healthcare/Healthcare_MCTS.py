@@ -0,0 +1,183 @@
+'''
+Healthcare_MCTS.py
+Monte Carlo Tree Search player for Coverage Clash.
+
+UCT selection over the operators of the side to move (read from
+whose_turn, so bonus and skipped turns need no special casing), with the
+interception roll of request_funds sampled as a chance outcome below the
+action.  Leaves are evaluated by random playouts on the headless
+apply_operator kernel with narration switched off; a playout that has not
+finished after ROLLOUT_LIMIT moves is scored with the heuristic of
+Healthcare_Search.py.  The game is lopsided enough that full random
+playouts are nearly always Insurance Company wins and tell the Policy
+Maker little, so short playouts play much better.  Rewards follow the
+convention of Healthcare_Search.py: a win is worth 1, a loss 0, and a
+result where both sides lose 1/2.
+
+The tree is kept between moves: when the player is asked to move again
+it looks for the new position a few plies below its previous root and
+reuses that subtree.
+
+MCTSPlayer.choose_operator(s) returns an index into OPERATORS;
+agent_move(s) returns the Operator itself for a SOLUZION role agent, and
+mcts_policy plugs into Healthcare_Sim.run_games.
+'''
+
+import math
+import random
+import time
+
+import Healthcare as prob
+from Healthcare_Search import evaluate, terminal_value
+
+EXPLORATION = 1.4
+ROLLOUT_LIMIT = 10    # moves before a playout falls back to the heuristic
+REUSE_DEPTH = 4       # plies searched below the old root for the new position
+
+class Node:
+    __slots__ = ('state', 'to_move', 'terminal', 'untried', 'stats', 'children', 'visits')
+
+    def __init__(self, state, rng):
+        self.state = state
+        self.to_move = state.whose_turn
+        self.terminal = terminal_value(state)
+        if self.terminal is None:
+            self.untried = list(prob.legal_op_ids(state))
+            rng.shuffle(self.untried)
+        else:
+            self.untried = []
+        self.stats = {}      # op_id -> [visits, total reward for to_move]
+        self.children = {}   # (op_id, chance outcome or None) -> Node
+        self.visits = 0
+
+def reward(value, role):
+    # Maps a Policy Maker value in [-1, 1] to a reward in [0, 1] for role.
+    if role == prob.POLICY_MAKER:
+        return (value + 1) / 2
+    return (1 - value) / 2
+
+def rollout(s, rng, limit=ROLLOUT_LIMIT):
+    # Plays uniformly random moves from s; returns the Policy Maker value.
+    for _ in range(limit):
+        value = terminal_value(s)
+        if value is not None:
+            return value
+        moves = prob.legal_op_ids(s)
+        s = prob.SUCCESSORS.apply(s, moves[int(rng.random() * len(moves))])
+    return evaluate(s)
+
+class MCTSPlayer:
+    def __init__(self, time_budget=0.05, playouts=None, exploration=EXPLORATION,
+                 seed=None, rng=None):
+        # Thinks for time_budget seconds per move, or for a fixed number of
+        # playouts if playouts is given (reproducible with a seed).
+        self.time_budget = time_budget
+        self.playouts = playouts
+        self.exploration = exploration
+        self.rng = rng if rng is not None else random.Random(seed)
+        self.root = None
+        self.total_playouts = 0
+
+    def _reuse(self, s):
+        # Finds s at most REUSE_DEPTH plies below the current root.
+        if self.root is None:
+            return None
+        key = s.key()
+        level = [self.root]
+        for _ in range(REUSE_DEPTH + 1):
+            next_level = []
+            for node in level:
+                if node.state.key() == key:
+                    return node
+                next_level.extend(node.children.values())
+            level = next_level
+        return None
+
+    def _select_op(self, node):
+        log_n = math.log(node.visits)
+        best, best_score = None, -1.0
+        for op_id, (visits, total) in node.stats.items():
+            score = total / visits + self.exploration * math.sqrt(log_n / visits)
+            if score > best_score:
+                best, best_score = op_id, score
+        return best
+
+    def _child(self, node, op_id):
+        # Follows op_id from node, sampling its chance outcome if it has
+        # one; creates the child on first visit.  Returns (child, created).
+        e = prob.EFFECTS[op_id]
+        outcome = prob.roll_outcome(e) if e.chance else None
+        child = node.children.get((op_id, outcome))
+        if child is not None:
+            return child, False
+        child = Node(prob.apply_operator(node.state, op_id, outcome), self.rng)
+        node.children[(op_id, outcome)] = child
+        return child, True
+
+    def playout(self, root):
+        # One selection / expansion / rollout / backup pass.
+        node = root
+        path = []
+        while node.terminal is None:
+            if node.untried:
+                op_id = node.untried.pop()
+                node.stats[op_id] = [0, 0.0]
+            else:
+                op_id = self._select_op(node)
+            path.append((node, op_id))
+            node, created = self._child(node, op_id)
+            if created:
+                break
+        value = node.terminal if node.terminal is not None else rollout(node.state, self.rng)
+        for parent, op_id in path:
+            stats = parent.stats[op_id]
+            stats[0] += 1
+            stats[1] += reward(value, parent.to_move)
+            parent.visits += 1
+        self.total_playouts += 1
+
+    def choose_operator(self, s):
+        # Index into OPERATORS of the move to play in s, which must not be
+        # terminal.
+        if s.is_goal():
+            raise ValueError("The game is over: there is no operator to choose")
+        narration, old_rng = prob.NARRATION_MODE, prob.RNG
+        prob.set_narration('off')
+        prob.set_rng(self.rng)
+        try:
+            root = self._reuse(s)
+            if root is None:
+                root = Node(s, self.rng)
+            self.root = root
+            if self.playouts is not None:
+                for _ in range(self.playouts):
+                    self.playout(root)
+            else:
+                deadline = time.perf_counter() + self.time_budget
+                while time.perf_counter() < deadline:
+                    self.playout(root)
+        finally:
+            prob.set_narration(narration)
+            prob.set_rng(old_rng)
+        if not root.stats:
+            return root.untried[0]
+        return max(root.stats, key=lambda op_id: root.stats[op_id][0])
+
+    def agent_move(self, s):
+        # The Operator to apply in s, for use as a SOLUZION role agent.
+        return prob.OPERATORS[self.choose_operator(s)]
+
+_PLAYERS = {}   # (id(rng), playouts, seat) -> MCTSPlayer
+
+def mcts_policy(s, moves, rng, playouts=200):
+    # Policy for Healthcare_Sim: a fixed number of playouts per move, drawing
+    # from the simulator's random stream so batch runs stay reproducible.
+    # Each seat, and each number of playouts, gets a player and tree of its
+    # own; players of an earlier random stream are dropped.
+    key = (id(rng), playouts, s.whose_turn)
+    player = _PLAYERS.get(key)
+    if player is None:
+        if any(other[0] != key[0] for other in _PLAYERS):
+            _PLAYERS.clear()
+        player = _PLAYERS[key] = MCTSPlayer(playouts=playouts, rng=rng)
+    return player.choose_operator(s)
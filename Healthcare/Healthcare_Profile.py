@@ -0,0 +1,228 @@
+'''
+Healthcare_Profile.py
+Opt-in timing instrumentation for Coverage Clash.
+
+enable() wraps the hot paths of a turn with timers: every operator's
+precondition and transition (labelled with Healthcare.OPERATOR_LABELS,
+so the two Pass operators are told apart), the phases inside a
+transition (the apply_operator kernel, State.clone, narration,
+update_turn, is_goal), and successor cache lookups
+('successors'; simulation and search go through the cache, and only its
+misses reach apply_operator).  If the SVG view is loaded,
+render_state, both frame builders, each draw_* panel (and its counterpart
+in the template backend) and the patch backend's frame_model/diff_models
+are timed too.  disable() puts the
+original functions back.  Nothing is wrapped until enable() is called, so
+instrumentation costs nothing when it is off.
+
+Each (phase, operator) pair gets a call count and a latency histogram
+with power-of-two buckets from 1 us to about 1 s.  Timings nest: the
+'transition' of an operator includes the 'clone' and 'update_turn' it
+calls.  to_json() and prometheus_text() export the histograms.
+
+Usage:
+  import Healthcare_Profile as profile
+  profile.enable()
+  ... play or serve games ...
+  print(profile.prometheus_text())
+or, to profile simulated games:
+  python Healthcare_Profile.py [games] [json|prometheus]
+'''
+
+import json
+import sys
+import time
+from bisect import bisect_left
+
+import Healthcare as prob
+
+# Upper bucket bounds in nanoseconds: 1 us, 2 us, 4 us, ... about 1 s.
+BUCKET_BOUNDS_NS = tuple(1000 * 2**i for i in range(21))
+
+METRIC_NAME = 'coverage_clash_phase_seconds'
+
+# View functions timed when their module is loaded, by module name.
+RENDER_FUNCTIONS = {
+    'Healthcare_SVG_FOR_BRIFL': ('render_state', 'render_frame',
+        'draw_goals_panel', 'draw_status_panel', 'draw_progress_bars',
+        'draw_game_over', 'r_insert', 'i_insert'),
+    'Healthcare_SVG_Template': ('render_frame', 'goals_panel',
+        'status_panel', 'progress_bars', 'game_over'),
+    'Healthcare_SVG_Patch': ('frame_model', 'diff_models'),
+}
+
+class Histogram:
+    # Call count, total time and bucket counts of one (phase, operator).
+    __slots__ = ('count', 'total_ns', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total_ns = 0
+        # One count per bound plus an overflow bucket.
+        self.buckets = [0] * (len(BUCKET_BOUNDS_NS) + 1)
+
+    def observe(self, ns):
+        self.count += 1
+        self.total_ns += ns
+        self.buckets[bisect_left(BUCKET_BOUNDS_NS, ns)] += 1
+
+    def quantile(self, q):
+        # Upper bound (in ns) of the bucket holding quantile q; None for the
+        # overflow bucket or an empty histogram.
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(BUCKET_BOUNDS_NS, self.buckets):
+            seen += n
+            if seen >= rank:
+                return bound
+        return None
+
+# (phase, operator name or "") -> Histogram
+HISTOGRAMS = {}
+
+# (object, attribute, original value) of everything enable() replaced.
+PATCHES = []
+
+def histogram(phase, op=""):
+    key = (phase, op)
+    h = HISTOGRAMS.get(key)
+    if h is None:
+        h = HISTOGRAMS[key] = Histogram()
+    return h
+
+def timed(fn, phase, op=""):
+    # fn wrapped so that each call is recorded under (phase, op).
+    h = histogram(phase, op)
+    clock = time.perf_counter_ns
+    def timed_call(*args, **kwargs):
+        t0 = clock()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            h.observe(clock() - t0)
+    timed_call.__wrapped__ = fn
+    timed_call.__name__ = getattr(fn, '__name__', phase)
+    return timed_call
+
+def patch(obj, attr, phase, op=""):
+    original = getattr(obj, attr)
+    PATCHES.append((obj, attr, original))
+    setattr(obj, attr, timed(original, phase, op))
+
+def enabled():
+    return bool(PATCHES)
+
+def enable(render=True):
+    # Installs the timers; does nothing if they are already installed.
+    # With render=False the SVG view is left alone.
+    if PATCHES:
+        return
+    for op, label in zip(prob.OPERATORS, prob.OPERATOR_LABELS):
+        patch(op, 'precond', 'precondition', label)
+        patch(op, 'state_transf', 'transition', label)
+    patch(prob, 'apply_operator', 'apply_operator')
+    patch(prob.SuccessorCache, 'outcomes', 'successors')
+    patch(prob.State, 'clone', 'clone')
+    patch(prob.State, 'is_goal', 'is_goal')
+    patch(prob, 'update_turn', 'update_turn')
+    patch(prob, 'narrate', 'narrate')
+    patch(prob, 'narrate_funding', 'narrate')
+    if render:
+        for module_name, functions in RENDER_FUNCTIONS.items():
+            module = sys.modules.get(module_name)
+            if module is None:
+                continue
+            prefix = 'template.' if module_name == 'Healthcare_SVG_Template' else ''
+            for name in functions:
+                patch(module, name, prefix + name)
+        # Healthcare.use_BRIFL_SVG() imports render_state by name.
+        vis = sys.modules.get('Healthcare_SVG_FOR_BRIFL')
+        if vis is not None and prob.render_state is not None:
+            patch(prob, 'render_state', 'render_state')
+
+def disable():
+    # Restores the original functions; the recorded timings are kept.
+    while PATCHES:
+        obj, attr, original = PATCHES.pop()
+        setattr(obj, attr, original)
+
+def reset():
+    for h in HISTOGRAMS.values():
+        h.__init__()
+
+#------------------
+# Export
+def to_json():
+    # {phase: {operator: {count, total_seconds, buckets}}}; operator is ""
+    # for phases that are not tied to one operator.  buckets maps each
+    # upper bound in seconds (and "+Inf") to a non-cumulative count.
+    result = {}
+    for (phase, op), h in sorted(HISTOGRAMS.items()):
+        if h.count == 0:
+            continue
+        buckets = {f"{bound / 1e9:g}": n
+                   for bound, n in zip(BUCKET_BOUNDS_NS, h.buckets) if n}
+        if h.buckets[-1]:
+            buckets["+Inf"] = h.buckets[-1]
+        result.setdefault(phase, {})[op] = {'count': h.count,
+                                            'total_seconds': h.total_ns / 1e9,
+                                            'buckets': buckets}
+    return result
+
+def dumps(indent=1):
+    return json.dumps(to_json(), indent=indent)
+
+def label_escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def prometheus_text():
+    # The histograms in the Prometheus text exposition format.
+    lines = [f"# HELP {METRIC_NAME} Time spent in each phase of a Coverage Clash turn.",
+             f"# TYPE {METRIC_NAME} histogram"]
+    for (phase, op), h in sorted(HISTOGRAMS.items()):
+        if h.count == 0:
+            continue
+        labels = f'phase="{label_escape(phase)}",operator="{label_escape(op)}"'
+        cumulative = 0
+        for bound, n in zip(BUCKET_BOUNDS_NS, h.buckets):
+            cumulative += n
+            lines.append(f'{METRIC_NAME}_bucket{{{labels},le="{bound / 1e9:g}"}} {cumulative}')
+        lines.append(f'{METRIC_NAME}_bucket{{{labels},le="+Inf"}} {h.count}')
+        lines.append(f'{METRIC_NAME}_sum{{{labels}}} {h.total_ns / 1e9:.9f}')
+        lines.append(f'{METRIC_NAME}_count{{{labels}}} {h.count}')
+    return "\n".join(lines) + "\n"
+
+def quantile_us(h, q):
+    bound = h.quantile(q)
+    return "inf" if bound is None else f"{bound / 1000:g}"
+
+def format_table():
+    lines = [f"{'phase':<22} {'operator':<30} {'calls':>9} {'mean us':>9} {'p50 us':>8} {'p99 us':>8}"]
+    for (phase, op), h in sorted(HISTOGRAMS.items()):
+        if h.count == 0:
+            continue
+        p50, p99 = (quantile_us(h, q) for q in (0.5, 0.99))
+        lines.append(f"{phase:<22} {op:<30} {h.count:>9,} {h.total_ns / h.count / 1000:>9.2f}"
+                     f" {p50:>8} {p99:>8}")
+    return "\n".join(lines)
+
+def main(argv):
+    import Healthcare_Sim as sim
+    n = int(argv[1]) if len(argv) > 1 else 2000
+    output = argv[2] if len(argv) > 2 else 'table'
+    enable()
+    try:
+        sim.run_games(n, seed=0)
+    finally:
+        disable()
+    if output == 'json':
+        print(dumps())
+    elif output == 'prometheus':
+        print(prometheus_text(), end="")
+    else:
+        print(format_table())
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,265 @@
+'''
+Healthcare_Replay.py
+Replay logs for Coverage Clash: recording, fast-forwarding and checking.
+
+A game is fully determined by the operators played and the chance outcome
+of each request_funds, so that is all a log stores.  Replaying applies
+the moves with the headless kernel (apply_operator, narration off) and
+can stop after any number of moves to rebuild an intermediate State.
+
+The log is an append-only binary file.  New games are added to the end,
+and a log cut short by a crash loses at most the last, partial, record.
+
+File layout (little-endian):
+  header: magic b'CCREPLAY', version (uint32)
+  record: seed (uint64), move count (uint16), outcome (int8),
+          then one byte per move: operator index into OPERATORS in the
+          low 4 bits, chance outcome (FUNDS_INTERCEPTED/FUNDS_GRANTED)
+          in bit 4 for request_funds, 0 otherwise
+
+The seed is the one the game was played with (see record_games); it is
+kept for auditing and is not needed to replay.  The outcome uses the
+codes of Healthcare_Sim (a role number, BOTH_LOSE or DRAW).
+
+Usage:
+  python Healthcare_Replay.py record [games] [seed] [output file]
+  python Healthcare_Replay.py verify [log file]
+'''
+
+import os
+import random
+import struct
+import sys
+import time
+from collections import namedtuple
+
+import Healthcare as prob
+from Healthcare_Sim import DRAW, MAX_TURNS, legal_moves, random_policy
+
+MAGIC = b'CCREPLAY'
+VERSION = 1
+HEADER = struct.Struct('<8sI')
+RECORD = struct.Struct('<QHb')
+OP_MASK = 0x0F
+OUTCOME_SHIFT = 4
+DEFAULT_PATH = 'coverage_clash_replays.bin'
+
+# moves is a bytes object of encoded moves
+GameRecord = namedtuple('GameRecord', ['seed', 'outcome', 'moves'])
+
+class ReplayError(Exception):
+    pass
+
+def encode_move(op_id, outcome=None):
+    return op_id | ((outcome or 0) << OUTCOME_SHIFT)
+
+def decode_move(move):
+    # Returns (op_id, outcome); outcome is None for deterministic operators.
+    # Raises ReplayError for a byte no recorded move can produce.
+    op_id = move & OP_MASK
+    outcome = move >> OUTCOME_SHIFT
+    if op_id not in prob.EFFECTS:
+        raise ReplayError(f"move byte {move} has no operator {op_id}")
+    chance = prob.EFFECTS[op_id].chance
+    if chance:
+        if outcome >= len(chance):
+            raise ReplayError(f"move byte {move} has no outcome {outcome}")
+        return op_id, outcome
+    if outcome:
+        raise ReplayError(f"move byte {move} gives an outcome to a deterministic operator")
+    return op_id, None
+
+def game_outcome(s):
+    # Outcome code of a finished (or abandoned) game.
+    code, winner = s.status()
+    if code != prob.END_ONGOING:
+        return winner
+    return DRAW
+
+#------------------
+# Recording
+def record_game(pm_policy, ic_policy, rng, seed=0, max_turns=MAX_TURNS):
+    # Plays one game like Healthcare_Sim.play_game and returns its
+    # GameRecord.  Chance outcomes are rolled here so they can be logged.
+    s = prob.create_initial_state()
+    policies = (pm_policy, ic_policy)
+    moves = bytearray()
+    for _ in range(max_turns):
+        if s.is_goal():
+            break
+        op_id = policies[s.whose_turn](s, legal_moves(s), rng)
+        outcome = None
+        e = prob.EFFECTS[op_id]
+        if e.chance:
+            outcome = prob.roll_outcome(e)
+        s = prob.apply_operator(s, op_id, outcome)
+        moves.append(encode_move(op_id, outcome))
+    return GameRecord(seed, game_outcome(s), bytes(moves))
+
+def record_games(n, pm_policy=random_policy, ic_policy=random_policy,
+                 seed=0, max_turns=MAX_TURNS):
+    # Plays n games and returns their records.  Game i is played with its
+    # own random.Random(seed + i), which is the seed stored in its record.
+    narration = prob.NARRATION_MODE
+    old_rng = prob.RNG
+    prob.set_narration('off')
+    records = []
+    try:
+        for i in range(n):
+            rng = random.Random(seed + i)
+            prob.set_rng(rng)
+            records.append(record_game(pm_policy, ic_policy, rng, seed + i, max_turns))
+    finally:
+        prob.set_narration(narration)
+        prob.set_rng(old_rng)
+    return records
+
+#------------------
+# Log file
+def log_records(data, path):
+    # Yields (end offset, GameRecord) for each complete record of the log
+    # contents data.  A truncated last record is skipped.
+    if len(data) < HEADER.size:
+        raise ReplayError(path+" is not a Coverage Clash replay log")
+    magic, version = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ReplayError(path+" is not a Coverage Clash replay log (version "+str(VERSION)+")")
+    pos = HEADER.size
+    end = len(data)
+    while pos + RECORD.size <= end:
+        seed, count, outcome = RECORD.unpack_from(data, pos)
+        pos += RECORD.size
+        if pos + count > end:
+            return
+        yield pos + count, GameRecord(seed, outcome, data[pos:pos + count])
+        pos += count
+
+class ReplayLog:
+    # Appends GameRecords to a log file, writing the header if the file
+    # is new.  A partial record left at the end by a crash is cut off
+    # first, so new records stay readable.
+    def __init__(self, path=DEFAULT_PATH):
+        self.f = open(path, 'ab')
+        if self.f.tell() == 0:
+            self.f.write(HEADER.pack(MAGIC, VERSION))
+            return
+        with open(path, 'rb') as f:
+            data = f.read()
+        complete = HEADER.size
+        try:
+            for complete, _ in log_records(data, path):
+                pass
+        except ReplayError:
+            self.f.close()
+            raise
+        if complete < len(data):
+            self.f.truncate(complete)
+
+    def append(self, record):
+        self.f.write(RECORD.pack(record.seed, len(record.moves), record.outcome))
+        self.f.write(record.moves)
+
+    def flush(self):
+        self.f.flush()
+
+    def close(self):
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def write_log(path, records):
+    with ReplayLog(path) as log:
+        for record in records:
+            log.append(record)
+
+def read_log(path=DEFAULT_PATH):
+    # Yields the GameRecords of a log.  A truncated last record is skipped.
+    with open(path, 'rb') as f:
+        data = f.read()
+    for _, record in log_records(data, path):
+        yield record
+
+#------------------
+# Replaying
+def replay(record, moves=None):
+    # Fast-forwards through the first moves of record (all by default) and
+    # returns the State reached.  Narration is not produced.  Raises
+    # ReplayError if the record holds a corrupt move.
+    narration = prob.NARRATION_MODE
+    prob.set_narration('off')
+    try:
+        s = prob.create_initial_state()
+        for move in record.moves[:moves]:
+            op_id, outcome = decode_move(move)
+            s = prob.apply_operator(s, op_id, outcome)
+    finally:
+        prob.set_narration(narration)
+    return s
+
+def verify_game(record):
+    # Replays record checking every move, and returns None if the game is
+    # consistent or a message describing the first problem.
+    s = prob.create_initial_state()
+    for ply, move in enumerate(record.moves):
+        if s.is_goal():
+            return f"move {ply} played after the game ended"
+        try:
+            op_id, outcome = decode_move(move)
+        except ReplayError:
+            return f"move {ply} ({move}) is corrupt"
+        if op_id >= len(prob.OPERATORS) or not prob.can_apply(s, op_id):
+            return f"move {ply} ({op_id}) is not legal"
+        s = prob.apply_operator(s, op_id, outcome)
+    outcome = game_outcome(s)
+    if outcome != record.outcome:
+        return f"recorded outcome {record.outcome}, replay gives {outcome}"
+    return None
+
+def verify_log(path=DEFAULT_PATH):
+    # Checks every game of a log.  Returns (number of games, list of
+    # (game index, seed, message) for the games that failed).
+    narration = prob.NARRATION_MODE
+    prob.set_narration('off')
+    n = 0
+    failures = []
+    try:
+        for record in read_log(path):
+            message = verify_game(record)
+            if message is not None:
+                failures.append((n, record.seed, message))
+            n += 1
+    finally:
+        prob.set_narration(narration)
+    return n, failures
+
+def main(argv):
+    command = argv[1] if len(argv) > 1 else 'verify'
+    if command == 'record':
+        n = int(argv[2]) if len(argv) > 2 else 10000
+        seed = int(argv[3]) if len(argv) > 3 else 0
+        path = argv[4] if len(argv) > 4 else DEFAULT_PATH
+        t0 = time.perf_counter()
+        write_log(path, record_games(n, seed=seed))
+        elapsed = time.perf_counter() - t0
+        print(f"recorded {n} games in {elapsed:.2f}s, {path} is {os.path.getsize(path):,} bytes")
+    elif command == 'verify':
+        path = argv[2] if len(argv) > 2 else DEFAULT_PATH
+        t0 = time.perf_counter()
+        n, failures = verify_log(path)
+        elapsed = time.perf_counter() - t0
+        for index, seed, message in failures:
+            print(f"game {index} (seed {seed}): {message}")
+        print(f"{n - len(failures)}/{n} games verified in {elapsed:.2f}s"
+              f" ({n / elapsed:,.0f} games/sec)")
+        return 1 if failures else 0
+    else:
+        print(__doc__)
+        return 2
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,169 @@
+'''
+Healthcare_Rooms.py
+Rooms: many independent games of Coverage Clash in one process.
+
+SOLUZION runs a single game per process: its state, role membership and
+image server address live in module globals (Healthcare.SESSION, RNG).
+A Room holds all of that for one game instead.  It has its own state,
+the members of each role, a random stream for the interception roll in
+request_funds, and a session dict that the renderer receives as its
+context.  Rooms never read or write SESSION, so any number of them can
+be served side by side.
+
+The RoomRegistry creates, finds and closes rooms by id.  Each room has
+its own lock, so moves in different rooms never wait on each other,
+and the registry lock is only held to add or remove a room.  Frames are
+still shared through the render cache of Healthcare_SVG_FOR_BRIFL, which
+is keyed by position, role and address.
+
+Narration: apply_operator hands 'text' narration to SOLUZION, which only
+knows one game.  A server hosting rooms should call
+Healthcare.set_narration('events') and send each room's
+Healthcare.transition_text(room.state) after a move.
+
+Usage:
+  rooms = RoomRegistry()
+  room = rooms.create(host='localhost', port=5000)
+  room.join('alice', prob.POLICY_MAKER)
+  room.join('bob', prob.INSURANCE_COMPANY)
+  room.apply('alice', prob.OP_CAP_PREMIUMS)
+  svg = room.render('bob')
+'''
+
+import random
+import threading
+import uuid
+
+import Healthcare as prob
+
+class RoomError(Exception):
+    pass
+
+class Room:
+    def __init__(self, room_id, host=None, port=None, seed=None):
+        self.id = room_id
+        self.state = prob.create_initial_state()
+        self.rng = random.Random(seed)
+        # Usernames in each role, indexed like ROLES.  The list is shared
+        # with session['ROLES_MEMBERSHIP'], in the shape SOLUZION uses.
+        self.membership = [[] for _ in prob.ROLES]
+        # Render context: passed to render_state instead of prob.SESSION.
+        self.session = {'HOST': host, 'PORT': port,
+                        'ROLES_MEMBERSHIP': self.membership}
+        self.moves = 0
+        self.lock = threading.Lock()
+        self.streams = {}  # username -> Healthcare_SVG_Patch.PatchStream
+
+    def roles_of(self, username):
+        return [r for r, users in enumerate(self.membership) if username in users]
+
+    def join(self, username, role_num):
+        with self.lock:
+            if not 0 <= role_num < len(prob.ROLES):
+                raise RoomError("No role number "+str(role_num))
+            users = self.membership[role_num]
+            if username in users:
+                return
+            if len(users) >= prob.ROLES[role_num]['max']:
+                raise RoomError(prob.ROLES[role_num]['name']+" is already taken in room "+str(self.id))
+            users.append(username)
+
+    def leave(self, username):
+        with self.lock:
+            for users in self.membership:
+                if username in users:
+                    users.remove(username)
+            self.streams.pop(username, None)
+
+    def user_session(self, username):
+        # A SESSION-shaped dict for username in this room.
+        return dict(self.session, USERNAME=username)
+
+    def is_user_in_role(self, username, role_num):
+        return prob.is_user_in_role(role_num, self.user_session(username))
+
+    def is_over(self):
+        return self.state.is_goal()
+
+    def legal_operators(self, username):
+        # Indices into OPERATORS that username may apply now.
+        s = self.state
+        if s.is_goal() or username not in self.membership[s.whose_turn]:
+            return ()
+        return prob.legal_op_ids(s)
+
+    def apply(self, username, op_id):
+        # Plays operator op_id for username and returns the new state.  The
+        # chance outcome of request_funds is rolled with the room's rng.
+        with self.lock:
+            s = self.state
+            if s.is_goal():
+                raise RoomError("The game in room "+str(self.id)+" is over")
+            if username not in self.membership[s.whose_turn]:
+                raise RoomError(str(username)+" does not hold the role to move")
+            if op_id not in prob.EFFECTS:
+                raise RoomError("No operator "+str(op_id))
+            if op_id not in prob.legal_op_ids(s):
+                raise RoomError(prob.OPERATORS[op_id].name+" is not applicable")
+            e = prob.EFFECTS[op_id]
+            outcome = prob.roll_outcome(e, self.rng) if e.chance else None
+            self.state = prob.apply_operator(s, op_id, outcome)
+            self.moves += 1
+            return self.state
+
+    def reset(self, seed=None):
+        with self.lock:
+            self.state = prob.create_initial_state()
+            if seed is not None:
+                self.rng.seed(seed)
+            self.moves = 0
+            self.streams.clear()
+
+    def render(self, username=None):
+        # SVG of the room's game as username sees it.
+        import Healthcare_SVG_FOR_BRIFL as vis
+        return vis.render_state(self.state, self.roles_of(username), self.session)
+
+    def render_update(self, username):
+        # ('full', svg) or ('patch', patch) for username's client; see
+        # Healthcare_SVG_Patch.
+        from Healthcare_SVG_Patch import PatchStream
+        with self.lock:
+            stream = self.streams.get(username)
+            if stream is None:
+                stream = self.streams[username] = PatchStream()
+            return stream.frame(self.state, self.roles_of(username), self.session)
+
+class RoomRegistry:
+    def __init__(self, max_rooms=None):
+        self.rooms = {}
+        self.max_rooms = max_rooms
+        self.lock = threading.Lock()
+
+    def create(self, room_id=None, host=None, port=None, seed=None):
+        # Opens a new room; a fresh id is made up when none is given.
+        with self.lock:
+            if room_id is None:
+                room_id = uuid.uuid4().hex[:8]
+            if room_id in self.rooms:
+                raise RoomError("Room "+str(room_id)+" already exists")
+            if self.max_rooms is not None and len(self.rooms) >= self.max_rooms:
+                raise RoomError("No more than "+str(self.max_rooms)+" rooms")
+            room = self.rooms[room_id] = Room(room_id, host, port, seed)
+            return room
+
+    def get(self, room_id):
+        try:
+            return self.rooms[room_id]
+        except KeyError:
+            raise RoomError("No room "+str(room_id)) from None
+
+    def close(self, room_id):
+        with self.lock:
+            self.rooms.pop(room_id, None)
+
+    def __len__(self):
+        return len(self.rooms)
+
+    def __iter__(self):
+        return iter(list(self.rooms.values()))
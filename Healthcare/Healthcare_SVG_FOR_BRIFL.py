@@ -3,10 +3,16 @@
 # in the web browser using SVG graphics.
 # Based on OCCLUEdo_SVG_VIS_FOR_BRIFL.py structure
 
+from collections import OrderedDict
+import base64
+import json
+import os
+import threading
 import svgwrite
 import Healthcare as prob  # Import the main game module
+import Healthcare_State_API as api  # Flags shared with the browser renderer
 
-DEBUG = True
+DEBUG = False  # True prints the roles of every frame that is drawn
 W = 1000  # Width of visualization region
 H = 620  # Increased height to accommodate larger cards
 PANEL_WIDTH = W // 3
@@ -30,17 +36,104 @@ MEDIUM_FS = "18"
 SMALL_FS = "14"
 TINY_FS = "12"
 
-session = None
-
-def render_state(s, roles=None):
-    global session
-    if DEBUG: print("In Coverage_SVG.py, roles = "+str(roles))
-
+# Colour of each Healthcare_State_API level
+LEVEL_COLORS = (SUCCESS_COLOR, "rgb(255, 193, 7)", WARNING_COLOR, "rgb(51, 51, 51)")
+
+class RenderCache:
+    """Bounded LRU cache of rendered frames: key -> (svg_string, alt_text).
+    Shared by every game in the process, so it is guarded by a lock."""
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.frames = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            frame = self.frames.get(key)
+            if frame is None:
+                self.misses += 1
+                return None
+            self.frames.move_to_end(key)
+            self.hits += 1
+            return frame
+
+    def put(self, key, frame):
+        with self.lock:
+            self.frames[key] = frame
+            self.frames.move_to_end(key)
+            while len(self.frames) > self.maxsize:
+                self.frames.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.frames.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses,
+                'size': len(self.frames), 'maxsize': self.maxsize}
+
+RENDER_CACHE = RenderCache()
+
+# 'svgwrite' builds each frame as an svgwrite DOM; 'template' fills in
+# precompiled markup (Healthcare_SVG_Template) and produces the same SVG.
+RENDER_BACKEND = 'svgwrite'
+
+def set_render_backend(name):
+    """Choose the frame builder used by render_state"""
+    global RENDER_BACKEND
+    if name not in ('svgwrite', 'template'):
+        raise ValueError("Unknown render backend: "+str(name))
+    RENDER_BACKEND = name
+    RENDER_CACHE.clear()
+
+def frame_builder():
+    if RENDER_BACKEND == 'template':
+        import Healthcare_SVG_Template as template
+        return template.render_frame
+    return render_frame
+
+def view_role(s, roles):
+    """The role whose view is drawn for a client holding roles (None if no role)"""
+    if roles is None or roles == []:
+        return None
+    if s.current_role_num in roles:
+        return s.current_role_num
+    return roles[0]
+
+def render_key(s, role, session):
+    """Everything the frame depends on: the position, the game status it
+    is drawn with, any win text set on the state, the viewing role and the
+    image server address"""
+    try:
+        address = (session['HOST'], session['PORT'])
+    except Exception:
+        address = None
+    return (s.key(), s.status(), s.win, role, address)
+
+def render_state(s, roles=None, session=None):
+    """SVG of s for a client holding roles.  session is the render context
+    of the game (its 'HOST' and 'PORT' locate the card images); SOLUZION
+    leaves it out and the module-level prob.SESSION is used."""
+    if session is None:
+        session = prob.SESSION
+    role = view_role(s, roles)
+    key = render_key(s, role, session)
+    frame = RENDER_CACHE.get(key)
+    if frame is None:
+        if DEBUG: print("In Coverage_SVG.py, roles = "+str(roles))
+        frame = frame_builder()(s, role, session)
+        RENDER_CACHE.put(key, frame)
+    return frame[0]
+
+def render_frame(s, role, session=None):
+    """Build the SVG for one view; returns (svg_string, alt_text)"""
     # Accessibility text
     alt_text = "Coverage Clash game state visualization for "
     
-    session = prob.SESSION
-    
     dwg = svgwrite.Drawing(filename="coverage_clash_vis.svg",
                           id="state_svg",
                           size=(str(W)+"px", str(H)+"px"),
@@ -52,7 +145,7 @@ def render_state(s, roles=None):
                     fill=BACKGROUND_COLOR,
                     stroke="none"))
     
-    if roles is None or roles == []:
+    if role is None:
         # No role assigned
         label = "Observer View - No Active Role"
         dwg.add(dwg.text(label, insert=(W//2, H//2),
@@ -61,12 +154,6 @@ def render_state(s, roles=None):
                         fill=WARNING_COLOR))
         alt_text += "observer with no active role"
     else:
-        # Determine current role to display
-        if s.current_role_num in roles:
-            role = s.current_role_num
-        else:
-            role = roles[0]
-        
         alt_text += prob.int_to_name(role)
         
         # Main title
@@ -100,23 +187,33 @@ def render_state(s, roles=None):
         
         
         
-        if role == prob.POLICY_MAKER:
-            r_insert(dwg)
-        elif role == prob.INSURANCE_COMPANY:
-            i_insert(dwg)
+        if hand_side(s, role) == "r":
+            r_insert(dwg, session)
         else:
-            if s.whose_turn == prob.POLICY_MAKER:
-                r_insert(dwg)
-            else:
-                i_insert(dwg)
+            i_insert(dwg, session)
         
         # Win/lose status
-        if s.win:
+        if s.is_goal():
             draw_game_over(dwg, s)
     
     dwg.add(svgwrite.base.Title(alt_text))
     svg_string = dwg.tostring()
-    return svg_string
+    return svg_string, alt_text
+
+def goal_rows(s, role):
+    """(label, value[, color]) rows of the goals panel for role; the rows
+    and their flags are Healthcare_State_API.GOAL_ROWS and goal_flags"""
+    if role in api.GOAL_ROWS:
+        ok = api.goal_flags(s, role)
+        rows = []
+        for label, value, flag in api.GOAL_ROWS[role]:
+            if flag is None:
+                rows.append((label, value))
+            else:
+                rows.append((label, value.format(s=s), SUCCESS_COLOR if ok[flag] else WARNING_COLOR))
+        return rows
+    else:
+        return [("Observer", "No specific goals", "rgb(108, 117, 125)")]
 
 def draw_goals_panel(dwg, s, role, x, y):
     """Draw the goals and win conditions panel"""
@@ -141,34 +238,7 @@ def draw_goals_panel(dwg, s, role, x, y):
 
     y_offset = 45
 
-    if role == prob.POLICY_MAKER:
-        goals = [
-            ("WIN CONDITION:", ""),
-            ("Access Gap < 13", f"(currently {s.access_gap_index})", SUCCESS_COLOR if s.access_gap_index < 12 else WARNING_COLOR),
-            ("", ""),
-            ("AVOID LOSING:", ""),
-            ("Uninsured > 17.8%", f"(currently {s.uninsured_rate:.1f}%)", WARNING_COLOR if s.uninsured_rate > 15.5 else SUCCESS_COLOR),
-            ("Public Health Index < 30", f"(currently {s.public_health_index})", WARNING_COLOR if s.public_health_index < 40 else SUCCESS_COLOR),
-            ("Access Gap Index > 45", f"(currently {s.access_gap_index})", WARNING_COLOR if s.access_gap_index > 40 else SUCCESS_COLOR),
-            ("Public Trust Meter < 30%", f"(currently {s.public_trust_meter}%)", WARNING_COLOR if s.public_trust_meter < 37 else SUCCESS_COLOR),
-            ("Insurer Profit > $85B", f"", WARNING_COLOR if s.profit > 78 else SUCCESS_COLOR),
-            ("(Insurer wins)", f"(currently ${s.profit}B)", WARNING_COLOR if s.profit > 78 else SUCCESS_COLOR)
-        ]
-    elif role == prob.INSURANCE_COMPANY:
-        goals = [
-            ("WIN CONDITION:", ""),
-            ("Profit > $85B", f"(currently ${s.profit}B)", SUCCESS_COLOR if s.profit > 80 else WARNING_COLOR),
-            ("Access Gap > 45", f"", SUCCESS_COLOR if s.access_gap_index > 40 else WARNING_COLOR),
-            ("(Policymaker loses)", f"(currently {s.access_gap_index})", SUCCESS_COLOR if s.access_gap_index > 40 else WARNING_COLOR),
-            ("", ""),
-            ("AVOID LOSING:", ""),
-            ("Uninsured > 17.8%", f"(currently {s.uninsured_rate:.1f}%)", WARNING_COLOR if s.uninsured_rate > 15.5 else SUCCESS_COLOR),
-            ("Public Health < 30", f"(currently {s.public_health_index})", WARNING_COLOR if s.public_health_index < 40 else SUCCESS_COLOR)
-        ]
-    else:
-        goals = [("Observer", "No specific goals", "rgb(108, 117, 125)")]
-
-    for goal_item in goals:
+    for goal_item in goal_rows(s, role):
         if len(goal_item) == 3:
             label, value, color = goal_item
         else:
@@ -187,6 +257,20 @@ def draw_goals_panel(dwg, s, role, x, y):
                 fill=color))
         y_offset += 18
 
+def status_metrics(s):
+    """(label, value, color) rows of the status panel"""
+    return [(label, value.format(s=s), LEVEL_COLORS[level])
+            for (label, value), level in zip(api.METRICS, api.metric_levels(s))]
+
+def status_warnings(s):
+    """Warning lines of the status panel"""
+    return [warning for warning, on in zip(api.WARNINGS, api.warning_flags(s)) if on]
+
+def status_alerts(s):
+    """(message, color) alert lines of the status panel"""
+    return [(message, LEVEL_COLORS[level])
+            for (message, level), on in zip(api.ALERTS, api.alert_flags(s)) if on]
+
 def draw_status_panel(dwg, s, x, y):
     """Draw current status and special conditions panel with extra metrics"""
     panel_width = 260
@@ -209,16 +293,7 @@ def draw_status_panel(dwg, s, x, y):
     
     y_offset = 45
     
-    # Game metrics that were removed from separate panel - made more compact
-    metrics = [
-        ("Uninsured Rate", f"{s.uninsured_rate:.1f}%", get_health_color(s.uninsured_rate, 25, True)),
-        ("Public Health Index", f"{s.public_health_index}", get_health_color(s.public_health_index, 30, False)),
-        ("Access Gap Index", f"{s.access_gap_index}", get_health_color(s.access_gap_index, 50, True)),
-        ("Insurance Profit", f"${s.profit}B", "rgb(51, 51, 51)"),
-        ("Policy Budget", f"${s.budget}B", get_budget_color(s.budget))
-    ]
-
-    for label, value, color in metrics:
+    for label, value, color in status_metrics(s):
         dwg.add(dwg.text(f"{label}:", insert=(x + 10, y + y_offset),
             font_size=SMALL_FS,
             fill="rgb(108, 117, 125)"))
@@ -229,125 +304,90 @@ def draw_status_panel(dwg, s, x, y):
             fill=color))
         y_offset += 20  # Reduced spacing
     
-    y_offset += 10
-    
-    # Add warnings section - ensure it stays within bounds
-    warnings = []
-    if s.uninsured_rate > 20:
-        warnings.append("High Uninsured Rate!")
-    if s.public_health_index < 40:
-        warnings.append("Poor Public Health!")
-    if s.budget < 15:
-        warnings.append("Low Budget!")
-    if s.access_gap_index > 40:
-        warnings.append("High Access Gap!")
-
-     # Special conditions
+    for lx, ly, content, fill, weight, anchor in status_lines(s, x, y):
+        dwg.add(dwg.text(content, insert=(lx, ly), font_size=SMALL_FS, fill=fill,
+                         **text_style(weight, anchor)))
+
+def text_style(weight, anchor):
+    """svgwrite keyword arguments for an optional font weight and anchor"""
+    style = {}
+    if weight is not None:
+        style['font_weight'] = weight
+    if anchor is not None:
+        style['text_anchor'] = anchor
+    return style
+
+def status_lines(s, x, y):
+    """(x, y, content, fill, weight, anchor) of each text below the metrics
+    in the status panel, for a panel at (x, y); weight and anchor are None
+    when the text has none.  Every backend draws the panel from this list."""
+    panel_width = 260
+    panel_height = 260
+    left = x + 10
+    right = x + panel_width - 10
+    lines = []
+    add = lines.append
+    y_offset = 45 + 20*len(status_metrics(s)) + 10
+
+    warnings = status_warnings(s)
+
+    # Special conditions
     if s.premium_cap_turns_left > 0:
-        dwg.add(dwg.text("Premium Cap Active:", insert=(x + 10, y + y_offset),
-                        font_size=SMALL_FS,
-                        fill=ACCENT_COLOR,
-                        font_weight="bold"))
-        dwg.add(dwg.text(f"{s.premium_cap_turns_left} turns left", insert=(x + panel_width - 10, y + y_offset),
-                        text_anchor="end",
-                        font_size=SMALL_FS,
-                        fill=ACCENT_COLOR))
+        add((left, y + y_offset, "Premium Cap Active:", ACCENT_COLOR, "bold", None))
+        add((right, y + y_offset, f"{s.premium_cap_turns_left} turns left",
+             ACCENT_COLOR, None, "end"))
         y_offset += 18
-    
+
     if warnings and y_offset < y + panel_height - 60:  # Check if there's space
-        dwg.add(dwg.text("⚠ WARNINGS:", insert=(x + 10, y + y_offset),
-                        font_size=SMALL_FS,
-                        fill=WARNING_COLOR,
-                        font_weight="bold"))
+        add((left, y + y_offset, "⚠ WARNINGS:", WARNING_COLOR, "bold", None))
         y_offset += 16
         for warning in warnings:
             if y_offset < y + panel_height - 20:  # Ensure each warning fits
-                dwg.add(dwg.text(f"• {warning}", insert=(x + 20, y + y_offset),
-                                font_size=SMALL_FS,
-                                fill=WARNING_COLOR))
+                add((x + 20, y + y_offset, f"• {warning}", WARNING_COLOR, None, None))
                 y_offset += 14  # Reduced spacing
         y_offset += 5  # Add some spacing after warnings
 
-    messages = []
-    if s.access_gap_index < 20 and s.access_gap_index >= 12:
-        messages.append(("Policy Maker close to victory!", SUCCESS_COLOR))
-    if s.profit > 80 and s.profit <= 85:
-        messages.append(("Insurance Company close to victory!", WARNING_COLOR))
-    if s.uninsured_rate > 15.5:
-        messages.append(("Approaching failure condition!", WARNING_COLOR))
-    if s.public_health_index < 35:
-        messages.append(("Health crisis approaching!", WARNING_COLOR))
-
+    messages = status_alerts(s)
     if messages and y_offset < y + panel_height - 60:
-        dwg.add(dwg.text("⚡ ALERTS:", insert=(x + 10, y + y_offset),
-                        font_size=SMALL_FS,
-                        fill="rgb(51, 51, 51)",
-                        font_weight="bold"))
+        add((left, y + y_offset, "⚡ ALERTS:", "rgb(51, 51, 51)", "bold", None))
         y_offset += 16
         for message, color in messages:
             if y_offset < y + panel_height - 20:
-                dwg.add(dwg.text(f"• {message}", insert=(x + 20, y + y_offset),
-                                font_size=SMALL_FS,
-                                font_weight="bold",
-                                fill=color))
+                add((x + 20, y + y_offset, f"• {message}", color, "bold", None))
                 y_offset += 14
         y_offset += 5
     # Special conditions - only add if there's space remaining
     if y_offset < y + panel_height - 40:
         if s.premium_cap_turns_left > 0:
-            dwg.add(dwg.text("Premium Cap Active:", insert=(x + 10, y + y_offset),
-                            font_size=SMALL_FS,
-                            fill=ACCENT_COLOR,
-                            font_weight="bold"))
-            dwg.add(dwg.text(f"{s.premium_cap_turns_left} turns left", insert=(x + panel_width - 10, y + y_offset),
-                            text_anchor="end",
-                            font_size=SMALL_FS,
-                            fill=ACCENT_COLOR))
+            add((left, y + y_offset, "Premium Cap Active:", ACCENT_COLOR, "bold", None))
+            add((right, y + y_offset, f"{s.premium_cap_turns_left} turns left",
+                 ACCENT_COLOR, None, "end"))
             y_offset += 16
-        
+
         if s.public_expansion_cap_turns_left > 0 and y_offset < y + panel_height - 20:
-            dwg.add(dwg.text("Public Expansion Blocked:", insert=(x + 10, y + y_offset),
-                            font_size=SMALL_FS,
-                            fill=WARNING_COLOR,
-                            font_weight="bold"))
-            dwg.add(dwg.text(f"{s.public_expansion_cap_turns_left} turns left", insert=(x + panel_width - 10, y + y_offset),
-                            text_anchor="end",
-                            font_size=SMALL_FS,
-                            fill=WARNING_COLOR))
+            add((left, y + y_offset, "Public Expansion Blocked:", WARNING_COLOR, "bold", None))
+            add((right, y + y_offset, f"{s.public_expansion_cap_turns_left} turns left",
+                 WARNING_COLOR, None, "end"))
             y_offset += 16
-        
+
         if s.skip_next_turn and y_offset < y + panel_height - 20:
-            dwg.add(dwg.text("Next Turn Skipped:", insert=(x + 10, y + y_offset),
-                            font_size=SMALL_FS,
-                            fill=WARNING_COLOR,
-                            font_weight="bold"))
-            dwg.add(dwg.text("Lobbying Effect", insert=(x + panel_width - 10, y + y_offset),
-                            text_anchor="end",
-                            font_size=SMALL_FS,
-                            fill=WARNING_COLOR))
+            add((left, y + y_offset, "Next Turn Skipped:", WARNING_COLOR, "bold", None))
+            add((right, y + y_offset, "Lobbying Effect", WARNING_COLOR, None, "end"))
             y_offset += 16
 
         # Lobbying benchmark info
         if s.influence_meter >= 75 and s.last_lobbied >= 3 and y_offset < y + panel_height - 20:
-            dwg.add(dwg.text("Lobbying Available!", insert=(x + 10, y + y_offset),
-                            font_size=SMALL_FS,
-                            fill=SUCCESS_COLOR,
-                            font_weight="bold"))
+            add((left, y + y_offset, "Lobbying Available!", SUCCESS_COLOR, "bold", None))
             y_offset += 16
         elif s.influence_meter >= 75 and y_offset < y + panel_height - 20:
-            dwg.add(dwg.text(f"Lobbying in {3 - s.last_lobbied} turns", insert=(x + 10, y + y_offset),
-                            font_size=SMALL_FS,
-                            fill="rgb(255, 193, 7)"))
+            add((left, y + y_offset, f"Lobbying in {3 - s.last_lobbied} turns",
+                 "rgb(255, 193, 7)", None, None))
             y_offset += 16
+    return lines
 
-def draw_progress_bars(dwg, s, x, y):
-    """Draw visual progress bars for key metrics"""
-    bar_width = 200
-    bar_height = 18
-    bar_spacing = 45
-    
-    # Progress bars for key metrics - added extra metrics from removed panel
-    bars = [
+def progress_bars(s):
+    """(label, value, max_value, color) for each key indicator bar"""
+    return [
         ("Public Health", s.public_health_index, 100, SUCCESS_COLOR),
         ("Public Trust", s.public_trust_meter, 100, ACCENT_COLOR),
         ("Insurer Influence", s.influence_meter, 100, WARNING_COLOR),
@@ -355,6 +395,26 @@ def draw_progress_bars(dwg, s, x, y):
         ("Access Gap", 100 - s.access_gap_index, 100, SUCCESS_COLOR),  # Inverted so lower gap = higher bar
         ("Coverage Rate", 100 - s.uninsured_rate, 100, SUCCESS_COLOR)  # Inverted so lower uninsured = higher bar
     ]
+
+def bar_display_value(s, label, value):
+    """Value printed next to a bar; inverted bars show the actual metric"""
+    if "Access Gap" in label:
+        display_value = s.access_gap_index
+    elif "Coverage Rate" in label:
+        display_value = f"{100 - s.uninsured_rate:.1f}%"
+    elif "Insurer Influence" in label or "Public Trust" in label:
+        display_value = f"{value:}%"
+    elif "Budget Level" in label:
+        display_value = f"${s.budget}B"
+    else:
+        display_value = f"{value:.0f}"
+    return display_value
+
+def draw_progress_bars(dwg, s, x, y):
+    """Draw visual progress bars for key metrics"""
+    bar_width = 200
+    bar_height = 18
+    bar_spacing = 45
     
     dwg.add(dwg.text("Key Indicators", insert=(x, y - 25),
                     font_size=MEDIUM_FS,
@@ -362,7 +422,7 @@ def draw_progress_bars(dwg, s, x, y):
                     fill="rgb(51, 51, 51)"))
     
     y_offset = 0
-    for label, value, max_val, color in bars:
+    for label, value, max_val, color in progress_bars(s):
         # Background bar
         dwg.add(dwg.rect(insert=(x, y + y_offset + 2.5),
                         size=(bar_width, bar_height),
@@ -381,18 +441,7 @@ def draw_progress_bars(dwg, s, x, y):
                         font_size=SMALL_FS,
                         fill="rgb(51, 51, 51)"))
         
-        # Show actual values for inverted metrics
-        if "Access Gap" in label:
-            display_value = s.access_gap_index
-        elif "Coverage Rate" in label:
-            display_value = f"{100 - s.uninsured_rate:.1f}%"
-        elif "Insurer Influence" in label or "Public Trust" in label:
-            display_value = f"{value:}%"
-        elif "Budget Level" in label:
-            display_value = f"${s.budget}B"
-        else:
-            display_value = f"{value:.0f}"
-            
+        display_value = bar_display_value(s, label, value)
         dwg.add(dwg.text(str(display_value), insert=(x + bar_width + 10, y + y_offset + 15),
                         font_size=SMALL_FS,
                         fill="rgb(51, 51, 51)"))
@@ -428,13 +477,14 @@ def draw_game_over(dwg, s):
                     font_weight="bold",
                     fill=WARNING_COLOR))
     
-    dwg.add(dwg.text(s.win, insert=(W//2, box_y + 80),
+    dwg.add(dwg.text(s.win_text(), insert=(W//2, box_y + 80),
                     text_anchor="middle",
                     font_size=MEDIUM_FS,
                     fill="rgb(51, 51, 51)"))
     
-    if s.winner >= 0:
-        winner_text = f"Winner: {prob.int_to_name(s.winner)}"
+    winner = s.status()[1]
+    if winner >= 0:
+        winner_text = f"Winner: {prob.int_to_name(winner)}"
         dwg.add(dwg.text(winner_text, insert=(W//2, box_y + 110),
                         text_anchor="middle",
                         font_size=MEDIUM_FS,
@@ -444,20 +494,7 @@ def draw_game_over(dwg, s):
 # Utility functions for color coding
 def get_health_color(value, threshold, higher_is_worse):
     """Get color based on health metric"""
-    if higher_is_worse:
-        if value > threshold * 0.8:
-            return WARNING_COLOR
-        elif value > threshold * 0.6:
-            return "rgb(255, 193, 7)"  # Warning yellow
-        else:
-            return SUCCESS_COLOR
-    else:
-        if value < threshold * 1.2:
-            return WARNING_COLOR
-        elif value < threshold * 1.5:
-            return "rgb(255, 193, 7)"  # Warning yellow
-        else:
-            return SUCCESS_COLOR
+    return LEVEL_COLORS[api.health_level(value, threshold, higher_is_worse)]
 
 def get_trust_color(value):
     """Get color for trust meter"""
@@ -479,12 +516,7 @@ def get_influence_color(value):
 
 def get_budget_color(value):
     """Get color for budget"""
-    if value < 15:
-        return WARNING_COLOR
-    elif value < 30:
-        return "rgb(255, 193, 7)"
-    else:
-        return SUCCESS_COLOR
+    return LEVEL_COLORS[api.budget_level(value)]
 
 CARD_IMAGES=\
     {("r",0): "Cap Premiums.jpg",
@@ -504,37 +536,107 @@ CARD_IMAGES=\
 IMAGE_WIDTH = 360
 IMAGE_HEIGHT = 400
 
-def insert_card(dwg, card, x, y):
-    global session
+IMAGE_SCALE = 0.65
+
+# Where each of the six cards of a hand goes
+CARD_POSITIONS = [(260,350), (440,350), (620,350), (800,350), (620,80), (800,80)]
+
+# Pre-sized, content-hashed card images built by Healthcare_Assets.py
+IMAGE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Images")
+MANIFEST_PATH = os.path.join(IMAGE_DIR, "card_manifest.json")
+BUILT_IMAGES = {}
+
+def read_manifest():
+    """Original filename -> built filename, empty if nothing was built"""
     try:
-      filename = CARD_IMAGES[card]
-    except Exception as e:
-        print("Could not access card filename from card object.")
-        print(e)
+        with open(MANIFEST_PATH) as f:
+            return json.load(f)['images']
+    except (OSError, ValueError, KeyError):
+        return {}
+
+def load_manifest():
+    global BUILT_IMAGES
+    BUILT_IMAGES = read_manifest()
+    if IMAGE_MODE == 'inline':
+        encode_card_images()
+    RENDER_CACHE.clear()
+
+# 'url' points each card at /get_image/ on the game server; 'inline' embeds
+# the image bytes as a data: URI, so a frame needs no further fetches and
+# no session['HOST']/['PORT'].
+IMAGE_MODE = 'url'
+IMAGE_TYPES = {'.webp': 'image/webp', '.png': 'image/png',
+               '.jpg': 'image/jpeg', '.jpeg': 'image/jpeg'}
+DATA_URIS = {}
+
+def data_uri(filename):
+    """data: URI of an image in IMAGE_DIR"""
+    mime = IMAGE_TYPES[os.path.splitext(filename)[1].lower()]
+    with open(os.path.join(IMAGE_DIR, filename), 'rb') as f:
+        data = base64.b64encode(f.read()).decode('ascii')
+    return "data:"+mime+";base64,"+data
+
+def encode_card_images():
+    """Encode every card once (the built copy when there is one)"""
+    DATA_URIS.clear()
+    for filename in set(CARD_IMAGES.values()):
+        DATA_URIS[filename] = data_uri(BUILT_IMAGES.get(filename, filename))
+
+def set_image_mode(name):
+    """Choose how card images are referenced: 'url' or 'inline'"""
+    global IMAGE_MODE
+    if name not in ('url', 'inline'):
+        raise ValueError("Unknown image mode: "+str(name))
+    if name == 'inline':
+        encode_card_images()
+    IMAGE_MODE = name
+    RENDER_CACHE.clear()
+
+load_manifest()
+
+def card_href(card, session=None):
+    """URL the client fetches the card image from; session as in
+    render_state.  Raises ValueError if the session does not say where
+    the image server is (inline images need no server)"""
+    if session is None:
+        session = prob.SESSION
+    filename = CARD_IMAGES[card]
+    if IMAGE_MODE == 'inline':
+        return DATA_URIS[filename]
+    filename = BUILT_IMAGES.get(filename, filename)
     try:
-        url = "http://"+session['HOST']+":"+str(session['PORT'])+"/get_image/"+filename
-    except Exception as e2:
-        print("A problem creating the URL. ", e2)
-    scale_factor = 0.65
-    w = IMAGE_WIDTH*scale_factor
-    h = IMAGE_HEIGHT*scale_factor
+        host, port = session['HOST'], session['PORT']
+    except (KeyError, TypeError):
+        host = port = None
+    if host is None or port is None:
+        raise ValueError("No image server address (session 'HOST' and 'PORT') "
+                         "for card "+str(card))
+    return "http://"+str(host)+":"+str(port)+"/get_image/"+filename
+
+def insert_card(dwg, card, x, y, session=None):
+    url = card_href(card, session)
+    w = IMAGE_WIDTH*IMAGE_SCALE
+    h = IMAGE_HEIGHT*IMAGE_SCALE
     image = dwg.image(url, insert=(x, y), size=(w, h))
     dwg.add(image)
 
 
-def r_insert(dwg):
-    insert_card(dwg,("r",0),260,350)
-    insert_card(dwg,("r",1),440,350)
-    insert_card(dwg,("r",2),620,350)
-    insert_card(dwg,("r",3),800,350)
-    insert_card(dwg,("r",4),620,80)
-    insert_card(dwg,("r",5),800,80)
+def r_insert(dwg, session=None):
+    for i, (x, y) in enumerate(CARD_POSITIONS):
+        insert_card(dwg,("r",i),x,y,session)
 
 
-def i_insert(dwg):
-    insert_card(dwg,("i",0),260,350)
-    insert_card(dwg,("i",1),440,350)
-    insert_card(dwg,("i",2),620,350)
-    insert_card(dwg,("i",3),800,350)
-    insert_card(dwg,("i",4),620,80)
-    insert_card(dwg,("i",5),800,80)
+def i_insert(dwg, session=None):
+    for i, (x, y) in enumerate(CARD_POSITIONS):
+        insert_card(dwg,("i",i),x,y,session)
+
+def hand_side(s, role):
+    """Which hand of cards ("r" or "i") is shown in role's view"""
+    if role == prob.POLICY_MAKER:
+        return "r"
+    elif role == prob.INSURANCE_COMPANY:
+        return "i"
+    elif s.whose_turn == prob.POLICY_MAKER:
+        return "r"
+    else:
+        return "i"
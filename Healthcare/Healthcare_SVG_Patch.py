@@ -0,0 +1,232 @@
+'''Healthcare_SVG_Patch.py
+Incremental updates for the Coverage Clash SVG view.
+
+In this mode every element that can change between two positions (turn
+indicator, goal rows, metric values, status lines, bar fills and values,
+cards, game-over box) is drawn with a stable id. After the first full frame
+a client only needs a patch
+
+  {element id: {attribute: new value or None to remove, 'text': new text}}
+
+listing what differs from the last frame sent for the same role, so its
+size grows with the number of changes rather than the size of the frame.
+The status panel has a variable number of lines; they are drawn into
+STATUS_SLOTS fixed slots, unused slots being empty texts.
+
+Usage:
+  stream = PatchStream()
+  kind, payload = stream.frame(s, roles)   # ('full', svg) or ('patch', dict)
+and on the client, for a patch, run APPLY_PATCH_JS's applyPatch(patch).
+'''
+
+from functools import lru_cache
+import Healthcare as prob
+import Healthcare_SVG_FOR_BRIFL as vis
+import Healthcare_SVG_Template as template
+from Healthcare_SVG_Template import (element, text, TEXT_COLOR,
+    MUTED_COLOR, W, H, WARNING_COLOR, SUCCESS_COLOR, LARGE_FS,
+    MEDIUM_FS, SMALL_FS)
+
+# Lines below the metrics in the status panel never exceed this; see
+# Healthcare_SVG_FOR_BRIFL.status_lines (at most 7 rows of 2 texts, plus the
+# unconditional premium cap row).
+STATUS_SLOTS = 16
+
+GOALS_AT = (20, 80)
+STATUS_AT = (350, 80)
+BARS_AT = (35, 350)
+BAR_WIDTH = 200
+BAR_HEIGHT = 18
+BAR_SPACING = 45
+
+def text_attrs(x, y, fill, size=SMALL_FS, weight=None, anchor=None):
+    attrs = {'x': str(x), 'y': str(y), 'fill': fill, 'font-size': size}
+    if weight is not None:
+        attrs['font-weight'] = weight
+    if anchor is not None:
+        attrs['text-anchor'] = anchor
+    return attrs
+
+#------------------------------------------------------------------
+# Frame model: id -> (tag, attrs, content), attributes as strings
+
+@lru_cache(maxsize=None)
+def static_markup(role):
+    """Everything in role's view that never changes, drawn first"""
+    if role is None:
+        return template.OBSERVER
+    parts = [text(W//2, 30, f"Coverage Clash - {prob.int_to_name(role)} View",
+                  TEXT_COLOR, size=LARGE_FS, weight="bold", anchor="middle"),
+             template.goals_skeleton(role, *GOALS_AT),
+             template.status_skeleton(*STATUS_AT)]
+    x, y = STATUS_AT
+    for i, (label, _, _) in enumerate(vis.status_metrics(prob.create_initial_state())):
+        parts.append(text(x + 10, y + 45 + 20*i, f"{label}:", MUTED_COLOR))
+    x, y = BARS_AT
+    parts.append(text(x, y - 25, "Key Indicators", TEXT_COLOR, size=MEDIUM_FS,
+                      weight="bold"))
+    for i, bar in enumerate(vis.progress_bars(prob.create_initial_state())):
+        parts.extend(template.bar_skeleton(bar[0], x, y + i*BAR_SPACING,
+                                           BAR_WIDTH, BAR_HEIGHT))
+    return ''.join(parts)
+
+def frame_model(s, role, session=None):
+    """The dynamic elements of role's view of s, in drawing order"""
+    model = {}
+    if role is None:
+        return model
+
+    turn_text = f"Current Turn: {prob.int_to_name(s.whose_turn)}"
+    if s.whose_turn == role:
+        turn_text += " (YOUR TURN)"
+        turn_color = SUCCESS_COLOR
+    else:
+        turn_color = MUTED_COLOR
+    model['turn'] = ('text', text_attrs(W//2, 55, turn_color, MEDIUM_FS,
+                                        anchor="middle"), turn_text)
+
+    # Goal rows; which rows have a value text depends only on the role
+    x, y = GOALS_AT
+    y_offset = 45
+    n = 0
+    for goal_item in vis.goal_rows(s, role):
+        if len(goal_item) == 3:
+            label, value, color = goal_item
+        else:
+            label, value, color = goal_item[0], goal_item[1], TEXT_COLOR
+        if label == "":
+            y_offset += 10
+            continue
+        weight = "bold" if "CONDITION" in label or "LOSING" in label else "normal"
+        model['goal-%d' % n] = ('text', text_attrs(x + 10, y + y_offset,
+            TEXT_COLOR if color == "" else color, weight=weight), label)
+        if value:
+            model['goal-%d-value' % n] = ('text', text_attrs(x + 310, y + y_offset,
+                color, anchor="end"), value)
+        n += 1
+        y_offset += 18
+
+    x, y = STATUS_AT
+    for i, (_, value, color) in enumerate(vis.status_metrics(s)):
+        model['metric-%d' % i] = ('text', text_attrs(x + 250, y + 45 + 20*i,
+            color, weight="bold", anchor="end"), value)
+    lines = vis.status_lines(s, x, y)
+    for i in range(STATUS_SLOTS):
+        if i < len(lines):
+            lx, ly, content, fill, weight, anchor = lines[i]
+            model['status-%d' % i] = ('text', text_attrs(lx, ly, fill,
+                weight=weight, anchor=anchor), content)
+        else:
+            model['status-%d' % i] = ('text', text_attrs(x + 10, y, TEXT_COLOR), "")
+
+    x, y = BARS_AT
+    for i, (label, value, max_val, color) in enumerate(vis.progress_bars(s)):
+        bar_y = y + i*BAR_SPACING
+        model['bar-%d' % i] = ('rect', {'x': str(x), 'y': str(bar_y + 2.5),
+            'width': str((value / max_val) * BAR_WIDTH),
+            'height': str(BAR_HEIGHT), 'fill': color}, None)
+        model['bar-%d-value' % i] = ('text', text_attrs(x + BAR_WIDTH + 10,
+            bar_y + 15, TEXT_COLOR), str(vis.bar_display_value(s, label, value)))
+
+    side = vis.hand_side(s, role)
+    w = str(vis.IMAGE_WIDTH*vis.IMAGE_SCALE)
+    h = str(vis.IMAGE_HEIGHT*vis.IMAGE_SCALE)
+    for i, (cx, cy) in enumerate(vis.CARD_POSITIONS):
+        model['card-%d' % i] = ('image', {'x': str(cx), 'y': str(cy),
+            'width': w, 'height': h, 'xlink:href': vis.card_href((side, i), session)}, None)
+
+    # Game-over box, always present and hidden while the game goes on
+    over = s.is_goal()
+    visibility = "visible" if over else "hidden"
+    box_x = (W - 400) // 2
+    box_y = (H - 150) // 2
+    model['gameover-shade'] = ('rect', {'x': "0", 'y': "0", 'width': str(W),
+        'height': str(H), 'fill': "rgba(0, 0, 0, 0.7)",
+        'visibility': visibility}, None)
+    model['gameover-box'] = ('rect', {'x': str(box_x), 'y': str(box_y),
+        'width': "400", 'height': "150", 'fill': "white",
+        'stroke': "rgb(200, 200, 200)", 'stroke-width': "3", 'rx': "10",
+        'visibility': visibility}, None)
+    model['gameover-title'] = ('text', dict(text_attrs(W//2, box_y + 40,
+        WARNING_COLOR, "32", "bold", "middle"), visibility=visibility),
+        "GAME OVER")
+    model['gameover-text'] = ('text', dict(text_attrs(W//2, box_y + 80,
+        TEXT_COLOR, MEDIUM_FS, anchor="middle"), visibility=visibility), s.win_text())
+    winner = s.status()[1]
+    winner = f"Winner: {prob.int_to_name(winner)}" if over and winner >= 0 else ""
+    model['gameover-winner'] = ('text', dict(text_attrs(W//2, box_y + 110,
+        SUCCESS_COLOR, MEDIUM_FS, "bold", "middle"), visibility=visibility),
+        winner)
+    return model
+
+def render_model(model, role):
+    """Full SVG for a frame model; returns (svg_string, alt_text)"""
+    if role is None:
+        alt_text = template.ALT_TEXT + "observer with no active role"
+    else:
+        alt_text = template.ALT_TEXT + prob.int_to_name(role)
+    parts = [template.HEAD, static_markup(role)]
+    for element_id, (tag, attrs, content) in model.items():
+        parts.append(element(tag, dict(attrs, id=element_id), content))
+    parts.append(element('title', {}, alt_text))
+    parts.append(template.TAIL)
+    return ''.join(parts), alt_text
+
+def diff_models(old, new):
+    """Patch turning frame model old into new (both for the same role)"""
+    patch = {}
+    for element_id, (tag, attrs, content) in new.items():
+        _, old_attrs, old_content = old[element_id]
+        if attrs == old_attrs and content == old_content:
+            continue
+        change = {name: value for name, value in attrs.items()
+                  if old_attrs.get(name) != value}
+        for name in old_attrs:
+            if name not in attrs:
+                change[name] = None
+        if content != old_content:
+            change['text'] = content
+        patch[element_id] = change
+    return patch
+
+#------------------------------------------------------------------
+
+class PatchStream:
+    """Remembers the last frame sent for each role and sends differences"""
+    def __init__(self):
+        self.sent = {}
+
+    def frame(self, s, roles=None, session=None):
+        """('full', svg_string) for a role's first frame, ('patch', patch)
+        after that; session as in render_state"""
+        role = vis.view_role(s, roles)
+        model = frame_model(s, role, session)
+        last = self.sent.get(role)
+        self.sent[role] = model
+        if last is None or last.keys() != model.keys():
+            return 'full', render_model(model, role)[0]
+        return 'patch', diff_models(last, model)
+
+    def reset(self, role=None):
+        """Forget what was sent (to one role), e.g. when a client reconnects"""
+        if role is None:
+            self.sent.clear()
+        else:
+            self.sent.pop(role, None)
+
+# Client side: applies a patch to the SVG in the page
+APPLY_PATCH_JS = """
+function applyPatch(patch) {
+  for (const [id, change] of Object.entries(patch)) {
+    const el = document.getElementById(id);
+    if (!el) continue;
+    for (const [name, value] of Object.entries(change)) {
+      if (name === 'text') el.textContent = value;
+      else if (name === 'xlink:href')
+        el.setAttributeNS('http://www.w3.org/1999/xlink', 'href', value);
+      else if (value === null) el.removeAttribute(name);
+      else el.setAttribute(name, value);
+    }
+  }
+}
+"""
@@ -0,0 +1,241 @@
+'''Healthcare_SVG_Template.py
+Template backend for the Coverage Clash SVG view.
+
+Produces the same markup as render_frame in Healthcare_SVG_FOR_BRIFL, but
+without building an svgwrite DOM: every element is compiled once into a
+string with %s holes for its dynamic parts (fill colour, text, bar width),
+and a frame is just those strings filled in and joined. The panel contents
+(goal rows, metrics, warnings, bars) come from the same helper functions the
+svgwrite backend uses, so the two can not drift apart.
+
+Usage:
+  import Healthcare_SVG_FOR_BRIFL as vis
+  vis.set_render_backend('template')
+or call render_frame(s, role[, session]) directly.
+'''
+
+from functools import lru_cache
+import Healthcare as prob
+import Healthcare_SVG_FOR_BRIFL as vis
+from Healthcare_SVG_FOR_BRIFL import (W, H, ROLE_COLORS, BACKGROUND_COLOR,
+    WARNING_COLOR, SUCCESS_COLOR, LARGE_FS, MEDIUM_FS,
+    SMALL_FS)
+
+TEXT_COLOR = "rgb(51, 51, 51)"
+MUTED_COLOR = "rgb(108, 117, 125)"
+
+ALT_TEXT = "Coverage Clash game state visualization for "
+
+#------------------------------------------------------------------
+# Markup compilation
+
+def text_escape(text):
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+def attr_escape(value):
+    return text_escape(value).replace('"', "&quot;")
+
+def element(tag, attrs, content=None):
+    """Markup for one element, attributes in svgwrite's (sorted) order"""
+    items = ''.join(' %s="%s"' % (name.replace('_', '-'), attr_escape(str(value)))
+                    for name, value in sorted(attrs.items())
+                    if value is not None)
+    if content is None:
+        return '<%s%s />' % (tag, items)
+    return '<%s%s>%s</%s>' % (tag, items, text_escape(content), tag)
+
+HOLE = '\x00'
+
+def template(tag, attrs, content=None):
+    """Like element(), but every HOLE value becomes a %s placeholder; the
+    holes are filled in sorted attribute order, then the content"""
+    markup = element(tag, attrs, content).replace('%', '%%')
+    return markup.replace(HOLE, '%s')
+
+@lru_cache(maxsize=None)
+def text_template(x, y, size=SMALL_FS, weight=None, anchor=None, fill=HOLE):
+    """<text> at (x, y) with holes for the content and (by default) the fill"""
+    return template('text', {'x': x, 'y': y, 'font_size': size,
+                             'font_weight': weight, 'text_anchor': anchor,
+                             'fill': fill}, HOLE)
+
+def text(x, y, content, fill, size=SMALL_FS, weight=None, anchor=None):
+    return text_template(x, y, size, weight, anchor) % (fill, text_escape(content))
+
+@lru_cache(maxsize=None)
+def bar_fill_template(x, y, height):
+    """Bar fill with holes for the fill colour and the width, in that order"""
+    return template('rect', {'x': x, 'y': y, 'width': HOLE, 'height': height,
+                             'fill': HOLE})
+
+def panel(x, y, width, height):
+    return element('rect', {'x': x, 'y': y, 'width': width, 'height': height,
+                            'fill': "white", 'stroke': "rgb(200, 200, 200)",
+                            'stroke_width': "1", 'rx': "5"})
+
+#------------------------------------------------------------------
+# Static parts of a frame
+
+HEAD = ('<svg baseProfile="full" height="%spx" id="state_svg" version="1.1" '
+        'width="%spx" xmlns="http://www.w3.org/2000/svg" '
+        'xmlns:ev="http://www.w3.org/2001/xml-events" '
+        'xmlns:xlink="http://www.w3.org/1999/xlink"><defs />' % (H, W)
+        + element('rect', {'x': 0, 'y': 0, 'width': str(W)+"px",
+                           'height': str(H)+"px", 'fill': BACKGROUND_COLOR,
+                           'stroke': "none"}))
+
+TAIL = '</svg>'
+
+OBSERVER = text(W//2, H//2, "Observer View - No Active Role", WARNING_COLOR,
+                size=LARGE_FS, anchor="middle")
+
+@lru_cache(maxsize=None)
+def header(role, whose_turn):
+    """Title and turn indicator"""
+    title = f"Coverage Clash - {prob.int_to_name(role)} View"
+    turn_text = f"Current Turn: {prob.int_to_name(whose_turn)}"
+    if whose_turn == role:
+        turn_text += " (YOUR TURN)"
+        turn_color = SUCCESS_COLOR
+    else:
+        turn_color = MUTED_COLOR
+    return (text(W//2, 30, title, TEXT_COLOR, size=LARGE_FS, weight="bold",
+                 anchor="middle")
+            + text(W//2, 55, turn_text, turn_color, size=MEDIUM_FS,
+                   anchor="middle"))
+
+@lru_cache(maxsize=None)
+def goals_skeleton(role, x, y):
+    panel_width = 320
+    return (panel(x, y, panel_width, 210)
+            + text(x + panel_width//2, y + 20, f"{prob.int_to_name(role)} Goals",
+                   ROLE_COLORS[role], size=MEDIUM_FS, weight="bold",
+                   anchor="middle"))
+
+@lru_cache(maxsize=None)
+def status_skeleton(x, y):
+    panel_width = 260
+    return (panel(x, y, panel_width, 260)
+            + text(x + panel_width//2, y + 20, "Current Status & Metrics",
+                   TEXT_COLOR, size=MEDIUM_FS, weight="bold", anchor="middle"))
+
+@lru_cache(maxsize=None)
+def bar_skeleton(label, x, y, bar_width, bar_height):
+    """Background and label of one progress bar"""
+    return (element('rect', {'x': x, 'y': y + 2.5, 'width': bar_width,
+                             'height': bar_height, 'fill': "rgb(233, 236, 239)",
+                             'stroke': "rgb(200, 200, 200)", 'stroke_width': "1"}),
+            text(x, y - 5, label, TEXT_COLOR))
+
+@lru_cache(maxsize=64)
+def hand_markup(hrefs):
+    """The six <image> elements of a hand, given their URLs"""
+    w = vis.IMAGE_WIDTH*vis.IMAGE_SCALE
+    h = vis.IMAGE_HEIGHT*vis.IMAGE_SCALE
+    return ''.join(element('image', {'x': x, 'y': y, 'width': w, 'height': h,
+                                     'xlink:href': href})
+                   for href, (x, y) in zip(hrefs, vis.CARD_POSITIONS))
+
+#------------------------------------------------------------------
+# Dynamic parts of a frame
+
+def goals_panel(parts, s, role, x, y):
+    panel_width = 320
+    parts.append(goals_skeleton(role, x, y))
+    y_offset = 45
+    for goal_item in vis.goal_rows(s, role):
+        if len(goal_item) == 3:
+            label, value, color = goal_item
+        else:
+            label, value, color = goal_item[0], goal_item[1], TEXT_COLOR
+        if label == "":
+            y_offset += 10
+            continue
+        weight = "bold" if "CONDITION" in label or "LOSING" in label else "normal"
+        parts.append(text(x + 10, y + y_offset, label,
+                          TEXT_COLOR if color == "" else color, weight=weight))
+        if value:
+            parts.append(text(x + panel_width - 10, y + y_offset, value, color,
+                              anchor="end"))
+        y_offset += 18
+
+def status_panel(parts, s, x, y):
+    panel_width = 260
+    parts.append(status_skeleton(x, y))
+    y_offset = 45
+    for label, value, color in vis.status_metrics(s):
+        parts.append(text(x + 10, y + y_offset, f"{label}:", MUTED_COLOR))
+        parts.append(text(x + panel_width - 10, y + y_offset, value, color,
+                          weight="bold", anchor="end"))
+        y_offset += 20
+    for lx, ly, content, fill, weight, anchor in vis.status_lines(s, x, y):
+        parts.append(text(lx, ly, content, fill, weight=weight, anchor=anchor))
+
+def progress_bars(parts, s, x, y):
+    bar_width = 200
+    bar_height = 18
+    bar_spacing = 45
+    parts.append(text(x, y - 25, "Key Indicators", TEXT_COLOR, size=MEDIUM_FS,
+                      weight="bold"))
+    y_offset = 0
+    for label, value, max_val, color in vis.progress_bars(s):
+        background, caption = bar_skeleton(label, x, y + y_offset, bar_width,
+                                           bar_height)
+        fill_width = (value / max_val) * bar_width
+        parts.append(background)
+        parts.append(bar_fill_template(x, y + y_offset + 2.5, bar_height)
+                     % (color, fill_width))
+        parts.append(caption)
+        display_value = vis.bar_display_value(s, label, value)
+        parts.append(text(x + bar_width + 10, y + y_offset + 15,
+                          str(display_value), TEXT_COLOR))
+        y_offset += bar_spacing
+
+def game_over(parts, s):
+    box_width = 400
+    box_height = 150
+    box_x = (W - box_width) // 2
+    box_y = (H - box_height) // 2
+    parts.append(game_over_skeleton(box_x, box_y, box_width, box_height))
+    parts.append(text(W//2, box_y + 80, s.win_text(), TEXT_COLOR,
+                      size=MEDIUM_FS, anchor="middle"))
+    winner = s.status()[1]
+    if winner >= 0:
+        parts.append(text(W//2, box_y + 110,
+                          f"Winner: {prob.int_to_name(winner)}",
+                          SUCCESS_COLOR, size=MEDIUM_FS, weight="bold",
+                          anchor="middle"))
+
+@lru_cache(maxsize=None)
+def game_over_skeleton(box_x, box_y, box_width, box_height):
+    return (element('rect', {'x': 0, 'y': 0, 'width': str(W), 'height': str(H),
+                             'fill': "rgba(0, 0, 0, 0.7)"})
+            + element('rect', {'x': box_x, 'y': box_y, 'width': box_width,
+                               'height': box_height, 'fill': "white",
+                               'stroke': "rgb(200, 200, 200)",
+                               'stroke_width': "3", 'rx': "10"})
+            + text(W//2, box_y + 40, "GAME OVER", WARNING_COLOR, size="32",
+                   weight="bold", anchor="middle"))
+
+#------------------------------------------------------------------
+
+def render_frame(s, role, session=None):
+    """Build the SVG for one view; returns (svg_string, alt_text)"""
+    parts = [HEAD]
+    if role is None:
+        parts.append(OBSERVER)
+        alt_text = ALT_TEXT + "observer with no active role"
+    else:
+        alt_text = ALT_TEXT + prob.int_to_name(role)
+        parts.append(header(role, s.whose_turn))
+        goals_panel(parts, s, role, 20, 80)
+        status_panel(parts, s, 350, 80)
+        progress_bars(parts, s, 35, 350)
+        side = vis.hand_side(s, role)
+        parts.append(hand_markup(tuple(vis.card_href((side, i), session)
+                                       for i in range(len(vis.CARD_POSITIONS)))))
+        if s.is_goal():
+            game_over(parts, s)
+    parts.append(element('title', {}, alt_text))
+    parts.append(TAIL)
+    return ''.join(parts), alt_text
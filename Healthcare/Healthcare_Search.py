@@ -0,0 +1,194 @@
+'''
+Healthcare_Search.py
+Expectimax search for Coverage Clash.
+
+The game is deterministic except for the 30% interception roll in
+request_funds, which the search treats as a chance node.  Values are
+from the Policy Maker's point of view: +1 for a Policy Maker win, -1 for
+an Insurance Company win, 0 when both sides lose.  The Policy Maker
+maximizes and the Insurance Company minimizes; because bonus and skipped
+turns break strict alternation, the side to move is read from whose_turn
+at every node.
+
+Max/min nodes use alpha-beta pruning, chance nodes use Star1 pruning
+(possible because values are bounded by [-1, 1]), and results are kept in
+a transposition table keyed on State.key().  Successors come from the
+shared successor cache (Healthcare.successors), so the positions that
+iterative deepening expands again at every depth are only generated
+once.  best_operator() runs iterative deepening until its time budget
+runs out.
+
+Usage:
+  python Healthcare_Search.py [milliseconds per move]
+'''
+
+import sys
+import time
+
+import Healthcare as prob
+
+WIN = 1.0
+LOSS = -1.0
+BOTH_LOSE_VALUE = 0.0
+EVAL_LIMIT = 0.9  # heuristic values stay strictly inside the terminal ones
+
+EXACT, LOWER, UPPER = 0, 1, 2
+
+class _Timeout(Exception):
+    pass
+
+def terminal_value(s):
+    # Value of s if the game is over there, else None.
+    code, winner = s.status()
+    if code == prob.END_ONGOING:
+        return None
+    if winner == prob.POLICY_MAKER:
+        return WIN
+    if winner == prob.INSURANCE_COMPANY:
+        return LOSS
+    return BOTH_LOSE_VALUE
+
+def evaluate(s):
+    # Heuristic value of a non-terminal state, in [-EVAL_LIMIT, EVAL_LIMIT].
+    # Progress towards each side's win condition, 0 at the start of a game.
+    pm = (30 - s.access_gap_index) / 17
+    ic = max((s.profit - 65) / 20, (s.access_gap_index - 30) / 15,
+             (50 - s.public_trust_meter) / 20)
+    value = (pm - ic) / 2
+    if value > EVAL_LIMIT:
+        return EVAL_LIMIT
+    if value < -EVAL_LIMIT:
+        return -EVAL_LIMIT
+    return value
+
+class Searcher:
+    # Holds the transposition table, which is kept between moves.
+    def __init__(self, max_table_size=1000000):
+        self.table = {}
+        self.max_table_size = max_table_size
+        self.nodes = 0
+        self.deadline = None
+
+    def search(self, s, depth, alpha=LOSS, beta=WIN):
+        # Expectimax value of s searched to depth plies.
+        self.nodes += 1
+        if self.deadline is not None and not self.nodes & 63 \
+           and time.perf_counter() > self.deadline:
+            raise _Timeout()
+        value = terminal_value(s)
+        if value is not None:
+            return value
+        if depth <= 0:
+            return evaluate(s)
+        key = s.key()
+        entry = self.table.get(key)
+        best_op = None
+        if entry is not None:
+            entry_depth, flag, entry_value, best_op = entry
+            if entry_depth >= depth:
+                if flag == EXACT:
+                    return entry_value
+                if flag == LOWER and entry_value > alpha:
+                    alpha = entry_value
+                elif flag == UPPER and entry_value < beta:
+                    beta = entry_value
+                if alpha >= beta:
+                    return entry_value
+        moves = prob.legal_op_ids(s)
+        if best_op in moves:
+            moves = (best_op,) + tuple(i for i in moves if i != best_op)
+        maximizing = s.whose_turn == prob.POLICY_MAKER
+        alpha0, beta0 = alpha, beta
+        best = None
+        for op_id in moves:
+            value = self.move_value(s, op_id, depth - 1, alpha, beta)
+            if maximizing:
+                if best is None or value > best:
+                    best, best_op = value, op_id
+                if best > alpha:
+                    alpha = best
+            else:
+                if best is None or value < best:
+                    best, best_op = value, op_id
+                if best < beta:
+                    beta = best
+            if alpha >= beta:
+                break
+        if best <= alpha0:
+            flag = UPPER
+        elif best >= beta0:
+            flag = LOWER
+        else:
+            flag = EXACT
+        if len(self.table) >= self.max_table_size:
+            self.table.clear()
+        self.table[key] = (depth, flag, best, best_op)
+        return best
+
+    def move_value(self, s, op_id, depth, alpha, beta):
+        chance = prob.successors(s, op_id)
+        if len(chance) == 1:
+            return self.search(chance[0][1], depth, alpha, beta)
+        # Star1: the children's values are bounded by [LOSS, WIN], so the
+        # window for each child can be narrowed from what is already known.
+        value = 0.0
+        remaining = 1.0
+        for probability, child in chance:
+            remaining -= probability
+            child_alpha = (alpha - value - remaining * WIN) / probability
+            child_beta = (beta - value - remaining * LOSS) / probability
+            v = self.search(child, depth, max(child_alpha, LOSS), min(child_beta, WIN))
+            value += probability * v
+            if v <= child_alpha:
+                return value + remaining * WIN    # fails low: an upper bound
+            if v >= child_beta:
+                return value + remaining * LOSS   # fails high: a lower bound
+        return value
+
+    def best_operator(self, s, time_budget=0.005, max_depth=64):
+        # Iterative deepening until time_budget seconds have passed.
+        # Returns (index into OPERATORS, value, depth completed).  There is
+        # no move to choose once the game is over, so s must not be
+        # terminal.
+        if s.is_goal():
+            raise ValueError("The game is over: there is no operator to choose")
+        narration = prob.NARRATION_MODE
+        prob.set_narration('off')
+        self.deadline = time.perf_counter() + time_budget
+        best_op, best_value, completed = None, 0.0, 0
+        try:
+            for depth in range(1, max_depth + 1):
+                value = self.search(s, depth)
+                best_op, best_value, completed = self.table[s.key()][3], value, depth
+                if abs(value) == WIN:
+                    break   # the game is decided; deeper search won't change it
+        except _Timeout:
+            pass
+        finally:
+            self.deadline = None
+            prob.set_narration(narration)
+        if best_op is None:
+            best_op = prob.legal_op_ids(s)[0]
+        return best_op, best_value, completed
+
+_SEARCHER = None
+
+def search_policy(s, moves, rng, time_budget=0.005):
+    # Policy for Healthcare_Sim: expectimax with a few milliseconds per move.
+    global _SEARCHER
+    if _SEARCHER is None:
+        _SEARCHER = Searcher()
+    return _SEARCHER.best_operator(s, time_budget)[0]
+
+def main(argv):
+    budget = (float(argv[1]) if len(argv) > 1 else 5) / 1000
+    searcher = Searcher()
+    s = prob.create_initial_state()
+    t0 = time.perf_counter()
+    op_id, value, depth = searcher.best_operator(s, budget)
+    elapsed = time.perf_counter() - t0
+    print(f"best move: {prob.OPERATORS[op_id].name} (value {value:+.3f}, "
+          f"depth {depth}, {searcher.nodes} nodes, {elapsed * 1000:.1f} ms)")
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,465 @@
+'''
+Healthcare_Server.py
+Asyncio game server hosting Coverage Clash rooms (Healthcare_Rooms.py).
+
+Clients talk to the server over plain TCP, one JSON object per line:
+
+  {"type": "join", "room": "r1", "user": "alice", "role": 0}
+  {"type": "move", "operator": 3}       index into OPERATORS
+  {"type": "view"}                      ask for a full view again
+  {"type": "leave"}
+
+A room is opened by the first client that joins it; "role" is a number
+from ROLES and defaults to the observers.  After every move, each client
+in the room is sent
+  {"type": "view", "room", "moves", "turn", "over", "legal", "format",
+   "data"[, "narration"][, "result"]}
+where "legal" lists the operators that client may apply now.  With SVG
+views "format" is "full" (data is the SVG) or "patch" (data is a patch
+for Healthcare_SVG_Patch.APPLY_PATCH_JS); with text views it is "text"
+and data is State.text_view_for_role; with json views it is "state" and
+data is Healthcare_State_API.state_payload, which the browser draws with
+RENDERER_JS, so the server never builds an SVG document.  Errors come back as
+{"type": "error", "message"}.
+
+Every connection has a bounded queue of outgoing lines drained by its own
+writer task.  Broadcasting only puts lines on those queues, so a slow
+reader never holds up a move or another room; a client whose queue
+overflows is disconnected.  An idle connection costs one reader and one
+writer task, so a process can hold thousands.
+
+Spectators (clients joined as observers) all see the same view, so they
+do not get one each: a room's Channel renders the observer view once per
+move, encodes the message once, and every spectator's writer sends those
+same bytes.  A spectator that is still writing when more moves arrive
+skips the frames in between (the frames are coalesced): it is sent the
+patch if it missed nothing, else the latest full frame, itself built at
+most once per move.  More spectators thus cost socket writes, not
+rendering.
+
+Narration and renderer debug output are process-wide settings, so the
+server does not change them itself: configure(views) sets them up for
+serving, and main() calls it.
+
+SVG views point the card images at /get_image/ on an image server, by
+default the SOLUZION game server on localhost:5000.
+
+Usage:
+  python Healthcare_Server.py serve [port] [svg|text|json] [image host] [image port]
+  python Healthcare_Server.py load [rooms] [observers per room] [port] [svg|text|json]
+                                   [image host] [image port]
+The second form starts a server in-process and plays random games in
+every room through real connections, then reports move latency.
+'''
+
+import asyncio
+import collections
+import json
+import random
+import sys
+import time
+import traceback
+
+import Healthcare as prob
+from Healthcare_Rooms import RoomError, RoomRegistry
+from Healthcare_State_API import state_payload
+
+DEFAULT_PORT = 8765
+DEFAULT_IMAGE_HOST = 'localhost'   # where SVG views fetch the card images
+DEFAULT_IMAGE_PORT = 5000
+QUEUE_LIMIT = 64        # outgoing lines buffered per client
+LINE_LIMIT = 1 << 16    # longest request line accepted
+OBSERVER_ROLE = len(prob.ROLES) - 1
+
+def encode(message):
+    return (json.dumps(message, separators=(',', ':')) + "\n").encode()
+
+class Client:
+    # One connection: its outgoing lines, and the room and role it joined.
+    def __init__(self, writer):
+        self.writer = writer
+        self.queue = collections.deque()
+        self.wakeup = asyncio.Event()
+        self.room = None
+        self.user = None
+        self.stream = None    # PatchStream for a player's SVG views
+        self.channel = None   # Channel for a spectator
+        self.seen = -1        # last channel version sent to a spectator
+        self.closed = False
+
+    def send(self, message):
+        # Never waits: a client that can not keep up is dropped.
+        if self.closed:
+            return
+        if len(self.queue) >= QUEUE_LIMIT:
+            self.close()
+            return
+        self.queue.append(encode(message))
+        self.wakeup.set()
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.writer.close()
+
+    async def write_loop(self):
+        try:
+            while True:
+                await self.wakeup.wait()
+                self.wakeup.clear()
+                while self.queue:
+                    self.writer.write(self.queue.popleft())
+                channel = self.channel
+                if channel is not None and self.seen != channel.version:
+                    try:
+                        frame = channel.frame_for(self.seen)
+                    except Exception as e:
+                        traceback.print_exc()
+                        frame = encode({'type': 'error',
+                                        'message': "Could not build the view: "+str(e)})
+                    self.writer.write(frame)
+                    self.seen = channel.version
+                await self.writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+
+class Channel:
+    # The spectators' view of one room, built once per move and shared.
+    def __init__(self, room, views):
+        self.room = room
+        self.views = views
+        self.subscribers = set()
+        self.version = 0
+        self.model = None     # frame model of the current version (SVG)
+        self.patch = None     # encoded patch from the previous version
+        self.full = None      # encoded full view, built on first request
+        self.narration = ""
+
+    def subscribe(self, client):
+        client.channel = self
+        client.seen = -1
+        self.subscribers.add(client)
+        client.wakeup.set()
+
+    def unsubscribe(self, client):
+        self.subscribers.discard(client)
+        client.channel = None
+
+    def message(self, fmt, data):
+        s = self.room.state
+        message = {'type': 'view', 'room': self.room.id, 'moves': self.room.moves,
+                   'turn': s.whose_turn, 'over': s.is_goal(), 'legal': [],
+                   'format': fmt, 'data': data}
+        if self.narration:
+            message['narration'] = self.narration
+        if message['over']:
+            message['result'] = s.win_text()
+        return encode(message)
+
+    def publish(self, narration=""):
+        # A move was made: build the patch for spectators that are up to
+        # date and wake them all.
+        self.version += 1
+        self.narration = narration
+        self.full = None
+        self.patch = None
+        if self.views == 'svg' and self.model is not None:
+            from Healthcare_SVG_Patch import diff_models, frame_model
+            model = frame_model(self.room.state, OBSERVER_ROLE, self.room.session)
+            if model.keys() == self.model.keys():
+                self.patch = self.message('patch', diff_models(self.model, model))
+            self.model = model
+        else:
+            self.model = None
+        for client in self.subscribers:
+            client.wakeup.set()
+
+    def frame_for(self, seen):
+        # Bytes to send a spectator whose last frame was version seen.
+        if seen == self.version - 1 and self.patch is not None:
+            return self.patch
+        if self.full is None:
+            s = self.room.state
+            if self.views == 'svg':
+                from Healthcare_SVG_Patch import frame_model, render_model
+                if self.model is None:
+                    self.model = frame_model(s, OBSERVER_ROLE, self.room.session)
+                self.full = self.message('full', render_model(self.model, OBSERVER_ROLE)[0])
+            elif self.views == 'json':
+                self.full = self.message('state', state_payload(s, OBSERVER_ROLE))
+            else:
+                self.full = self.message('text', s.text_view_for_role(OBSERVER_ROLE))
+        return self.full
+
+def configure(views):
+    # Process-wide settings for serving views: narration is recorded per
+    # state so it can be sent with the views, and the SVG module stops
+    # printing debug lines.  A GameServer leaves these globals alone; a
+    # program embedding one calls this once it knows the view format.
+    prob.set_narration('events')
+    if views == 'svg':
+        import Healthcare_SVG_FOR_BRIFL as vis
+        vis.DEBUG = False
+
+class GameServer:
+    def __init__(self, host='127.0.0.1', port=DEFAULT_PORT, views=None,
+                 rooms=None, image_host=DEFAULT_IMAGE_HOST, image_port=DEFAULT_IMAGE_PORT):
+        if views is None:
+            views = 'svg' if svg_available() else 'text'
+        if views not in ('svg', 'text', 'json'):
+            raise ValueError("Unknown view format: "+str(views))
+        self.host = host
+        self.port = port
+        self.views = views
+        self.rooms = RoomRegistry() if rooms is None else rooms
+        self.image_host = image_host
+        self.image_port = image_port
+        self.clients = {}   # room id -> set of Clients
+        self.channels = {}  # room id -> Channel of its spectators
+        self.server = None
+        self.handlers = {'join': self.join, 'move': self.move,
+                         'view': self.view, 'leave': self.leave}
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, self.host, self.port,
+                                                 limit=LINE_LIMIT, backlog=4096)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.server
+
+    async def serve_forever(self):
+        if self.server is None:
+            await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    def close(self):
+        if self.server is not None:
+            self.server.close()
+
+    async def handle(self, reader, writer):
+        client = Client(writer)
+        writer_task = asyncio.create_task(client.write_loop())
+        try:
+            while not client.closed:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    handler = self.handlers[request['type']]
+                except (ValueError, KeyError, TypeError):
+                    client.send({'type': 'error', 'message': "Bad request"})
+                    continue
+                try:
+                    handler(client, request)
+                except (RoomError, KeyError, ValueError, TypeError) as e:
+                    client.send({'type': 'error', 'message': str(e)})
+                except Exception as e:
+                    # A bug in one request: report it and keep the connection.
+                    traceback.print_exc()
+                    client.send({'type': 'error', 'message': "Server error: "+str(e)})
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            self.leave(client)
+            writer_task.cancel()
+            client.close()
+
+    #------------------
+    # Requests
+    def join(self, client, request):
+        if client.room is not None:
+            self.leave(client)
+        room_id = str(request['room'])
+        user = str(request['user'])
+        role = int(request.get('role', OBSERVER_ROLE))
+        try:
+            room = self.rooms.get(room_id)
+        except RoomError:
+            room = self.rooms.create(room_id, self.image_host, self.image_port)
+        room.join(user, role)
+        client.room = room
+        client.user = user
+        self.clients.setdefault(room.id, set()).add(client)
+        if role == OBSERVER_ROLE:
+            channel = self.channels.get(room.id)
+            if channel is None:
+                channel = self.channels[room.id] = Channel(room, self.views)
+            channel.subscribe(client)
+            return
+        if self.views == 'svg':
+            from Healthcare_SVG_Patch import PatchStream
+            client.stream = PatchStream()
+        client.send(self.view_message(client))
+
+    def move(self, client, request):
+        room = client.room
+        if room is None:
+            raise RoomError("Join a room first")
+        try:
+            op_id = int(request['operator'])
+        except (KeyError, ValueError, TypeError):
+            raise RoomError("A move needs an operator index")
+        room.apply(client.user, op_id)
+        narration = prob.transition_text(room.state)
+        for other in list(self.clients.get(room.id, ())):
+            if other.channel is None:
+                other.send(self.view_message(other, narration))
+        channel = self.channels.get(room.id)
+        if channel is not None:
+            channel.publish(narration)
+
+    def view(self, client, request):
+        if client.room is None:
+            raise RoomError("Join a room first")
+        if client.channel is not None:
+            client.seen = -1
+            client.wakeup.set()
+            return
+        if client.stream is not None:
+            client.stream.reset()
+        client.send(self.view_message(client))
+
+    def leave(self, client, request=None):
+        room = client.room
+        if room is None:
+            return
+        channel = client.channel
+        if channel is not None:
+            channel.unsubscribe(client)
+            if not channel.subscribers:
+                del self.channels[room.id]
+        members = self.clients.get(room.id)
+        if members is not None:
+            members.discard(client)
+            if not any(c.user == client.user for c in members):
+                room.leave(client.user)
+            if not members:
+                # Last connection gone: the room is closed.
+                del self.clients[room.id]
+                self.rooms.close(room.id)
+        client.room = None
+
+    #------------------
+    def view_message(self, client, narration=""):
+        room = client.room
+        s = room.state
+        roles = room.roles_of(client.user)
+        message = {'type': 'view', 'room': room.id, 'moves': room.moves,
+                   'turn': s.whose_turn, 'over': s.is_goal(),
+                   'legal': list(room.legal_operators(client.user))}
+        if client.stream is not None:
+            message['format'], message['data'] = client.stream.frame(s, roles, room.session)
+        elif self.views == 'json':
+            message['format'] = 'state'
+            message['data'] = state_payload(s, roles[0] if roles else OBSERVER_ROLE)
+        else:
+            role = roles[0] if roles else OBSERVER_ROLE
+            message['format'] = 'text'
+            message['data'] = s.text_view_for_role(role)
+        if narration:
+            message['narration'] = narration
+        if message['over']:
+            message['result'] = s.win_text()
+        return message
+
+def svg_available():
+    try:
+        import Healthcare_SVG_Patch
+    except ImportError:
+        return False
+    return True
+
+#------------------
+# Load test
+async def player(port, room_id, role, rng, latencies):
+    # Joins room_id in role and plays random legal moves until the game
+    # ends, timing each move until the mover's own view comes back.
+    reader, writer = await asyncio.open_connection('127.0.0.1', port, limit=LINE_LIMIT)
+    writer.write(encode({'type': 'join', 'room': room_id, 'user': f"p{role}", 'role': role}))
+    sent = None
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            message = json.loads(line)
+            if message['type'] != 'view':
+                continue
+            if sent is not None:
+                latencies.append(time.perf_counter() - sent)
+                sent = None
+            if message['over'] or message['moves'] >= 200:
+                return
+            if message['legal']:
+                writer.write(encode({'type': 'move', 'operator': rng.choice(message['legal'])}))
+                sent = time.perf_counter()
+    finally:
+        writer.close()
+
+async def observer(port, room_id, i, done):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port, limit=LINE_LIMIT)
+    writer.write(encode({'type': 'join', 'room': room_id, 'user': f"o{i}"}))
+    await writer.drain()
+    while not done.is_set():
+        try:
+            if not await asyncio.wait_for(reader.readline(), 0.5):
+                break
+        except asyncio.TimeoutError:
+            pass
+    writer.close()
+
+async def load_test(n_rooms=100, observers=5, port=0, views=None,
+                    image_host=DEFAULT_IMAGE_HOST, image_port=DEFAULT_IMAGE_PORT):
+    server = GameServer(port=port, views=views, image_host=image_host,
+                        image_port=image_port)
+    configure(server.views)
+    await server.start()
+    done = asyncio.Event()
+    latencies = []
+    watchers = [asyncio.create_task(observer(server.port, f"room{r}", i, done))
+                for r in range(n_rooms) for i in range(observers)]
+    await asyncio.sleep(0.2)
+    t0 = time.perf_counter()
+    rng = random.Random(0)
+    await asyncio.gather(*(player(server.port, f"room{r}", role,
+                                  random.Random(rng.random()), latencies)
+                           for r in range(n_rooms)
+                           for role in (prob.POLICY_MAKER, prob.INSURANCE_COMPANY)))
+    elapsed = time.perf_counter() - t0
+    done.set()
+    await asyncio.gather(*watchers)
+    server.close()
+    latencies.sort()
+    n = len(latencies)
+    print(f"{n_rooms} rooms, {n_rooms * (observers + 2)} connections, {server.views} views")
+    print(f"{n} moves in {elapsed:.2f}s ({n / elapsed:,.0f} moves/s)")
+    if n:
+        print(f"move latency: median {latencies[n // 2] * 1000:.2f} ms,"
+              f" p99 {latencies[int(n * 0.99)] * 1000:.2f} ms")
+
+def main(argv):
+    command = argv[1] if len(argv) > 1 else 'serve'
+    if command == 'serve':
+        port = int(argv[2]) if len(argv) > 2 else DEFAULT_PORT
+        views = argv[3] if len(argv) > 3 else None
+        image_host = argv[4] if len(argv) > 4 else DEFAULT_IMAGE_HOST
+        image_port = int(argv[5]) if len(argv) > 5 else DEFAULT_IMAGE_PORT
+        server = GameServer(port=port, views=views, image_host=image_host,
+                            image_port=image_port)
+        configure(server.views)
+        print(f"Coverage Clash server on port {port} ({server.views} views)")
+        asyncio.run(server.serve_forever())
+    elif command == 'load':
+        n_rooms = int(argv[2]) if len(argv) > 2 else 100
+        observers = int(argv[3]) if len(argv) > 3 else 5
+        port = int(argv[4]) if len(argv) > 4 else 0
+        views = argv[5] if len(argv) > 5 else None
+        image_host = argv[6] if len(argv) > 6 else DEFAULT_IMAGE_HOST
+        image_port = int(argv[7]) if len(argv) > 7 else DEFAULT_IMAGE_PORT
+        asyncio.run(load_test(n_rooms, observers, port, views, image_host, image_port))
+    else:
+        print(__doc__)
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,190 @@
+'''
+Healthcare_Sim.py
+Headless batch simulation for Coverage Clash.
+
+Plays complete games end to end without the Web_SOLUZION5 server,
+reusing OPERATORS, their preconditions and is_goal from Healthcare.py.
+Transition narration is switched off while games are being played, and
+moves are applied through the successor cache (Healthcare.SUCCESSORS),
+which rolls request_funds with the same random stream as the operators.
+
+run_games_parallel spreads games over a process pool.  Games are cut
+into fixed-size chunks and every chunk gets its own random stream derived
+from (seed, chunk number); that stream drives both the policies and the
+interception roll in request_funds.  The same seed therefore gives the
+same totals whatever the number of workers.
+
+Usage:
+  python Healthcare_Sim.py [games] [seed] [workers]
+'''
+
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+import Healthcare as prob
+
+# Outcome codes.  A win for either role uses the role number itself.
+BOTH_LOSE = -1   # uninsured rate or public health collapse
+DRAW = 2         # turn limit reached without a result
+
+MAX_TURNS = 200
+CHUNK_SIZE = 1000  # games per independently seeded chunk
+
+def legal_moves(s):
+    # Indices into prob.OPERATORS that apply in s, as a shared tuple (see
+    # Healthcare.legal_op_ids).
+    return prob.legal_op_ids(s)
+
+#------------------
+# Policies.  A policy is called as policy(s, moves, rng) and returns one
+# of the operator indices in moves.
+def random_policy(s, moves, rng):
+    return moves[int(rng.random() * len(moves))]
+
+def evaluate(s, role):
+    # Heuristic value of s from the point of view of role, in [-1, 1].
+    code, winner = s.status()
+    if code != prob.END_ONGOING:
+        if winner == role:
+            return 1.0
+        return -1.0
+    # Progress towards each side's win condition, 0 at the start of a game.
+    pm = (30 - s.access_gap_index) / 17
+    ic = max((s.profit - 65) / 20, (s.access_gap_index - 30) / 15,
+             (50 - s.public_trust_meter) / 20)
+    score = (pm - ic) / 4
+    if role == prob.INSURANCE_COMPANY:
+        score = -score
+    return score
+
+def greedy_policy(s, moves, rng):
+    # One-ply lookahead: pick the move whose successors evaluate best for
+    # the mover, weighting the outcomes of request_funds by their
+    # probability; ties are broken at random.  Only the tie-break draws
+    # from rng.
+    role = s.whose_turn
+    successors = prob.successors
+    best = None
+    best_moves = []
+    for i in moves:
+        value = sum(probability * evaluate(child, role)
+                    for probability, child in successors(s, i))
+        if best is None or value > best:
+            best = value
+            best_moves = [i]
+        elif value == best:
+            best_moves.append(i)
+    return best_moves[int(rng.random() * len(best_moves))]
+
+POLICIES = {'random': random_policy, 'greedy': greedy_policy}
+
+#------------------
+def play_game(pm_policy, ic_policy, rng, max_turns=MAX_TURNS):
+    # Plays one game and returns (outcome, number of moves made).
+    s = prob.create_initial_state()
+    policies = (pm_policy, ic_policy)
+    apply = prob.SUCCESSORS.apply
+    for turn in range(max_turns):
+        code, winner = s.status()
+        if code != prob.END_ONGOING:
+            return winner, turn
+        moves = legal_moves(s)
+        s = apply(s, policies[s.whose_turn](s, moves, rng))
+    code, winner = s.status()
+    if code != prob.END_ONGOING:
+        return winner, max_turns
+    return DRAW, max_turns
+
+def new_results():
+    return {'games': 0,
+            'policy_maker_wins': 0,
+            'insurance_company_wins': 0,
+            'both_lose': 0,
+            'draws': 0,
+            'moves': 0}
+
+RESULT_KEYS = {prob.POLICY_MAKER: 'policy_maker_wins',
+               prob.INSURANCE_COMPANY: 'insurance_company_wins',
+               BOTH_LOSE: 'both_lose',
+               DRAW: 'draws'}
+
+def merge_results(a, b):
+    return {key: a[key] + b[key] for key in a}
+
+def run_games(n, pm_policy=random_policy, ic_policy=random_policy,
+              seed=None, max_turns=MAX_TURNS):
+    # Plays n games in this process and returns aggregate statistics as
+    # a dict.  One random stream, seeded from seed, drives the policies
+    # and the operators' chance events.
+    rng = random.Random(seed)
+    results = new_results()
+    narration = prob.NARRATION_MODE
+    old_rng = prob.RNG
+    prob.set_narration('off')
+    prob.set_rng(rng)
+    try:
+        for _ in range(n):
+            outcome, moves = play_game(pm_policy, ic_policy, rng, max_turns)
+            results[RESULT_KEYS[outcome]] += 1
+            results['moves'] += moves
+    finally:
+        prob.set_narration(narration)
+        prob.set_rng(old_rng)
+    results['games'] = n
+    return results
+
+def chunk_seed(seed, chunk):
+    # String seeds are hashed deterministically by random.Random.
+    return f"{seed}/{chunk}"
+
+def _run_chunk(args):
+    chunk, games, pm_policy, ic_policy, seed, max_turns = args
+    return run_games(games, pm_policy, ic_policy, chunk_seed(seed, chunk), max_turns)
+
+def run_games_parallel(n, pm_policy=random_policy, ic_policy=random_policy,
+                       seed=0, workers=None, max_turns=MAX_TURNS,
+                       chunk_size=CHUNK_SIZE):
+    # Plays n games over a pool of worker processes (all cores by default)
+    # and returns the merged statistics.  Results depend only on n, seed
+    # and chunk_size, never on the number of workers.  Policies must be
+    # module-level functions so they can be sent to the workers.
+    tasks = []
+    for chunk, start in enumerate(range(0, n, chunk_size)):
+        tasks.append((chunk, min(chunk_size, n - start), pm_policy, ic_policy,
+                      seed, max_turns))
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(tasks)))
+    results = new_results()
+    if workers == 1:
+        for part in map(_run_chunk, tasks):
+            results = merge_results(results, part)
+        return results
+    with multiprocessing.Pool(workers) as pool:
+        for part in pool.imap_unordered(_run_chunk, tasks):
+            results = merge_results(results, part)
+    return results
+
+def format_results(results):
+    n = results['games'] or 1
+    lines = []
+    for key in ('policy_maker_wins', 'insurance_company_wins', 'both_lose', 'draws'):
+        lines.append(f"{key:>24}: {results[key]:>9} ({100 * results[key] / n:5.1f}%)")
+    lines.append(f"{'average moves':>24}: {results['moves'] / n:9.1f}")
+    return "\n".join(lines)
+
+def main(argv):
+    n = int(argv[1]) if len(argv) > 1 else 10000
+    seed = int(argv[2]) if len(argv) > 2 else 0
+    workers = int(argv[3]) if len(argv) > 3 else None
+    t0 = time.perf_counter()
+    results = run_games_parallel(n, seed=seed, workers=workers)
+    elapsed = time.perf_counter() - t0
+    print(format_results(results))
+    print(f"{n} games in {elapsed:.2f}s ({n / elapsed * 60:,.0f} games/minute)")
+
+if __name__ == '__main__':
+    main(sys.argv)
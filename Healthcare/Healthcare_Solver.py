@@ -0,0 +1,274 @@
+'''
+Healthcare_Solver.py
+Retrograde solution table for Coverage Clash.
+
+The solver enumerates the positions reachable from create_initial_state()
+by breadth-first search, then computes the expectimax value and best move
+of every position by backward induction, deepest positions first (the
+value convention is the one in Healthcare_Search.py).  The reachable set
+grows about 2.5x per ply and real games run for 20-40 plies, so the whole
+game cannot be enumerated in memory; the enumeration therefore stops at a
+configurable horizon.  Positions on the horizon get the heuristic value of
+Healthcare_Search.evaluate, and every entry records whether its value is
+exact: proven by the terminal positions below it, so that no value the
+horizon positions could turn out to have would change it or its move.
+Positions from which a result can be forced within the horizon are exact
+(at horizon 8, 5,847 of the 200,914 positions); the rest carry the
+heuristic expectimax value.
+
+The results are written to a compact binary file that can be memory
+mapped: an open-addressing hash table of fixed 16-byte slots, so a lookup
+at runtime is O(1) and needs neither the solver nor NumPy.
+
+File layout (little-endian):
+  header: magic b'CCSOLVE1', version (uint32), horizon (uint32),
+          slot count (uint64, a power of two)
+  slots:  packed key + 1 (uint64, 0 = empty), value (float32),
+          operator index (uint8), exact flag (uint8), 2 padding bytes
+
+Usage:
+  python Healthcare_Solver.py [horizon] [output file]
+'''
+
+import mmap
+import struct
+import sys
+import time
+
+import Healthcare as prob
+from Healthcare_Search import LOSS, WIN, evaluate, terminal_value
+
+MAGIC = b'CCSOLVE1'
+# Version 2: uninsured rates are kept in tenths, so State.key() now agrees
+# with terminal_status and version 1 tables may merge distinct positions.
+VERSION = 2
+HEADER = struct.Struct('<8sIIQ')
+SLOT = struct.Struct('<QfBBxx')
+DEFAULT_HORIZON = 8
+DEFAULT_PATH = 'coverage_clash_solution.bin'
+# Bounds closer than this are taken to have met (they are sums of the
+# same products, so only rounding can keep them apart).
+EXACT_TOLERANCE = 1e-9
+
+# Bit layout of a packed key for a non-terminal position: (field, offset,
+# bits).  Win/lose conditions bound the metrics of non-terminal positions,
+# so each fits in a few bits after subtracting its offset.
+KEY_LAYOUT = (
+    ('whose_turn', 0, 1),
+    ('uninsured_tenths', 0, 8),             # 0 .. 17.8%
+    ('public_health_index', 30, 7),         # 30 .. 100
+    ('access_gap_index', 13, 6),            # 13 .. 45
+    ('profit', 0, 7),                       # 0 .. 85
+    ('public_trust_meter', 30, 7),          # 30 .. 100
+    ('influence_meter', 0, 7),              # 0 .. 100
+    ('budget', 0, 8),                       # 0 .. 200
+    ('premium_cap_turns_left', 0, 2),
+    ('skip_next_turn', 0, 1),
+    ('bribe_choice_active', 0, 1),
+    ('public_expansion_cap_turns_left', 0, 2),
+    ('last_lobbied', 0, 2),                 # capped at 3, as in State.key()
+    ('policymaker_bonus_turn_used_55', 0, 1),
+    ('policymaker_bonus_turn_used_62', 0, 1),
+    ('policymaker_bonus_turn_used_72', 0, 1),
+)
+
+def pack_key(s):
+    # Packs State.key() of a non-terminal position into one integer
+    # (62 bits).  The order of KEY_LAYOUT follows State.key().
+    packed = 0
+    for value, (_, offset, bits) in zip(s.key(), KEY_LAYOUT):
+        packed = (packed << bits) | (int(value) - offset)
+    return packed
+
+def slot_hash(packed, bits):
+    # Multiplicative (Fibonacci) hashing onto 2**bits slots.
+    return ((packed * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) >> (64 - bits)
+
+#------------------
+# Solving
+def enumerate_positions(horizon, root=None):
+    # Breadth-first enumeration of the non-terminal positions reachable
+    # within horizon plies of root (the initial state by default).  Returns
+    # (layers, edges, states, horizon_values): layers[d] lists the keys
+    # first reached at ply d, edges maps each key inside the horizon to
+    # [(op_id, [(probability, child key or terminal value)])], states maps
+    # keys to States, and horizon_values holds the heuristic value of each
+    # position on the horizon.
+    s0 = prob.create_initial_state() if root is None else root
+    layers = [[s0.key()]]
+    states = {s0.key(): s0}
+    edges = {}
+    for depth in range(horizon):
+        next_layer = []
+        for key in layers[depth]:
+            s = states[key]
+            moves = []
+            for op_id in prob.legal_op_ids(s):
+                results = []
+                for probability, child in prob.operator_outcomes(s, op_id):
+                    value = terminal_value(child)
+                    if value is not None:
+                        results.append((probability, value))
+                        continue
+                    child_key = child.key()
+                    if child_key not in states:
+                        states[child_key] = child
+                        next_layer.append(child_key)
+                    results.append((probability, child_key))
+                moves.append((op_id, results))
+            edges[key] = moves
+        layers.append(next_layer)
+    horizon_values = {key: evaluate(states[key]) for key in layers[horizon]}
+    return layers, edges, states, horizon_values
+
+def solve(horizon=DEFAULT_HORIZON, max_sweeps=10, root=None):
+    # Returns {State.key(): (value, best op_id, exact)} for every
+    # position reachable within horizon plies of root (the initial state
+    # by default), plus the States themselves.
+    #
+    # Besides its value, every position gets bounds (low, high) on its
+    # true, fully solved value: a terminal result is known exactly, and a
+    # horizon position could be anything from LOSS to WIN.  A move's bounds
+    # are the probability-weighted bounds of its outcomes, and a position's
+    # are the best of its moves' for the player to move.  When the two
+    # meet, the best proven move is at least as good as anything the
+    # other moves could still turn out to be worth, so the position is
+    # exact: its value and move no longer depend on the horizon.
+    if root is not None and terminal_value(root) is not None:
+        raise ValueError("The game is over at the root: there is nothing to solve")
+    narration = prob.NARRATION_MODE
+    prob.set_narration('off')
+    try:
+        layers, edges, states, horizon_values = enumerate_positions(horizon, root)
+    finally:
+        prob.set_narration(narration)
+    solution = {key: (value, -1, False) for key, value in horizon_values.items()}
+    bounds = {}
+    order = [key for layer in reversed(layers[:horizon]) for key in layer]
+    # One sweep, deepest first, is enough unless a move leads back to a
+    # shallower position; repeat sweeps until nothing changes.
+    for _ in range(max_sweeps):
+        changed = False
+        for key in order:
+            maximizing = key[0] == prob.POLICY_MAKER
+            best_value, best_op = None, -1
+            low, high, proven_op = None, None, -1
+            for op_id, results in edges[key]:
+                value = move_low = move_high = 0.0
+                for probability, child in results:
+                    if isinstance(child, tuple):
+                        child_value = solution.get(child, (0.0, -1, False))[0]
+                        child_low, child_high = bounds.get(child, (LOSS, WIN))
+                    else:
+                        child_value = child_low = child_high = child
+                    value += probability * child_value
+                    move_low += probability * child_low
+                    move_high += probability * child_high
+                if best_value is None or (value > best_value if maximizing else value < best_value):
+                    best_value, best_op = value, op_id
+                if maximizing:
+                    if low is None or move_low > low:
+                        low, proven_op = move_low, op_id
+                    high = move_high if high is None else max(high, move_high)
+                else:
+                    if high is None or move_high < high:
+                        high, proven_op = move_high, op_id
+                    low = move_low if low is None else min(low, move_low)
+            if high - low <= EXACT_TOLERANCE:
+                entry = (low if maximizing else high, proven_op, True)
+            else:
+                entry = (best_value, best_op, False)
+            if solution.get(key) != entry or bounds.get(key) != (low, high):
+                solution[key] = entry
+                bounds[key] = (low, high)
+                changed = True
+        if not changed:
+            break
+    return solution, states
+
+#------------------
+# On-disk table
+def write_table(path, solution, states, horizon):
+    # Writes the solution as a memory-mappable open-addressing table with
+    # a load factor of at most 1/2.
+    bits = max(1, (2 * len(solution) - 1).bit_length())
+    size = 1 << bits
+    table = bytearray(HEADER.size + size * SLOT.size)
+    HEADER.pack_into(table, 0, MAGIC, VERSION, horizon, size)
+    mask = size - 1
+    for key, (value, op_id, exact) in solution.items():
+        packed = pack_key(states[key])
+        slot = slot_hash(packed, bits)
+        while SLOT.unpack_from(table, HEADER.size + slot * SLOT.size)[0]:
+            slot = (slot + 1) & mask
+        SLOT.pack_into(table, HEADER.size + slot * SLOT.size,
+                       packed + 1, value, op_id if op_id >= 0 else 255, exact)
+    with open(path, 'wb') as f:
+        f.write(table)
+
+class SolutionTable:
+    # Read-only view of a solution file, memory mapped.
+    def __init__(self, path=DEFAULT_PATH):
+        self.file = open(path, 'rb')
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.horizon, self.size = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC:
+            raise ValueError("Not a Coverage Clash solution file: " + str(path))
+        if version != VERSION:
+            raise ValueError("Solution file %s has version %d, expected %d; solve it again"
+                             % (path, version, VERSION))
+        self.bits = self.size.bit_length() - 1
+
+    def lookup(self, s):
+        # Returns (op_id, value, exact) for s, or None if s is terminal or
+        # not in the table.  op_id is None for horizon positions, which
+        # only carry a heuristic value.
+        if terminal_value(s) is not None:
+            return None
+        target = pack_key(s) + 1
+        mask = self.size - 1
+        slot = slot_hash(target - 1, self.bits)
+        while True:
+            stored, value, op_id, exact = SLOT.unpack_from(self.data, HEADER.size + slot * SLOT.size)
+            if stored == target:
+                return (None if op_id == 255 else op_id), value, bool(exact)
+            if stored == 0:
+                return None
+            slot = (slot + 1) & mask
+
+    def best_operator(self, s):
+        entry = self.lookup(s)
+        if entry is None:
+            return None
+        return entry[0]
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+def hint(table, s):
+    # Name of the table's best move for the player to move in s, or None.
+    op_id = table.best_operator(s)
+    if op_id is None:
+        return None
+    return prob.OPERATORS[op_id].name
+
+def main(argv):
+    horizon = int(argv[1]) if len(argv) > 1 else DEFAULT_HORIZON
+    path = argv[2] if len(argv) > 2 else DEFAULT_PATH
+    t0 = time.perf_counter()
+    solution, states = solve(horizon)
+    t1 = time.perf_counter()
+    write_table(path, solution, states, horizon)
+    exact = sum(1 for _, _, e in solution.values() if e)
+    print(f"{len(solution)} positions ({exact} exact) solved in {t1 - t0:.1f}s, "
+          f"written to {path}")
+    table = SolutionTable(path)
+    s = prob.create_initial_state()
+    op_id, value, exact = table.lookup(s)
+    print(f"opening: {prob.OPERATORS[op_id].name} (value {value:+.3f}, "
+          f"{'exact' if exact else 'heuristic'})")
+    table.close()
+
+if __name__ == '__main__':
+    main(sys.argv)
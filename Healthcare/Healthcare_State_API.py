@@ -0,0 +1,496 @@
+'''
+Healthcare_State_API.py
+Compact state payloads for Coverage Clash, drawn in the browser.
+
+An SVG frame is a whole document (about 10 KB) built on the server for
+every view.  A payload carries just what the dashboard shows: the game
+fields, the end of the game, and the flags the renderer derives from
+them (goal rows going well or badly, metric colour levels, warnings,
+alerts, lobbying).  The rules behind the flags live here only, and the
+svgwrite view (Healthcare_SVG_FOR_BRIFL) reads them from here as well,
+so the two drawings can not disagree.  RENDERER_JS draws the same
+dashboard from a payload; renderer_page() wraps it in a static HTML page.
+
+JSON form (state_payload), about 150 bytes:
+  {"role": viewing role or null, "end": END_* code, "winner",
+   "s": [values of WIRE_FIELDS], "goals": bit mask over the role's goal
+   flags, "metrics": [level of each of METRICS], "warnings": bit mask
+   over WARNINGS, "alerts": bit mask over ALERTS, "lobby": LOBBY_* code
+   [, "win": text, when State.win differs from END_MESSAGES]}
+The uninsured rate is sent in tenths of a percent, so every field of
+"s" is an integer.
+
+Binary form (pack_payload), little-endian, 44 bytes:
+  version (uint8), role (int8, -1 for none), end (uint8), winner (int8),
+  one int16 per WIRE_FIELDS, goals, warnings, alerts, lobby (uint8 each),
+  metric levels (uint16, 2 bits each, first metric in the low bits)
+It carries no "win" text; unpack_payload returns the JSON form.
+
+Usage:
+  payload = state_payload(s, role)
+  data = pack_payload(s, role)
+  python Healthcare_State_API.py page [output file] [host] [port]
+'''
+
+import json
+import struct
+import sys
+from operator import attrgetter
+
+import Healthcare as prob
+
+PAYLOAD_VERSION = 1
+
+# Fields sent to the client, in order.  current_role is the name of
+# current_role_num, win is replaced by the end code, and funded and
+# intercepted only matter to narration.
+WIRE_FIELDS = ('whose_turn', 'current_role_num', 'uninsured_rate',
+               'public_health_index', 'access_gap_index', 'profit',
+               'public_trust_meter', 'influence_meter', 'budget',
+               'premium_cap_turns_left', 'skip_next_turn',
+               'bribe_choice_active', 'public_expansion_cap_turns_left',
+               'last_lobbied', 'policymaker_bonus_turn_used_55',
+               'policymaker_bonus_turn_used_62',
+               'policymaker_bonus_turn_used_72')
+UNINSURED_INDEX = WIRE_FIELDS.index('uninsured_rate')
+
+PACKED = struct.Struct('<BbBb' + 'h'*len(WIRE_FIELDS) + 'BBBBH')
+
+#------------------
+# Derived flags
+
+LEVEL_GOOD = 0
+LEVEL_CAUTION = 1
+LEVEL_BAD = 2
+LEVEL_PLAIN = 3   # no colour coding
+
+LOBBY_NONE = 0
+LOBBY_WAITING = 1
+LOBBY_READY = 2
+
+def health_level(value, threshold, higher_is_worse):
+    if higher_is_worse:
+        if value > threshold * 0.8:
+            return LEVEL_BAD
+        elif value > threshold * 0.6:
+            return LEVEL_CAUTION
+        return LEVEL_GOOD
+    if value < threshold * 1.2:
+        return LEVEL_BAD
+    elif value < threshold * 1.5:
+        return LEVEL_CAUTION
+    return LEVEL_GOOD
+
+def budget_level(value):
+    if value < 15:
+        return LEVEL_BAD
+    elif value < 30:
+        return LEVEL_CAUTION
+    return LEVEL_GOOD
+
+# Rows of each role's goals panel: (label, value, flag).  value is a
+# str.format template applied with s=State; flag indexes goal_flags(s,
+# role) and is None for headings and spacers, which are not coloured.
+GOAL_ROWS = {
+  prob.POLICY_MAKER: (
+    ("WIN CONDITION:", "", None),
+    ("Access Gap < 13", "(currently {s.access_gap_index})", 0),
+    ("", "", None),
+    ("AVOID LOSING:", "", None),
+    ("Uninsured > 17.8%", "(currently {s.uninsured_rate:.1f}%)", 1),
+    ("Public Health Index < 30", "(currently {s.public_health_index})", 2),
+    ("Access Gap Index > 45", "(currently {s.access_gap_index})", 3),
+    ("Public Trust Meter < 30%", "(currently {s.public_trust_meter}%)", 4),
+    ("Insurer Profit > $85B", "", 5),
+    ("(Insurer wins)", "(currently ${s.profit}B)", 5)),
+  prob.INSURANCE_COMPANY: (
+    ("WIN CONDITION:", "", None),
+    ("Profit > $85B", "(currently ${s.profit}B)", 0),
+    ("Access Gap > 45", "", 1),
+    ("(Policymaker loses)", "(currently {s.access_gap_index})", 1),
+    ("", "", None),
+    ("AVOID LOSING:", "", None),
+    ("Uninsured > 17.8%", "(currently {s.uninsured_rate:.1f}%)", 2),
+    ("Public Health < 30", "(currently {s.public_health_index})", 3)),
+}
+
+def goal_flags(s, role):
+    # For each goal flag of role, True if it is going role's way.
+    if role == prob.POLICY_MAKER:
+        return (s.access_gap_index < 12,
+                s.uninsured_rate <= 15.5,
+                s.public_health_index >= 40,
+                s.access_gap_index <= 40,
+                s.public_trust_meter >= 37,
+                s.profit <= 78)
+    if role == prob.INSURANCE_COMPANY:
+        return (s.profit > 80,
+                s.access_gap_index > 40,
+                s.uninsured_rate <= 15.5,
+                s.public_health_index >= 40)
+    return ()
+
+# Rows of the status panel: (label, value template as in GOAL_ROWS)
+METRICS = (("Uninsured Rate", "{s.uninsured_rate:.1f}%"),
+           ("Public Health Index", "{s.public_health_index}"),
+           ("Access Gap Index", "{s.access_gap_index}"),
+           ("Insurance Profit", "${s.profit}B"),
+           ("Policy Budget", "${s.budget}B"))
+
+def metric_levels(s):
+    return (health_level(s.uninsured_rate, 25, True),
+            health_level(s.public_health_index, 30, False),
+            health_level(s.access_gap_index, 50, True),
+            LEVEL_PLAIN,
+            budget_level(s.budget))
+
+WARNINGS = ("High Uninsured Rate!", "Poor Public Health!", "Low Budget!",
+            "High Access Gap!")
+
+def warning_flags(s):
+    return (s.uninsured_rate > 20,
+            s.public_health_index < 40,
+            s.budget < 15,
+            s.access_gap_index > 40)
+
+# (message, level) of each alert
+ALERTS = (("Policy Maker close to victory!", LEVEL_GOOD),
+          ("Insurance Company close to victory!", LEVEL_BAD),
+          ("Approaching failure condition!", LEVEL_BAD),
+          ("Health crisis approaching!", LEVEL_BAD))
+
+def alert_flags(s):
+    return (12 <= s.access_gap_index < 20,
+            80 < s.profit <= 85,
+            s.uninsured_rate > 15.5,
+            s.public_health_index < 35)
+
+def lobby_status(s):
+    if s.influence_meter >= 75:
+        return LOBBY_READY if s.last_lobbied >= 3 else LOBBY_WAITING
+    return LOBBY_NONE
+
+def bit_mask(flags):
+    mask = 0
+    for i, flag in enumerate(flags):
+        if flag:
+            mask |= 1 << i
+    return mask
+
+#------------------
+# Payloads
+
+_get_wire_fields = attrgetter(*WIRE_FIELDS)
+
+def wire_values(s):
+    values = [int(v) for v in _get_wire_fields(s)]
+    values[UNINSURED_INDEX] = round(s.uninsured_rate * 10)
+    return values
+
+def state_payload(s, role=None):
+    # The JSON form of role's view of s (role None for an observer).
+    code, winner = s.status()
+    payload = {'role': role, 'end': code, 'winner': winner,
+               's': wire_values(s),
+               'goals': bit_mask(goal_flags(s, role)),
+               'metrics': list(metric_levels(s)),
+               'warnings': bit_mask(warning_flags(s)),
+               'alerts': bit_mask(alert_flags(s)),
+               'lobby': lobby_status(s)}
+    if s.win != "" and s.win != prob.END_MESSAGES.get(code):
+        payload['win'] = s.win
+    return payload
+
+def pack_payload(s, role=None):
+    # The binary form of state_payload(s, role).
+    code, winner = s.status()
+    levels = 0
+    for i, level in enumerate(metric_levels(s)):
+        levels |= level << (2*i)
+    return PACKED.pack(PAYLOAD_VERSION, -1 if role is None else role, code,
+                       winner, *wire_values(s),
+                       bit_mask(goal_flags(s, role)),
+                       bit_mask(warning_flags(s)),
+                       bit_mask(alert_flags(s)),
+                       lobby_status(s), levels)
+
+def unpack_payload(data):
+    values = PACKED.unpack(data)
+    if values[0] != PAYLOAD_VERSION:
+        raise ValueError("Payload version "+str(values[0])+", expected "+str(PAYLOAD_VERSION))
+    n = len(WIRE_FIELDS)
+    goals, warnings, alerts, lobby, levels = values[4 + n:]
+    return {'role': None if values[1] < 0 else values[1],
+            'end': values[2], 'winner': values[3],
+            's': list(values[4:4 + n]),
+            'goals': goals,
+            'metrics': [(levels >> (2*i)) & 3 for i in range(len(METRICS))],
+            'warnings': warnings, 'alerts': alerts, 'lobby': lobby}
+
+#------------------
+# Browser side
+
+def renderer_tables(card_hrefs=None):
+    # Everything RENDERER_JS needs besides a payload.  card_hrefs maps
+    # 'r' and 'i' to the six card image URLs of each hand.
+    return {'fields': WIRE_FIELDS,
+            'names': prob.NAMES,
+            'goals': GOAL_ROWS,
+            'metrics': METRICS,
+            'warnings': WARNINGS,
+            'alerts': ALERTS,
+            'endMessages': prob.END_MESSAGES,
+            'cards': card_hrefs}
+
+def card_hrefs(session=None):
+    # Card image URLs as the SVG view would use them, or None without
+    # svgwrite (the page then leaves the cards out).
+    try:
+        import Healthcare_SVG_FOR_BRIFL as vis
+    except ImportError:
+        return None
+    return {side: [vis.card_href((side, i), session) for i in range(len(vis.CARD_POSITIONS))]
+            for side in ('r', 'i')}
+
+# Draws a payload into an <svg> element with the layout of render_frame
+# in Healthcare_SVG_FOR_BRIFL.  TABLES is renderer_tables() as JSON.
+RENDERER_JS = r"""
+const SVG_NS = 'http://www.w3.org/2000/svg';
+const XLINK_NS = 'http://www.w3.org/1999/xlink';
+const W = 1000, H = 620;
+const TEXT = 'rgb(51, 51, 51)', MUTED = 'rgb(108, 117, 125)';
+const ACCENT = 'rgb(25, 135, 84)', WARNING = 'rgb(220, 53, 69)';
+const SUCCESS = 'rgb(40, 167, 69)', CAUTION = 'rgb(255, 193, 7)';
+const LEVEL_COLORS = [SUCCESS, CAUTION, WARNING, TEXT];
+const ROLE_COLORS = ['rgb(70, 130, 180)', 'rgb(220, 20, 60)', 'rgb(128, 128, 128)'];
+const CARD_POSITIONS = [[260,350], [440,350], [620,350], [800,350], [620,80], [800,80]];
+const CARD_W = 360*0.65, CARD_H = 400*0.65;
+
+function unpackPayload(buffer) {
+  const v = new DataView(buffer);
+  const n = TABLES.fields.length;
+  const s = [];
+  for (let i = 0; i < n; i++) s.push(v.getInt16(4 + 2*i, true));
+  const at = 4 + 2*n;
+  const levels = v.getUint16(at + 4, true);
+  const metrics = TABLES.metrics.map((_, i) => (levels >> (2*i)) & 3);
+  const role = v.getInt8(1);
+  return {role: role < 0 ? null : role, end: v.getUint8(2),
+          winner: v.getInt8(3), s: s, goals: v.getUint8(at),
+          warnings: v.getUint8(at + 1), alerts: v.getUint8(at + 2),
+          lobby: v.getUint8(at + 3), metrics: metrics};
+}
+
+function fields(payload) {
+  const f = {};
+  TABLES.fields.forEach((name, i) => { f[name] = payload.s[i]; });
+  f.uninsured_rate /= 10;
+  return f;
+}
+
+// Python str.format for the value templates of GOAL_ROWS and METRICS
+function format(template, f) {
+  return template.replace(/\{s\.(\w+)(?::\.(\d)f)?\}/g,
+    (_, name, digits) => digits === undefined ? String(f[name]) : f[name].toFixed(+digits));
+}
+
+function add(parent, tag, attrs, content) {
+  const el = document.createElementNS(SVG_NS, tag);
+  for (const [name, value] of Object.entries(attrs)) {
+    if (value === null || value === undefined) continue;
+    if (name === 'href') el.setAttributeNS(XLINK_NS, 'xlink:href', value);
+    else el.setAttribute(name, value);
+  }
+  if (content !== undefined) el.textContent = content;
+  parent.appendChild(el);
+  return el;
+}
+
+function text(parent, x, y, content, fill, size, weight, anchor) {
+  return add(parent, 'text', {x: x, y: y, fill: fill, 'font-size': size || '14',
+                              'font-weight': weight, 'text-anchor': anchor}, content);
+}
+
+function panel(parent, x, y, width, height) {
+  add(parent, 'rect', {x: x, y: y, width: width, height: height, fill: 'white',
+                       stroke: 'rgb(200, 200, 200)', 'stroke-width': '1', rx: '5'});
+}
+
+function goalsPanel(svg, p, f, role, x, y) {
+  panel(svg, x, y, 320, 210);
+  text(svg, x + 160, y + 20, TABLES.names[role] + ' Goals', ROLE_COLORS[role], '18', 'bold', 'middle');
+  const rows = TABLES.goals[role] ||
+    [['Observer', 'No specific goals', -1]];
+  let dy = 45;
+  for (const [label, value, flag] of rows) {
+    if (label === '') { dy += 10; continue; }
+    let color = TEXT;
+    if (flag === -1) color = MUTED;
+    else if (flag !== null) color = (p.goals >> flag) & 1 ? SUCCESS : WARNING;
+    const weight = label.includes('CONDITION') || label.includes('LOSING') ? 'bold' : 'normal';
+    text(svg, x + 10, y + dy, label, color, '14', weight);
+    const shown = flag === -1 ? value : format(value, f);
+    if (shown) text(svg, x + 310, y + dy, shown, color, '14', null, 'end');
+    dy += 18;
+  }
+}
+
+function statusPanel(svg, p, f, x, y) {
+  // Like draw_status_panel, offsets are checked against the panel's
+  // absolute bottom.
+  const left = x + 10, right = x + 250, bottom = y + 260;
+  panel(svg, x, y, 260, 260);
+  text(svg, x + 130, y + 20, 'Current Status & Metrics', TEXT, '18', 'bold', 'middle');
+  let dy = 45;
+  TABLES.metrics.forEach(([label, value], i) => {
+    text(svg, left, y + dy, label + ':', MUTED);
+    text(svg, right, y + dy, format(value, f), LEVEL_COLORS[p.metrics[i]], '14', 'bold', 'end');
+    dy += 20;
+  });
+  dy += 10;
+  const premiumCap = () => {
+    text(svg, left, y + dy, 'Premium Cap Active:', ACCENT, '14', 'bold');
+    text(svg, right, y + dy, f.premium_cap_turns_left + ' turns left', ACCENT, '14', null, 'end');
+  };
+  if (f.premium_cap_turns_left > 0) { premiumCap(); dy += 18; }
+  const warnings = TABLES.warnings.filter((_, i) => (p.warnings >> i) & 1);
+  if (warnings.length && dy < bottom - 60) {
+    text(svg, left, y + dy, '⚠ WARNINGS:', WARNING, '14', 'bold');
+    dy += 16;
+    for (const warning of warnings) {
+      if (dy < bottom - 20) { text(svg, x + 20, y + dy, '• ' + warning, WARNING); dy += 14; }
+    }
+    dy += 5;
+  }
+  const alerts = TABLES.alerts.filter((_, i) => (p.alerts >> i) & 1);
+  if (alerts.length && dy < bottom - 60) {
+    text(svg, left, y + dy, '⚡ ALERTS:', TEXT, '14', 'bold');
+    dy += 16;
+    for (const [message, level] of alerts) {
+      if (dy < bottom - 20) {
+        text(svg, x + 20, y + dy, '• ' + message, LEVEL_COLORS[level], '14', 'bold');
+        dy += 14;
+      }
+    }
+    dy += 5;
+  }
+  if (dy < bottom - 40) {
+    if (f.premium_cap_turns_left > 0) { premiumCap(); dy += 16; }
+    if (f.public_expansion_cap_turns_left > 0 && dy < bottom - 20) {
+      text(svg, left, y + dy, 'Public Expansion Blocked:', WARNING, '14', 'bold');
+      text(svg, right, y + dy, f.public_expansion_cap_turns_left + ' turns left', WARNING, '14', null, 'end');
+      dy += 16;
+    }
+    if (f.skip_next_turn && dy < bottom - 20) {
+      text(svg, left, y + dy, 'Next Turn Skipped:', WARNING, '14', 'bold');
+      text(svg, right, y + dy, 'Lobbying Effect', WARNING, '14', null, 'end');
+      dy += 16;
+    }
+    if (p.lobby === 2 && dy < bottom - 20) {
+      text(svg, left, y + dy, 'Lobbying Available!', SUCCESS, '14', 'bold');
+    } else if (p.lobby === 1 && dy < bottom - 20) {
+      text(svg, left, y + dy, 'Lobbying in ' + (3 - f.last_lobbied) + ' turns', CAUTION);
+    }
+  }
+}
+
+function progressBars(svg, f, x, y) {
+  text(svg, x, y - 25, 'Key Indicators', TEXT, '18', 'bold');
+  const coverage = 100 - f.uninsured_rate;
+  const bars = [
+    ['Public Health', f.public_health_index, SUCCESS, String(f.public_health_index)],
+    ['Public Trust', f.public_trust_meter, ACCENT, f.public_trust_meter + '%'],
+    ['Insurer Influence', f.influence_meter, WARNING, f.influence_meter + '%'],
+    ['Budget Level', Math.min(f.budget, 100), 'rgb(13, 110, 253)', '$' + f.budget + 'B'],
+    ['Access Gap', 100 - f.access_gap_index, SUCCESS, String(f.access_gap_index)],
+    ['Coverage Rate', coverage, SUCCESS, coverage.toFixed(1) + '%']];
+  bars.forEach(([label, value, color, shown], i) => {
+    const by = y + 45*i;
+    add(svg, 'rect', {x: x, y: by + 2.5, width: 200, height: 18, fill: 'rgb(233, 236, 239)',
+                      stroke: 'rgb(200, 200, 200)', 'stroke-width': '1'});
+    add(svg, 'rect', {x: x, y: by + 2.5, width: value / 100 * 200, height: 18, fill: color});
+    text(svg, x, by - 5, label, TEXT);
+    text(svg, x + 210, by + 15, shown, TEXT);
+  });
+}
+
+function gameOver(svg, p) {
+  const bx = (W - 400) / 2, by = (H - 150) / 2;
+  add(svg, 'rect', {x: 0, y: 0, width: W, height: H, fill: 'rgba(0, 0, 0, 0.7)'});
+  add(svg, 'rect', {x: bx, y: by, width: 400, height: 150, fill: 'white',
+                    stroke: 'rgb(200, 200, 200)', 'stroke-width': '3', rx: '10'});
+  text(svg, W/2, by + 40, 'GAME OVER', WARNING, '32', 'bold', 'middle');
+  text(svg, W/2, by + 80, p.win || TABLES.endMessages[p.end] || '', TEXT, '18', null, 'middle');
+  if (p.winner >= 0)
+    text(svg, W/2, by + 110, 'Winner: ' + TABLES.names[p.winner], SUCCESS, '18', 'bold', 'middle');
+}
+
+// Replaces the contents of svg with the view described by payload
+function drawState(svg, payload) {
+  while (svg.firstChild) svg.removeChild(svg.firstChild);
+  svg.setAttribute('width', W + 'px');
+  svg.setAttribute('height', H + 'px');
+  add(svg, 'rect', {x: 0, y: 0, width: W + 'px', height: H + 'px',
+                    fill: 'rgb(245, 248, 250)', stroke: 'none'});
+  const role = payload.role;
+  if (role === null) {
+    text(svg, W/2, H/2, 'Observer View - No Active Role', WARNING, '24', null, 'middle');
+    return;
+  }
+  const f = fields(payload);
+  text(svg, W/2, 30, 'Coverage Clash - ' + TABLES.names[role] + ' View', TEXT, '24', 'bold', 'middle');
+  const mine = f.whose_turn === role;
+  text(svg, W/2, 55, 'Current Turn: ' + TABLES.names[f.whose_turn] + (mine ? ' (YOUR TURN)' : ''),
+       mine ? SUCCESS : MUTED, '18', null, 'middle');
+  goalsPanel(svg, payload, f, role, 20, 80);
+  statusPanel(svg, payload, f, 350, 80);
+  progressBars(svg, f, 35, 350);
+  if (TABLES.cards) {
+    let side = role === 0 ? 'r' : role === 1 ? 'i' : f.whose_turn === 0 ? 'r' : 'i';
+    CARD_POSITIONS.forEach(([x, y], i) => {
+      add(svg, 'image', {x: x, y: y, width: CARD_W, height: CARD_H, href: TABLES.cards[side][i]});
+    });
+  }
+  if (payload.end !== 0) gameOver(svg, payload);
+}
+"""
+
+PAGE = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>Coverage Clash</title></head>
+<body>
+<svg id="state_svg" xmlns="http://www.w3.org/2000/svg"
+     xmlns:xlink="http://www.w3.org/1999/xlink"></svg>
+<script>
+const TABLES = %s;
+%s
+drawState(document.getElementById('state_svg'), %s);
+</script>
+</body>
+</html>
+"""
+
+def renderer_page(session=None, payload=None):
+    # Static HTML page with the renderer, showing payload (by default the
+    # Policy Maker's view of the initial state).  A client replaces it by
+    # calling drawState(svg, payload) for each payload it receives.
+    if payload is None:
+        payload = state_payload(prob.create_initial_state(), prob.POLICY_MAKER)
+    tables = renderer_tables(card_hrefs(session))
+    return PAGE % (json.dumps(tables), RENDERER_JS, json.dumps(payload))
+
+def main(argv):
+    command = argv[1] if len(argv) > 1 else 'page'
+    if command != 'page':
+        print(__doc__)
+        return 2
+    path = argv[2] if len(argv) > 2 else 'coverage_clash_view.html'
+    session = {'HOST': argv[3] if len(argv) > 3 else 'localhost',
+               'PORT': int(argv[4]) if len(argv) > 4 else 5000}
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(renderer_page(session))
+    print(f"renderer page written to {path}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
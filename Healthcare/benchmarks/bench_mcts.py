@@ -0,0 +1,43 @@
+'''
+bench_mcts.py
+Benchmark for the MCTS player (Healthcare_MCTS.py).
+
+Reports playouts per second from the opening position, then the win rate
+of MCTS, playing each side, against the random and greedy baselines of
+Healthcare_Sim.py.
+
+Usage (from the Healthcare directory):
+  python benchmarks/bench_mcts.py [games per pairing] [playouts per move]
+'''
+
+import functools
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import Healthcare as prob
+import Healthcare_Sim as sim
+from Healthcare_MCTS import MCTSPlayer, mcts_policy
+
+def playouts_per_second(seconds=2.0):
+    player = MCTSPlayer(time_budget=seconds, seed=1)
+    player.choose_operator(prob.create_initial_state())
+    return player.total_playouts / seconds
+
+def main(games=20, playouts=200):
+    print(f"playouts/sec: {playouts_per_second():,.0f}")
+    mcts = functools.partial(mcts_policy, playouts=playouts)
+    for name, baseline in (('random', sim.random_policy), ('greedy', sim.greedy_policy)):
+        for side, pm, ic, key in (('Policy Maker', mcts, baseline, 'policy_maker_wins'),
+                                  ('Insurance Company', baseline, mcts, 'insurance_company_wins')):
+            t0 = time.perf_counter()
+            results = sim.run_games(games, pm, ic, seed=1)
+            elapsed = time.perf_counter() - t0
+            base = sim.run_games(games, baseline, baseline, seed=1)
+            print(f"MCTS as {side:<17} vs {name}: {100 * results[key] / games:5.1f}% wins "
+                  f"({name} in that seat: {100 * base[key] / games:5.1f}%), "
+                  f"{elapsed / games:.2f}s/game")
+
+if __name__ == '__main__':
+    main(*(int(a) for a in sys.argv[1:3]))
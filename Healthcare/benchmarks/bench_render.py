@@ -0,0 +1,86 @@
+'''
+bench_render.py
+Benchmark for the SVG view: frames per second of the svgwrite backend
+against the template backend (Healthcare_SVG_Template.py), and the size of
+incremental patches (Healthcare_SVG_Patch.py) against full frames.
+
+Frames are built for a fixed set of positions taken from random games, for
+every viewing role, bypassing the render cache so that each frame is really
+built. The last lines are render_state with the cache on, replaying as many
+of the positions as fit in the cache.
+
+Usage (from the Healthcare directory):
+  python benchmarks/bench_render.py [positions]
+'''
+
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import Healthcare as prob
+import Healthcare_Sim as sim
+import Healthcare_SVG_FOR_BRIFL as vis
+import Healthcare_SVG_Template as template
+from Healthcare_SVG_Patch import PatchStream
+
+ROLES = [None, prob.POLICY_MAKER, prob.INSURANCE_COMPANY]
+
+def sample_positions(n, seed=1):
+    """Non-terminal positions visited by random games"""
+    rng = random.Random(seed)
+    prob.set_narration('off')
+    positions = []
+    while len(positions) < n:
+        s = prob.create_initial_state()
+        while len(positions) < n and not s.is_goal():
+            positions.append(s)
+            s = prob.OPERATORS[rng.choice(sim.legal_moves(s))].state_transf(s)
+    prob.set_narration('text')
+    return positions
+
+def fps(build, positions, rounds=3):
+    best = float('inf')
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        for s in positions:
+            for role in ROLES:
+                build(s, role)
+        best = min(best, time.perf_counter() - t0)
+    return len(positions) * len(ROLES) / best
+
+def patch_sizes(positions):
+    """Mean bytes per update, full frames against patches, for the
+    positions replayed as consecutive frames"""
+    stream = PatchStream()
+    full = patch = updates = 0
+    for s in positions:
+        for role in ROLES:
+            roles = [] if role is None else [role]
+            full += len(template.render_frame(s, role)[0])
+            kind, payload = stream.frame(s, roles)
+            patch += len(payload) if kind == 'full' else len(json.dumps(payload))
+            updates += 1
+    return full / updates, patch / updates
+
+def main(n=200):
+    prob.SESSION = {'HOST': 'localhost', 'PORT': 5000}
+    vis.DEBUG = False
+    positions = sample_positions(n)
+    base = fps(vis.render_frame, positions)
+    fast = fps(template.render_frame, positions)
+    print(f"svgwrite render_frame: {base:10,.0f} frames/s")
+    print(f"template render_frame: {fast:10,.0f} frames/s  ({fast / base:.1f}x)")
+    working_set = positions[:vis.RENDER_CACHE.maxsize // len(ROLES)]
+    for backend in ('svgwrite', 'template'):
+        vis.set_render_backend(backend)
+        cached = fps(lambda s, role: vis.render_state(s, [] if role is None else [role]),
+                     working_set)
+        print(f"render_state, cached ({backend}): {cached:10,.0f} frames/s")
+    full, patch = patch_sizes(positions)
+    print(f"bytes per update: full frame {full:,.0f}, patch {patch:,.0f}")
+
+if __name__ == '__main__':
+    main(*(int(a) for a in sys.argv[1:2]))
@@ -0,0 +1,68 @@
+'''
+bench_state_clone.py
+Microbenchmark for copying a Coverage Clash State.
+
+Compares three ways of copying a position and reports clones per second
+for each: the dict-backed copy constructor State(old) of the original
+game (reproduced below as BaselineState, since State itself is now
+slotted), the slotted copy constructor State(s), and the fast path
+s.clone().  The speedup is clone() against the baseline.
+
+Usage (from the Healthcare directory, with SOLUZION5 on the path):
+  python benchmarks/bench_state_clone.py [iterations]
+'''
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import Healthcare as prob
+
+class BaselineState:
+    # The copy constructor of the original, __dict__-backed State, field
+    # for field; only the copying path is kept.
+    def __init__(self, old):
+        self.whose_turn = old.whose_turn
+        self.current_role = old.current_role
+        self.current_role_num = old.current_role_num
+        self.uninsured_rate = old.uninsured_rate
+        self.public_health_index = old.public_health_index
+        self.access_gap_index = old.access_gap_index
+        self.profit = old.profit
+        self.public_trust_meter = old.public_trust_meter
+        self.influence_meter = old.influence_meter
+        self.budget = old.budget
+        self.premium_cap_turns_left = old.premium_cap_turns_left
+        self.skip_next_turn = old.skip_next_turn
+        self.win = old.win
+        self.winner = old.winner
+        self.bribe_choice_active = old.bribe_choice_active
+        self.public_expansion_cap_turns_left = old.public_expansion_cap_turns_left
+        self.last_lobbied = old.last_lobbied
+        self.funded = old.funded
+        self.intercepted = old.intercepted
+        self.policymaker_bonus_turn_used_55 = old.policymaker_bonus_turn_used_55
+        self.policymaker_bonus_turn_used_62 = old.policymaker_bonus_turn_used_62
+        self.policymaker_bonus_turn_used_72 = old.policymaker_bonus_turn_used_72
+
+def clones_per_second(copy_fn, n, repeat=15):
+    # Best-of-N timing; the minimum is the least noisy estimate.
+    return n / min(timeit.repeat(copy_fn, number=n, repeat=repeat))
+
+def main(n=200000):
+    s = prob.create_initial_state()
+    old = BaselineState(s)
+    baseline = clones_per_second(lambda: BaselineState(old), n)
+    slotted = clones_per_second(lambda: prob.State(s), n)
+    fast = clones_per_second(s.clone, n)
+    print(f"baseline State(old): {baseline:>12,.0f} clones/sec")
+    print(f"State(s):            {slotted:>12,.0f} clones/sec")
+    print(f"s.clone():           {fast:>12,.0f} clones/sec")
+    print(f"speedup:             {fast / baseline:.2f}x over the baseline")
+    print(f"size of one state: {sys.getsizeof(s)} bytes"
+          f" (baseline {sys.getsizeof(old) + sys.getsizeof(old.__dict__)} bytes"
+          f" with its __dict__)")
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
@@ -0,0 +1,217 @@
+'''
+run_benchmarks.py
+Benchmark suite for Coverage Clash.
+
+Measures, as operations per second (higher is better):
+  clone               State.clone()
+  apply[<operator>]   state_transf of every operator in OPERATORS, on
+                      positions where it applies (labelled as in
+                      Healthcare.OPERATOR_LABELS)
+  legal_moves         Healthcare_Sim.legal_moves
+  successors          Healthcare.successors of every legal move, warm cache
+  find_any_win        State.find_any_win
+  random_games        complete random games (Healthcare_Sim.run_games)
+  search              expectimax nodes, fixed-depth search of the opening
+  render_state[<role>] uncached frames, for each viewing role (skipped
+                      when svgwrite is not installed)
+  state_payload[<role>] JSON state payloads for the browser renderer,
+                      serialized, for each viewing role
+
+Every input is drawn from fixed seeds and every rate is the best of
+several rounds, so runs on the same machine are comparable.  'save'
+writes the results to a JSON baseline; 'compare' (the default) measures
+again and flags each benchmark that is slower than the baseline by more
+than the tolerance, exiting with status 1 if any is.
+
+Usage (from the Healthcare directory):
+  python benchmarks/run_benchmarks.py [save|compare] [baseline file] [tolerance]
+'''
+
+import json
+import os
+import platform
+import random
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import Healthcare as prob
+import Healthcare_Sim as sim
+from Healthcare_Search import Searcher
+from Healthcare_State_API import state_payload
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+DEFAULT_TOLERANCE = 0.25  # fraction of the baseline rate
+ROUNDS = 7
+MIN_ROUND_TIME = 0.05  # seconds
+SEED = 1
+
+def sample_positions(n, seed=SEED):
+    # Non-terminal positions visited by random games.
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < n:
+        s = prob.create_initial_state()
+        while len(positions) < n and not s.is_goal():
+            positions.append(s)
+            s = prob.OPERATORS[rng.choice(sim.legal_moves(s))].state_transf(s)
+    return positions
+
+def rate(fn, items, rounds=ROUNDS):
+    # Calls fn on every item, repeating the pass until a round lasts at
+    # least MIN_ROUND_TIME; best-of-rounds items per second.
+    def run():
+        for item in items:
+            fn(item)
+    timer = timeit.Timer(run)
+    number = 1
+    while timer.timeit(number) < MIN_ROUND_TIME:
+        number *= 2
+    return number * len(items) / min(timer.repeat(number=number, repeat=rounds))
+
+def forced_positions(op_id, positions):
+    # Positions where op_id applies, made from the sampled positions of its
+    # role by raising or lowering the fields its precondition tests.  Used
+    # for operators that random games seldom reach (Lobby Government).
+    e = prob.EFFECTS[op_id]
+    forced = []
+    for s in positions:
+        if s.whose_turn != e.role:
+            continue
+        s = s.clone()
+        for field, minimum in e.at_least:
+            setattr(s, field, max(getattr(s, field), minimum))
+        for field, maximum in e.at_most:
+            setattr(s, field, min(getattr(s, field), maximum))
+        if prob.can_apply(s, op_id) and not s.is_goal():
+            forced.append(s)
+    return forced
+
+def bench_transitions(positions, results):
+    # Every operator of both roles is measured, under its label from
+    # Healthcare.OPERATOR_LABELS (the two Pass operators share a name).
+    results['clone'] = rate(prob.State.clone, positions)
+    for op_id, (op, label) in enumerate(zip(prob.OPERATORS, prob.OPERATOR_LABELS)):
+        applicable = [s for s in positions if op.precond(s)]
+        if not applicable:
+            applicable = forced_positions(op_id, positions)
+        if not applicable:
+            raise RuntimeError(f"no position to benchmark {label} on")
+        results[f"apply[{label}]"] = rate(op.state_transf, applicable)
+    results['legal_moves'] = rate(sim.legal_moves, positions)
+    def expand(s):
+        for op_id in prob.legal_op_ids(s):
+            prob.successors(s, op_id)
+    results['successors'] = rate(expand, positions)
+    results['find_any_win'] = rate(prob.State.find_any_win, positions)
+
+def bench_games(results, n=2000):
+    best = float('inf')
+    for _ in range(ROUNDS):
+        t0 = time.perf_counter()
+        sim.run_games(n, seed=SEED)
+        best = min(best, time.perf_counter() - t0)
+    results['random_games'] = n / best
+
+def bench_search(results, depth=5):
+    s = prob.create_initial_state()
+    best = 0
+    for _ in range(ROUNDS):
+        searcher = Searcher()
+        t0 = time.perf_counter()
+        searcher.search(s, depth)
+        best = max(best, searcher.nodes / (time.perf_counter() - t0))
+    results['search'] = best
+
+def bench_render(positions, results):
+    try:
+        import Healthcare_SVG_FOR_BRIFL as vis
+    except ImportError as e:
+        print(f"render_state skipped: {e}")
+        return
+    prob.SESSION = {'HOST': 'localhost', 'PORT': 5000}
+    vis.DEBUG = False
+    maxsize = vis.RENDER_CACHE.maxsize
+    vis.RENDER_CACHE.maxsize = 0  # every call builds its frame
+    try:
+        for role in (prob.POLICY_MAKER, prob.INSURANCE_COMPANY, None):
+            roles = [] if role is None else [role]
+            name = "Observer" if role is None else prob.int_to_name(role)
+            results[f"render_state[{name}]"] = rate(lambda s: vis.render_state(s, roles), positions)
+    finally:
+        vis.RENDER_CACHE.maxsize = maxsize
+        vis.RENDER_CACHE.clear()
+
+def bench_payload(positions, results):
+    for role in (prob.POLICY_MAKER, prob.INSURANCE_COMPANY, None):
+        name = "Observer" if role is None else prob.int_to_name(role)
+        results[f"state_payload[{name}]"] = rate(
+            lambda s: json.dumps(state_payload(s, role), separators=(',', ':')), positions)
+
+def run_all(n_positions=500):
+    results = {}
+    narration = prob.NARRATION_MODE
+    old_rng = prob.RNG
+    prob.set_narration('off')
+    prob.set_rng(random.Random(SEED))
+    try:
+        positions = sample_positions(n_positions)
+        bench_transitions(positions, results)
+        bench_search(results)
+        bench_render(positions[:100], results)
+        bench_payload(positions, results)
+    finally:
+        prob.set_narration(narration)
+        prob.set_rng(old_rng)
+    bench_games(results)
+    return results
+
+def compare(results, baseline, tolerance):
+    # Returns the names of the benchmarks that regressed.
+    regressions = []
+    for name, value in results.items():
+        old = baseline.get(name)
+        if old is None:
+            print(f"{name:<40} {value:>14,.0f}/s  (new)")
+            continue
+        change = value / old - 1
+        flag = ""
+        if change < -tolerance:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:<40} {value:>14,.0f}/s  {change:+7.1%}{flag}")
+    return regressions
+
+def main(argv):
+    command = argv[1] if len(argv) > 1 else 'compare'
+    path = argv[2] if len(argv) > 2 else DEFAULT_BASELINE
+    tolerance = float(argv[3]) if len(argv) > 3 else DEFAULT_TOLERANCE
+    if command not in ('save', 'compare'):
+        print(__doc__)
+        return 2
+    results = run_all()
+    if command == 'save':
+        for name, value in results.items():
+            print(f"{name:<40} {value:>14,.0f}/s")
+        with open(path, 'w') as f:
+            json.dump({'python': platform.python_version(),
+                       'machine': platform.machine(),
+                       'results': results}, f, indent=1)
+            f.write('\n')
+        print(f"baseline written to {path}")
+        return 0
+    try:
+        with open(path) as f:
+            baseline = json.load(f)['results']
+    except FileNotFoundError:
+        print(f"no baseline at {path}; run with 'save' first")
+        return 2
+    regressions = compare(results, baseline, tolerance)
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) more than {tolerance:.0%} slower than the baseline")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,45 @@
+# Shared setup for the Coverage Clash tests: the game modules live in the
+# parent directory, and every test starts with narration off and the
+# module RNG and successor cache in their default state.
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import Healthcare as prob
+
+@pytest.fixture(autouse=True)
+def game_globals():
+    narration = prob.NARRATION_MODE
+    rng = prob.RNG
+    prob.set_narration('off')
+    prob.SUCCESSORS.clear()
+    yield
+    prob.set_narration(narration)
+    prob.set_rng(rng)
+    prob.SUCCESSORS.clear()
+
+def random_positions(n, seed=0):
+    # Positions visited by random games, finished ones included.
+    import random
+    rng = random.Random(seed)
+    positions = []
+    s = prob.create_initial_state()
+    while len(positions) < n:
+        positions.append(s)
+        if s.is_goal():
+            s = prob.create_initial_state()
+            continue
+        op_id = rng.choice(prob.legal_op_ids(s))
+        e = prob.EFFECTS[op_id]
+        s = prob.apply_operator(s, op_id, prob.roll_outcome(e, rng) if e.chance else None)
+    return positions
+
+def state_with(**fields):
+    # The initial state with some fields changed.
+    s = prob.create_initial_state()
+    for name, value in fields.items():
+        setattr(s, name, value)
+    return s
@@ -0,0 +1,124 @@
+'''
+make_baseline_transitions.py
+Writes tests/data/baseline_transitions.json, the reference transitions
+that test_kernel.py checks apply_operator against.
+
+The reference is the original game module, before the slotted State and
+the effect table: its Healthcare.py is taken from git (the first commit
+by default) and run against the Healthcare_Headless stand-ins.  Every
+operator it allows is applied to a fixed sample of positions, both
+outcomes of Request Funds included, and the fields before and after are
+recorded in STATE_FIELDS order.
+
+Usage (from the Healthcare directory):
+  python tests/make_baseline_transitions.py [git revision]
+'''
+
+import importlib.util
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..'))
+import Healthcare as prob
+
+OUTPUT = os.path.join(HERE, 'data', 'baseline_transitions.json')
+SEED = 3
+POSITIONS = 120
+
+# random.random() values that make the original request_funds take each
+# outcome (it intercepts below 0.3).
+ROLLS = {prob.FUNDS_INTERCEPTED: 0.0, prob.FUNDS_GRANTED: 0.5}
+
+def load_baseline(revision):
+    # Imports the original Healthcare.py from revision as a module.
+    root = subprocess.check_output(['git', 'rev-parse', '--show-toplevel'],
+                                   cwd=HERE, text=True).strip()
+    if revision is None:
+        revision = subprocess.check_output(['git', 'rev-list', '--max-parents=0', 'HEAD'],
+                                           cwd=root, text=True).split()[0]
+    source = subprocess.check_output(['git', 'show', revision + ':Healthcare/Healthcare.py'],
+                                     cwd=root)
+    folder = tempfile.mkdtemp()
+    with open(os.path.join(HERE, '..', 'Healthcare_Headless.py'), 'rb') as f:
+        headless = f.read()
+    for name, data in (('soluzion5.py', headless), ('Select_Roles.py', b''),
+                       ('baseline_healthcare.py', source)):
+        with open(os.path.join(folder, name), 'wb') as f:
+            f.write(data)
+    spec = importlib.util.spec_from_file_location('baseline_healthcare',
+                                                  os.path.join(folder, 'baseline_healthcare.py'))
+    module = importlib.util.module_from_spec(spec)
+    sys.path.insert(0, folder)
+    try:
+        spec.loader.exec_module(module)
+    finally:
+        sys.path.remove(folder)
+    return module, revision
+
+def sample_positions(n, seed=SEED):
+    # Positions of random games, half of them with their metrics shaken so
+    # that clamping, bonus turns, lobbying and the bribe options all occur.
+    rng = random.Random(seed)
+    prob.set_rng(rng)
+    positions = []
+    s = prob.create_initial_state()
+    while len(positions) < n:
+        if s.is_goal():
+            s = prob.create_initial_state()
+        positions.append(s)
+        if len(positions) % 2 == 0:
+            t = s.clone()
+            t.uninsured_rate = rng.randrange(0, 179) / 10
+            t.public_health_index = rng.randrange(30, 101)
+            t.access_gap_index = rng.randrange(0, 46)
+            t.profit = rng.randrange(0, 86)
+            t.public_trust_meter = rng.randrange(30, 101)
+            t.influence_meter = rng.randrange(60, 101)
+            t.budget = rng.randrange(0, 201)
+            t.premium_cap_turns_left = rng.randrange(0, 4)
+            t.public_expansion_cap_turns_left = rng.randrange(0, 3)
+            t.last_lobbied = rng.randrange(0, 6)
+            t.bribe_choice_active = rng.random() < 0.3
+            t.skip_next_turn = rng.random() < 0.2
+            positions.append(t)
+        op_id = rng.choice(prob.legal_op_ids(s))
+        e = prob.EFFECTS[op_id]
+        s = prob.apply_operator(s, op_id, prob.roll_outcome(e, rng) if e.chance else None)
+    return positions[:n]
+
+def baseline_transitions(base, positions):
+    cases = []
+    real_random = base.random.random
+    try:
+        for s in positions:
+            old = base.State()
+            for name, value in zip(prob.STATE_FIELDS, s.to_tuple()):
+                setattr(old, name, value)
+            legal = [i for i, op in enumerate(base.OPERATORS) if op.is_applicable(old)]
+            for op_id in legal:
+                outcomes = ROLLS if prob.EFFECTS[op_id].chance else {None: None}
+                for outcome, roll in outcomes.items():
+                    base.random.random = lambda: roll
+                    new = base.OPERATORS[op_id].apply(old)
+                    cases.append([list(s.to_tuple()), legal, op_id, outcome,
+                                  [getattr(new, name) for name in prob.STATE_FIELDS]])
+    finally:
+        base.random.random = real_random
+    return cases
+
+def main(argv):
+    base, revision = load_baseline(argv[1] if len(argv) > 1 else None)
+    cases = baseline_transitions(base, sample_positions(POSITIONS))
+    with open(OUTPUT, 'w') as f:
+        json.dump({'revision': revision, 'fields': list(prob.STATE_FIELDS),
+                   'cases': cases}, f, separators=(',', ':'))
+        f.write('\n')
+    print(f"{len(cases)} transitions from {revision} written to {OUTPUT}")
+
+if __name__ == '__main__':
+    main(sys.argv)
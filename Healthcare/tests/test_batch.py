@@ -0,0 +1,46 @@
+# The NumPy batch kernel against the scalar kernel.
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+import Healthcare as prob
+import Healthcare_Batch as batch
+from conftest import random_positions
+
+def running_positions(n, seed):
+    return [s for s in random_positions(n, seed) if not s.is_goal()]
+
+def test_batch_state_needs_a_size():
+    with pytest.raises(ValueError):
+        batch.BatchState()
+    assert batch.BatchState(3).n == 3
+
+def test_legal_mask_and_wins_match_scalar():
+    states = random_positions(400, seed=5)
+    b = batch.BatchState.from_states(states)
+    legal = b.legal_mask()
+    over, winner = b.find_any_win()
+    for i, s in enumerate(states):
+        assert bool(over[i]) == s.is_goal()
+        if s.is_goal():
+            assert winner[i] == s.status()[1]    # BOTH_LOSE is -1, as in status()
+        else:
+            assert tuple(np.flatnonzero(legal[i])) == prob.legal_op_ids(s)
+
+def test_step_matches_apply_operator():
+    states = running_positions(400, seed=6)
+    for op_id, e in prob.EFFECTS.items():
+        selected = [s for s in states if prob.can_apply(s, op_id)]
+        if not selected:
+            continue
+        for outcome in (range(len(e.chance)) if e.chance else [None]):
+            b = batch.BatchState.from_states(selected)
+            batch.apply_effects_batch(b.cols, op_id, outcome=outcome)
+            b.update_turn(np.ones(b.n, dtype=bool))
+            for s, got in zip(selected, b.to_states()):
+                assert got.key() == prob.apply_operator(s, op_id, outcome).key()
+
+def test_random_games_finish():
+    results = batch.run_random_games(200, seed=0)
+    assert results['games'] == 200
@@ -0,0 +1,100 @@
+# The State and the operator kernel against the original game module.
+
+import json
+import os
+
+import pytest
+
+import Healthcare as prob
+from conftest import random_positions, state_with
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data',
+                        'baseline_transitions.json')
+
+def load_baseline():
+    with open(BASELINE) as f:
+        return json.load(f)
+
+def test_baseline_covers_every_operator():
+    data = load_baseline()
+    assert data['fields'] == list(prob.STATE_FIELDS)
+    applied = {(op_id, outcome) for _, _, op_id, outcome, _ in data['cases']}
+    for op_id, e in prob.EFFECTS.items():
+        outcomes = range(len(e.chance)) if e.chance else [None]
+        for outcome in outcomes:
+            assert (op_id, outcome) in applied
+
+def test_apply_operator_matches_baseline():
+    # The original module kept the raw float uninsured rate; the kernel
+    # keeps it in tenths, so the two agree once the original is rounded.
+    data = load_baseline()
+    for start, legal, op_id, outcome, expected in data['cases']:
+        s = prob.State.from_tuple(start)
+        assert list(prob.legal_op_ids(s)) == legal
+        new = prob.apply_operator(s, op_id, outcome)
+        expected[prob.STATE_FIELDS.index('uninsured_rate')] = round(
+            expected[prob.STATE_FIELDS.index('uninsured_rate')], 1)
+        assert list(new.to_tuple()) == expected, (prob.OPERATORS[op_id].name, start)
+
+def test_apply_operator_leaves_its_input_alone():
+    for s in random_positions(300, seed=1):
+        if s.is_goal():
+            continue
+        before = s.to_tuple()
+        for op_id in prob.legal_op_ids(s):
+            prob.operator_outcomes(s, op_id)
+        assert s.to_tuple() == before
+
+def test_clone_and_tuple_round_trip():
+    for s in random_positions(200, seed=2):
+        copy = s.clone()
+        assert copy is not s
+        assert copy.to_tuple() == s.to_tuple()
+        assert prob.State.from_tuple(s.to_tuple()) == s
+        assert prob.State(s).to_tuple() == s.to_tuple()
+    assert not hasattr(prob.create_initial_state(), '__dict__')
+
+def test_equal_keys_share_a_status():
+    # Reaching the same tenth by different paths gives the same float,
+    # so equal keys mean equal status (17.8 is not over, 17.9 is).
+    def raised(deltas):
+        s = state_with(uninsured_rate=13.3)
+        for delta in deltas:
+            new = s.clone()
+            prob.apply_effect(new, s, prob.Effect(deltas=(('uninsured_rate', delta),)))
+            s = new
+        return s
+    a = raised((0.8, 0.6, 0.8, 0.6, 0.8, 0.6, 0.3))
+    b = raised((0.3, 0.6, 0.6, 0.6, 0.8, 0.8, 0.8))
+    assert a.uninsured_rate == b.uninsured_rate == 17.8
+    assert a.key() == b.key() and a.status() == b.status() == (prob.END_ONGOING, -1)
+    seen = {}
+    for s in random_positions(3000, seed=3):
+        assert seen.setdefault(s.key(), s.status()) == s.status()
+
+def test_cached_successors_match_fresh_ones():
+    for s in random_positions(300, seed=4):
+        if s.is_goal():
+            continue
+        for op_id in prob.legal_op_ids(s):
+            cached = prob.successors(s, op_id)
+            fresh = prob.operator_outcomes(s, op_id)
+            assert [(p, c.to_tuple()) for p, c in cached] == \
+                   [(p, c.to_tuple()) for p, c in fresh]
+
+def test_status_of_terminal_positions():
+    assert state_with(access_gap_index=12).status() == (prob.END_ACCESS_IMPROVED, prob.POLICY_MAKER)
+    assert state_with(profit=86).status() == (prob.END_PROFIT_TARGET, prob.INSURANCE_COMPANY)
+    assert state_with(uninsured_rate=17.8).status() == (prob.END_ONGOING, -1)
+    assert state_with(uninsured_rate=17.9).status()[0] == prob.END_UNINSURED
+    assert state_with(access_gap_index=12).is_goal()
+    assert not prob.create_initial_state().is_goal()
+
+def test_comparison_with_other_types():
+    class Anything:
+        def __eq__(self, other):
+            return True
+    s = prob.create_initial_state()
+    assert s == Anything()          # the reflected __eq__ gets its turn
+    assert s != 'a state'
+    assert s.__eq__(None) is NotImplemented
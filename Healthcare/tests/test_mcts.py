@@ -0,0 +1,44 @@
+# The MCTS player.
+
+import random
+
+import pytest
+
+import Healthcare as prob
+import Healthcare_MCTS as mcts
+import Healthcare_Sim as sim
+from conftest import state_with
+
+def test_no_move_on_a_finished_game():
+    with pytest.raises(ValueError):
+        mcts.MCTSPlayer(playouts=10, seed=0).choose_operator(state_with(profit=86))
+
+def test_takes_an_immediate_win():
+    s = state_with(access_gap_index=14)
+    op_id = mcts.MCTSPlayer(playouts=300, seed=0).choose_operator(s)
+    assert prob.apply_operator(s, op_id).status()[1] == prob.POLICY_MAKER
+
+def test_policy_players_per_seat_and_playouts():
+    mcts._PLAYERS.clear()
+    rng = random.Random(0)
+    pm = prob.create_initial_state()
+    ic = prob.apply_operator(pm, prob.legal_op_ids(pm)[0])
+    mcts.mcts_policy(pm, sim.legal_moves(pm), rng, playouts=20)
+    mcts.mcts_policy(ic, sim.legal_moves(ic), rng, playouts=20)
+    mcts.mcts_policy(pm, sim.legal_moves(pm), rng, playouts=40)
+    players = {key[1:]: player for key, player in mcts._PLAYERS.items()}
+    assert set(players) == {(20, prob.POLICY_MAKER), (20, prob.INSURANCE_COMPANY),
+                            (40, prob.POLICY_MAKER)}
+    assert players[(40, prob.POLICY_MAKER)].playouts == 40
+    mcts.mcts_policy(pm, sim.legal_moves(pm), random.Random(1), playouts=20)
+    assert len(mcts._PLAYERS) == 1
+
+def test_policy_games_are_reproducible():
+    def play(seed):
+        # As in run_games, one stream drives the policies and the chance events.
+        mcts._PLAYERS.clear()
+        rng = random.Random(seed)
+        prob.set_rng(rng)
+        return sim.play_game(lambda s, m, r: mcts.mcts_policy(s, m, r, playouts=20),
+                             sim.random_policy, rng)
+    assert play(3) == play(3)
@@ -0,0 +1,22 @@
+# Timing instrumentation.
+
+import Healthcare as prob
+import Healthcare_Profile as profile
+
+def test_operators_get_distinct_histograms():
+    assert len(set(prob.OPERATOR_LABELS)) == len(prob.OPERATORS)
+    profile.reset()
+    profile.enable(render=False)
+    try:
+        s = prob.create_initial_state()
+        pm_pass = prob.OPERATOR_LABELS.index("Pass (Policy Maker)")
+        ic_pass = prob.OPERATOR_LABELS.index("Pass (Insurance Company)")
+        t = prob.OPERATORS[pm_pass].state_transf(s)
+        prob.OPERATORS[ic_pass].state_transf(t)
+        prob.OPERATORS[ic_pass].state_transf(t)
+    finally:
+        profile.disable()
+    transitions = profile.to_json()['transition']
+    assert transitions["Pass (Policy Maker)"]['count'] == 1
+    assert transitions["Pass (Insurance Company)"]['count'] == 2
+    assert not profile.enabled()
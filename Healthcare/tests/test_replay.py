@@ -0,0 +1,53 @@
+# Recording, replaying and verifying game logs.
+
+import pytest
+
+import Healthcare as prob
+import Healthcare_Replay as replay
+
+def test_recorded_games_verify(tmp_path):
+    path = str(tmp_path / 'games.bin')
+    records = replay.record_games(100, seed=11)
+    replay.write_log(path, records)
+    assert list(replay.read_log(path)) == records
+    assert replay.verify_log(path) == (100, [])
+
+def test_replay_reaches_the_recorded_outcome():
+    for record in replay.record_games(50, seed=12):
+        s = replay.replay(record)
+        assert replay.game_outcome(s) == record.outcome
+        assert replay.replay(record, 0) == prob.create_initial_state()
+
+def test_replay_restores_narration():
+    prob.set_narration('events')
+    record = replay.record_games(1, seed=13)[0]
+    replay.replay(record)
+    assert prob.NARRATION_MODE == 'events'
+
+def test_corrupt_moves_are_reported():
+    # An unknown operator, a third outcome of Request Funds and an outcome
+    # on a deterministic operator.
+    record = replay.record_games(1, seed=14)[0]
+    chance_op = next(i for i, e in prob.EFFECTS.items() if e.chance)
+    plain_op = next(i for i, e in prob.EFFECTS.items() if not e.chance)
+    for byte in (len(prob.EFFECTS), chance_op | 2 << replay.OUTCOME_SHIFT,
+                 plain_op | 1 << replay.OUTCOME_SHIFT):
+        bad = record._replace(moves=bytes([byte]) + record.moves[1:])
+        assert replay.verify_game(bad) == f"move 0 ({byte}) is corrupt"
+        with pytest.raises(replay.ReplayError):
+            replay.replay(bad)
+
+def test_append_after_a_torn_record(tmp_path):
+    path = str(tmp_path / 'games.bin')
+    records = replay.record_games(20, seed=15)
+    replay.write_log(path, records[:10])
+    with open(path, 'ab') as f:
+        f.write(replay.RECORD.pack(1, 40, 0) + b'\x01\x02')
+    replay.write_log(path, records[10:])
+    assert list(replay.read_log(path)) == records
+
+def test_append_refuses_other_files(tmp_path):
+    path = tmp_path / 'other.bin'
+    path.write_bytes(b'not a replay log at all')
+    with pytest.raises(replay.ReplayError):
+        replay.ReplayLog(str(path))
@@ -0,0 +1,30 @@
+# Expectimax search on terminal and near-terminal positions.
+
+import pytest
+
+import Healthcare as prob
+from Healthcare_Search import LOSS, WIN, Searcher, terminal_value
+from conftest import state_with
+
+def test_no_move_on_a_finished_game():
+    with pytest.raises(ValueError):
+        Searcher().best_operator(state_with(access_gap_index=12))
+
+def test_terminal_values():
+    assert terminal_value(state_with(access_gap_index=12)) == WIN
+    assert terminal_value(state_with(profit=86)) == LOSS
+    assert terminal_value(prob.create_initial_state()) is None
+
+def test_finds_a_winning_move():
+    # Expanding coverage takes the access gap from 14 to 8, below 13.
+    s = state_with(access_gap_index=14)
+    op_id, value, depth = Searcher().best_operator(s, time_budget=1.0)
+    assert value == WIN and depth == 1
+    assert prob.apply_operator(s, op_id).status()[1] == prob.POLICY_MAKER
+
+def test_insurer_takes_the_profit_win():
+    s = state_with(whose_turn=prob.INSURANCE_COMPANY,
+                   current_role_num=prob.INSURANCE_COMPANY, profit=82)
+    op_id, value, _ = Searcher().best_operator(s, time_budget=1.0)
+    assert value == LOSS
+    assert prob.apply_operator(s, op_id).status()[1] == prob.INSURANCE_COMPANY
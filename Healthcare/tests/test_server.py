@@ -0,0 +1,112 @@
+# Smoke tests of the game server over real connections, one per view format.
+
+import asyncio
+import json
+
+import pytest
+
+import Healthcare as prob
+from Healthcare_Server import GameServer, LINE_LIMIT, OBSERVER_ROLE, configure, encode
+
+async def connect(port):
+    return await asyncio.open_connection('127.0.0.1', port, limit=LINE_LIMIT)
+
+async def receive(reader, kind='view'):
+    # The next message of type kind, skipping any others.
+    while True:
+        line = await asyncio.wait_for(reader.readline(), 5)
+        assert line, "connection closed"
+        message = json.loads(line)
+        if message['type'] == kind:
+            return message
+
+async def play_moves(views, n_moves=4):
+    # A Policy Maker, an Insurance Company and a spectator in one room;
+    # the players make n_moves moves.  Returns the views each one saw last.
+    server = GameServer(port=0, views=views)
+    configure(server.views)
+    await server.start()
+    try:
+        clients = []
+        for user, role in (('pm', prob.POLICY_MAKER), ('ic', prob.INSURANCE_COMPANY),
+                           ('watcher', OBSERVER_ROLE)):
+            reader, writer = await connect(server.port)
+            writer.write(encode({'type': 'join', 'room': 'r', 'user': user, 'role': role}))
+            clients.append((reader, writer))
+        last = [await receive(reader) for reader, _ in clients]
+        for _ in range(n_moves):
+            if last[0]['over']:
+                break
+            mover = last[0]['turn']
+            reader, writer = clients[mover]
+            writer.write(encode({'type': 'move', 'operator': last[mover]['legal'][0]}))
+            moves = last[0]['moves'] + 1
+            for i, (reader, _) in enumerate(clients):
+                message = await receive(reader)
+                while message['moves'] < moves:
+                    message = await receive(reader)
+                last[i] = message
+        for _, writer in clients:
+            writer.close()
+        return last
+    finally:
+        server.close()
+
+FORMATS = {'text': ('text',), 'json': ('state',), 'svg': ('full', 'patch')}
+
+@pytest.mark.parametrize('views', ['text', 'json', 'svg'])
+def test_views(views):
+    if views == 'svg':
+        pytest.importorskip('svgwrite')
+    last = asyncio.run(play_moves(views))
+    assert [message['moves'] for message in last] == [4, 4, 4]
+    assert all(message['format'] in FORMATS[views] for message in last)
+    assert last[2]['legal'] == []
+    assert last[last[0]['turn']]['legal']
+
+def test_svg_views_have_an_image_server():
+    pytest.importorskip('svgwrite')
+    import Healthcare_SVG_FOR_BRIFL as vis
+    server = GameServer(port=0, views='svg')
+    room = server.rooms.create('r', server.image_host, server.image_port)
+    assert vis.card_href(('r', 0), room.session).startswith("http://localhost:5000/get_image/")
+    with pytest.raises(ValueError):
+        vis.card_href(('r', 0), {'HOST': None, 'PORT': None})
+
+def test_a_failing_request_keeps_the_connection():
+    async def run():
+        server = GameServer(port=0, views='text')
+        await server.start()
+        def broken(client, request):
+            raise RuntimeError("broken handler")
+        server.handlers['view'] = broken
+        try:
+            reader, writer = await connect(server.port)
+            writer.write(encode({'type': 'view'}))
+            error = await receive(reader, 'error')
+            writer.write(encode({'type': 'join', 'room': 'r', 'user': 'pm',
+                                 'role': prob.POLICY_MAKER}))
+            view = await receive(reader)
+            writer.close()
+            return error, view
+        finally:
+            server.close()
+    error, view = asyncio.run(run())
+    assert "broken handler" in error['message']
+    assert view['moves'] == 0
+
+def test_cached_frames_print_nothing(capsys, monkeypatch):
+    pytest.importorskip('svgwrite')
+    import Healthcare_SVG_FOR_BRIFL as vis
+    monkeypatch.setattr(vis, 'DEBUG', True)
+    vis.set_render_backend('template')
+    vis.RENDER_CACHE.clear()
+    session = {'HOST': 'localhost', 'PORT': 5000}
+    s = prob.create_initial_state()
+    try:
+        first = vis.render_state(s, [OBSERVER_ROLE], session)
+        capsys.readouterr()
+        assert vis.render_state(s, [OBSERVER_ROLE], session) == first
+        assert capsys.readouterr().out == ""
+    finally:
+        vis.set_render_backend('svgwrite')
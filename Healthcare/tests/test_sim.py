@@ -0,0 +1,37 @@
+# Simulation policies and the game runners.
+
+import random
+
+import Healthcare as prob
+import Healthcare_Sim as sim
+from conftest import random_positions
+
+class CountingRandom(random.Random):
+    def __init__(self, seed):
+        super().__init__(seed)
+        self.calls = 0
+
+    def random(self):
+        self.calls += 1
+        return super().random()
+
+def test_greedy_scores_the_expected_value():
+    # The choice depends on the position only, not on an interception
+    # roll, and at most the tie-break draws from the random streams.
+    for s in random_positions(300, seed=8):
+        if s.is_goal():
+            continue
+        moves = sim.legal_moves(s)
+        game_rng = CountingRandom(0)
+        prob.set_rng(game_rng)
+        choices = {sim.greedy_policy(s, moves, random.Random(k)) for k in range(5)}
+        assert game_rng.calls == 0
+        values = {i: sum(p * sim.evaluate(c, s.whose_turn) for p, c in prob.operator_outcomes(s, i))
+                  for i in moves}
+        assert all(values[i] == max(values.values()) for i in choices)
+
+def test_runs_are_reproducible():
+    a = sim.run_games(300, sim.greedy_policy, sim.random_policy, seed=3)
+    prob.SUCCESSORS.clear()
+    b = sim.run_games(300, sim.greedy_policy, sim.random_policy, seed=3)
+    assert a == b and a['games'] == 300
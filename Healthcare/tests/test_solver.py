@@ -0,0 +1,64 @@
+# The retrograde solution table.
+
+import pytest
+
+import Healthcare as prob
+import Healthcare_Solver as solver
+from Healthcare_Search import WIN, Searcher
+from conftest import state_with
+
+HORIZON = 5
+
+@pytest.fixture(scope='module')
+def solved():
+    # Two Expand Public Coverage moves from a Policy Maker win.
+    root = state_with(access_gap_index=20, profit=78)
+    solution, states = solver.solve(HORIZON, root=root)
+    return root, solution, states
+
+def test_exact_values_match_a_full_search(solved):
+    root, solution, states = solved
+    exact = [(key, entry) for key, entry in solution.items() if entry[2]]
+    assert len(exact) > 100
+    assert solution[root.key()] == (WIN, 0, True)
+    for key, (value, op_id, _) in exact:
+        s = states[key]
+        assert Searcher().search(s, HORIZON + 2) == pytest.approx(value, abs=1e-9)
+        assert prob.can_apply(s, op_id)
+        move_value = sum(p * Searcher().search(child, HORIZON + 1)
+                         for p, child in prob.operator_outcomes(s, op_id))
+        assert move_value == pytest.approx(value, abs=1e-9)
+
+def test_finished_root_is_refused():
+    with pytest.raises(ValueError):
+        solver.solve(2, root=state_with(profit=86))
+
+def test_opening_table_has_exact_positions():
+    solution, _ = solver.solve(6)
+    assert sum(1 for _, _, exact in solution.values() if exact) > 0
+
+def test_table_round_trip(solved, tmp_path):
+    root, solution, states = solved
+    path = str(tmp_path / 'solution.bin')
+    solver.write_table(path, solution, states, HORIZON)
+    table = solver.SolutionTable(path)
+    try:
+        for key, (value, op_id, exact) in solution.items():
+            entry = table.lookup(states[key])
+            assert entry[1] == pytest.approx(value, rel=1e-6, abs=1e-6)
+            assert entry[2] == exact
+            assert entry[0] == (None if op_id < 0 else op_id)
+        assert table.lookup(state_with(access_gap_index=12)) is None
+        assert solver.hint(table, root) == prob.OPERATORS[0].name
+    finally:
+        table.close()
+
+def test_other_versions_are_rejected(solved, tmp_path):
+    root, solution, states = solved
+    path = tmp_path / 'solution.bin'
+    solver.write_table(str(path), solution, states, HORIZON)
+    data = bytearray(path.read_bytes())
+    solver.HEADER.pack_into(data, 0, solver.MAGIC, solver.VERSION - 1, HORIZON, 0)
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError):
+        solver.SolutionTable(str(path))
@@ -0,0 +1,33 @@
+# JSON and binary state payloads.
+
+import Healthcare as prob
+import Healthcare_State_API as api
+from conftest import random_positions
+
+ROLE_VIEWS = (None, prob.POLICY_MAKER, prob.INSURANCE_COMPANY)
+
+def test_packed_payload_round_trips():
+    for s in random_positions(500, seed=7):
+        for role in ROLE_VIEWS:
+            data = api.pack_payload(s, role)
+            assert len(data) == api.PACKED.size
+            expected = api.state_payload(s, role)
+            expected.pop('win', None)
+            assert api.unpack_payload(data) == expected
+
+def test_payload_carries_status_and_tenths():
+    s = prob.create_initial_state()
+    s.access_gap_index = 12
+    payload = api.state_payload(s, prob.POLICY_MAKER)
+    assert (payload['end'], payload['winner']) == s.status()
+    assert payload['s'][api.UNINSURED_INDEX] == 133
+
+def test_unpack_rejects_other_versions():
+    data = bytearray(api.pack_payload(prob.create_initial_state()))
+    data[0] = api.PAYLOAD_VERSION + 1
+    try:
+        api.unpack_payload(bytes(data))
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("a payload of another version was accepted")